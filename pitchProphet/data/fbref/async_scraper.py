@@ -0,0 +1,141 @@
+"""
+Asyncio scraping engine for FBref.
+
+AsyncFBRefScraper runs page fetches concurrently in worker threads and parses
+finished pages in a process pool while other fetches wait on the network. All
+requests, for every league being scraped, go through one HttpClient whose
+TokenBucket is built from scraper[rate_limit], so the host budget is used fully
+but never exceeded.
+Matches are still checkpointed in schedule order through the scrape manifest.
+"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List
+
+from pitchProphet.data.fbref.fbref_scrapper import FBRefScraper
+from pitchProphet.data.fbref.http_client import HttpClient
+from pitchProphet.data.fbref.match_parser import parse_match_page
+
+
+class AsyncFBRefScraper(FBRefScraper):
+    """
+    Class for scraping several league seasons concurrently under one rate budget.
+
+    Attributes:
+        max_in_flight (int): Maximum number of match pages fetched at once.
+        parse_workers (int): Processes used for html parsing, 0 parses in threads.
+
+    Methods:
+        scrape_season_async(season: str, league: str) -> None:
+            Scrapes all pending matches of a season concurrently.
+
+        scrape_leagues(season: str, leagues: list) -> None:
+            Scrapes the season for several leagues in one event loop.
+    """
+
+    def __init__(
+        self,
+        config_path: Path,
+        player_data: bool = False,
+        inference: bool = False,
+        client: HttpClient = None,
+    ):
+        super().__init__(config_path, player_data, inference, client)
+        concurrency = self.config.get("concurrency", {})
+        self.max_in_flight = concurrency.get("max_in_flight", 4)
+        self.parse_workers = concurrency.get("parse_workers", 2)
+        self._in_flight = None
+        self._parse_pool = None
+
+    async def _scrape_match_async(self, match_link: str) -> dict:
+        """fetch in a worker thread, then parse in the process pool"""
+        async with self._in_flight:
+            content = await asyncio.to_thread(self._fetch, match_link)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._parse_pool, parse_match_page, content, self.player_data
+        )
+
+    async def scrape_season_async(self, season: str, league: str, resume=None):
+        """scrape all pending matches of a season concurrently"""
+        if resume is None:
+            resume = not self.inference
+        if self._in_flight is None:
+            self._in_flight = asyncio.Semaphore(self.max_in_flight)
+
+        match_links, manifest = await asyncio.to_thread(
+            self._links_to_scrape, season, league, resume
+        )
+        total_matches = len(match_links)
+        checkpoint_every = self.config.get("checkpoint_every") or total_matches
+        print(f"Found {total_matches} matches to scrape for {league} {season}")
+
+        # start every fetch, the semaphore and the client's bucket pace them
+        tasks = [
+            asyncio.create_task(self._scrape_match_async(link)) for link in match_links
+        ]
+
+        # collect in schedule order so saved files keep match order
+        writer = self._writer(league, season)
+        batch_links = []
+        try:
+            for i, (link, task) in enumerate(zip(match_links, tasks), 1):
+                try:
+                    match_data = await task
+                    match_data["MatchLink"] = link
+                    writer.write(match_data)
+                    batch_links.append(link)
+                    print(f"{league} {season}: processed {i}/{total_matches} matches")
+                except Exception as e:
+                    print(f"Error on {league} match {i} ({link}): {e}")
+                    continue
+
+                # checkpoint
+                if resume and len(batch_links) >= checkpoint_every:
+                    self._checkpoint(manifest, writer, batch_links)
+                    batch_links = []
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # save matches
+        self._checkpoint(manifest, writer, batch_links)
+
+    async def scrape_leagues(self, season: str, leagues: List[str]) -> None:
+        """scrape one season for several leagues under the shared rate budget"""
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        if self.parse_workers:
+            self._parse_pool = ProcessPoolExecutor(self.parse_workers)
+        try:
+            results = await asyncio.gather(
+                *(self.scrape_season_async(season, league) for league in leagues),
+                return_exceptions=True,
+            )
+        finally:
+            if self._parse_pool is not None:
+                self._parse_pool.shutdown(cancel_futures=True)
+                self._parse_pool = None
+
+        # failures stay isolated per league
+        for league, result in zip(leagues, results):
+            if isinstance(result, Exception):
+                print(f"Error scraping {league} {season}: {result}")
+
+
+def main():
+    try:
+        main_dir = Path(__file__).resolve().parent.parent.parent
+        config = main_dir / "config" / "config.yaml"
+        scraper = AsyncFBRefScraper(config)
+        season = scraper.config["season"] or "2024-2025"
+        leagues = list(scraper.config["league_ids"])
+        asyncio.run(scraper.scrape_leagues(season, leagues))
+    except Exception as e:
+        print(f"Error in main process: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Multi-league, multi-season backfill of raw match data.
+
+Every (league, season) pair of the grid is a shard. Shards are scraped by a
+pool of worker threads that share one HttpClient, so the per-host rate budget
+in scraper[rate_limit] holds for the whole job. Each shard writes its own raw
+files and scrape manifest, and the state of every shard is kept in
+raw_dir/manifests/backfill.json so an interrupted job picks up where it left
+off: finished shards are skipped, unfinished ones resume from their manifest.
+Shards of a season that is not over yet are never finished, every run scrapes
+the matches played since the last one.
+
+    backfill --leagues Premier-League La-Liga --seasons 2015-2016 2016-2017
+"""
+
+import argparse
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import yaml
+
+from pitchProphet.data.fbref.fbref_scrapper import FBRefScraper
+from pitchProphet.data.fbref.http_client import HttpClient
+
+
+def season_over(season: str, today: Optional[date] = None) -> bool:
+    """whether a season ("2017-2018", or "2018" for calendar year leagues) has
+    ended, seasons end by July of their last year"""
+    today = today or date.today()
+    years = [int(year) for year in season.split("-")]
+    if len(years) == 1:
+        return today >= date(years[0] + 1, 1, 1)
+    return today >= date(years[-1], 7, 1)
+
+
+class BackfillState:
+    """
+    Class for tracking progress of every shard of a backfill job.
+
+    Attributes:
+        path (Path): Location of the state json file.
+        shards (dict): "{league}/{season}" -> {"status", "scraped", "failed"}.
+
+    Methods:
+        update(league: str, season: str, **fields) -> None:
+            Updates a shard's entry and saves the state atomically.
+
+        is_done(league: str, season: str) -> bool:
+            Whether a shard of a season that is over finished without failed
+            matches.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.shards: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                self.shards = json.load(f)
+
+    def is_done(self, league: str, season: str) -> bool:
+        # matches of the current season are still to be played
+        shard = self.shards.get(f"{league}/{season}", {})
+        return shard.get("status") == "done" and season_over(season)
+
+    def update(self, league: str, season: str, **fields) -> None:
+        with self._lock:
+            self.shards.setdefault(f"{league}/{season}", {}).update(fields)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(self.shards, f, indent=4)
+            os.replace(tmp_path, self.path)
+
+
+def run_shard(
+    config_path: Path,
+    client: HttpClient,
+    state: BackfillState,
+    league: str,
+    season: str,
+) -> None:
+    """scrape one league season, recording its progress in the job state"""
+    state.update(league, season, status="running")
+    try:
+        scraper = FBRefScraper(config_path, client=client)
+        result = scraper.scrape_season(season, league, resume=True)
+    except Exception as e:
+        print(f"Error backfilling {league} {season}: {e}")
+        state.update(league, season, status="failed", error=str(e))
+        return
+
+    # shards with failed matches are retried on the next run
+    status = "done" if result["failed"] == 0 else "incomplete"
+    state.update(league, season, status=status, **result)
+    print(f"\n{league} {season}: {status} ({result})")
+
+
+def backfill(
+    config_path: Path,
+    leagues: List[str],
+    seasons: List[str],
+    workers: int = 2,
+    refresh: bool = False,
+) -> BackfillState:
+    """scrape the leagues x seasons grid on a worker pool"""
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f)
+    paths = config["global"]["paths"]
+    state = BackfillState(
+        Path(paths["root_dir"]) / Path(paths["raw_dir"]) / "manifests" / "backfill.json"
+    )
+
+    # one client for all workers, they share the rate budget and connections
+    client = HttpClient.from_config(config)
+
+    shards = [(league, season) for league in leagues for season in seasons]
+    todo = [s for s in shards if refresh or not state.is_done(*s)]
+    print(f"Backfill: {len(shards)} shards, {len(shards) - len(todo)} already done")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for league, season in todo:
+            state.update(league, season, status="pending")
+            pool.submit(run_shard, config_path, client, state, league, season)
+    return state
+
+
+def main():
+    main_dir = Path(__file__).resolve().parent.parent.parent
+    config_path = main_dir / "config" / "config.yaml"
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f)
+    defaults = config["scraper"].get("backfill", {})
+
+    parser = argparse.ArgumentParser(description="backfill raw match data")
+    parser.add_argument("--leagues", nargs="+", default=defaults.get("leagues"))
+    parser.add_argument("--seasons", nargs="+", default=defaults.get("seasons"))
+    parser.add_argument("--workers", type=int, default=defaults.get("workers", 2))
+    parser.add_argument(
+        "--refresh", action="store_true", help="re-check shards already marked done"
+    )
+    args = parser.parse_args()
+
+    leagues = args.leagues or list(config["scraper"]["league_ids"])
+    seasons = args.seasons or [config["scraper"]["season"]]
+    backfill(config_path, leagues, seasons, args.workers, args.refresh)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,25 @@
-import json
 import logging
 import os
-import random
 import re
 import sys
-import time
 from pathlib import Path
+from urllib.parse import urlsplit
 
 import pandas as pd
 import requests
 import yaml
-from bs4 import BeautifulSoup
+
+from pitchProphet.data.fbref.http_client import HttpClient
+from pitchProphet.data.fbref.manifest import ScrapeManifest
+from pitchProphet.data.fbref.match_parser import parse_match_page
+from pitchProphet.data.fbref.raw_catalog import MATCH_ID, RawCatalog
+from pitchProphet.data.fbref.raw_io import RawMatchWriter, scraped_raw_dir
+from pitchProphet.data.fbref.schedule import parse_schedule
+from pitchProphet.data.fbref.scrape_plan import (
+    plan_team_matches,
+    save_plan,
+    upcoming_fixtures,
+)
 
 
 class FBRefScraper:
@@ -25,6 +34,9 @@ class FBRefScraper:
         player_data (bool): Flag to indicate whether to scrap individual player statistics.
 
     Methods:
+        get_schedule(url: str) -> pd.DataFrame:
+            Retrieves the parsed schedule of a league season.
+
         get_match_links(url: str, league: str) -> list:
             Retrieves all match links for a given league and season.
 
@@ -32,54 +44,47 @@ class FBRefScraper:
             Scrapes data for a single match.
 
         scrape_season(season: str, league: str) -> None:
-            Iterates over scrape_match for all matches in a season
+            Iterates over scrape_match for all matches in a season, or in
+            inference mode for the last matches of the upcoming teams
     """
 
     def __init__(
-        self, config_path: Path, player_data: bool = False, inference: bool = False
+        self,
+        config_path: Path,
+        player_data: bool = False,
+        inference: bool = False,
+        client: HttpClient = None,
     ):
         # load config file
         with open(config_path, "r") as f:
             config = yaml.safe_load(f)
         self.g_config = config["global"]
         self.config = config["scraper"]
+        self.inf_config = config.get("inference", {})
         self.player_data = player_data
         self.inference = inference
+        # shared pooled, cached and rate limited http client
+        self.client = client or HttpClient.from_config(config)
+        self._raw_catalog = None
 
         # setup basic logging
         logging.basicConfig(level=logging.INFO)
 
-    def get_match_links(self, url, league):
-        """get all match links from the season page"""
+    def get_schedule(self, url):
+        """week, date, teams, score and match link of every match of the
+        season page"""
+        return parse_schedule(self._fetch(url), self._host())
+
+    def get_match_links(self, url, league, schedule=None):
+        """get all match links from the season page, or from its schedule
+        when the caller already parsed it"""
         try:
-            # handle rate limiting
-            for attempt in range(self.config["rate_limit"]["max_retries"]):
-                try:
-                    response = requests.get(url)
-                    response.raise_for_status()
-                    break
-                except requests.exceptions.HTTPError as e:
-                    if e.response.status_code == 429:  # too Many Requests
-                        wait_time = self.config["rate_limit"]["retry_delay"] * (
-                            attempt + 1
-                        )
-                        print(f"\nRate limited. Waiting {wait_time} seconds...")
-                        time.sleep(wait_time)
-                        continue
-                    raise
-
-            # find match links
-            soup = BeautifulSoup(response.content, "html.parser")
-            all_links = soup.find_all("a")
-
-            # filter relevant links
-            match_links = []
-            for link in all_links:
-                href = link.get("href", "")
-                if league in href and "/en/matches/" in href:
-                    match_links.append("https://fbref.com" + href)
-
-            return match_links
+            if schedule is None:
+                schedule = self.get_schedule(url)
+
+            # one link per played match, in schedule order
+            match_links = schedule["MatchLink"].dropna().drop_duplicates()
+            return match_links.tolist()
 
         except Exception as e:
             print(f"Error getting match links: {e}")
@@ -88,133 +93,167 @@ class FBRefScraper:
     def scrape_match(self, match_link):
         """scrape data for a single match"""
         try:
-            # get tables from the page
-            tables = pd.read_html(match_link)
-
-            # process team stats
-            home_stats = self._process_team_stats(tables[3], tables[9])
-            away_stats = self._process_team_stats(tables[10], tables[16])
-
-            # get match info
-            response = requests.get(match_link)
-            soup = BeautifulSoup(response.content, "html.parser")
-
-            # get basic match info
-            match_week = soup.find(string=re.compile(r"Matchweek \d+"))
-            match_week = int(re.sub(r"\D", "", match_week))
-
-            xg = soup.find_all(class_="score_xg")
-            goals = soup.find_all(class_="score")
-            teams = soup.select(".scorebox strong a")
-
-            match_info = {
-                "Matchweek": match_week,
-                "HomeTeam": str(teams[0].text),
-                "AwayTeam": str(teams[1].text),
-                "HomeGoal": int(goals[0].text),
-                "AwayGoal": int(goals[1].text),
-                "HomeXG": float(xg[0].text),
-                "AwayXG": float(xg[1].text),
-            }
-
-            game_data = {
-                "MatchInfo": [match_info],
-                "HomeStat": home_stats["TeamStat"].to_dict("records"),
-                "AwayStat": away_stats["TeamStat"].to_dict("records"),
-            }
-            if self.player_data == True:
-                game_data["HomePlayersStat"] = (
-                    home_stats["PlayerStat"].to_dict("records"),
-                )
-                game_data["AwayPlayersStat"] = (
-                    away_stats["PlayerStat"].to_dict("records"),
-                )
-                game_data["HomeGKStat"] = (home_stats["GKStat"].to_dict("records"),)
-                game_data["AwayGKStat"] = (away_stats["GKStat"].to_dict("records"),)
-
-            return game_data
+            # single fetch, tables and scorebox are read from the same tree
+            content = self._fetch(match_link)
+            return parse_match_page(content, self.player_data)
 
         except Exception as e:
             print(f"Error scraping match {match_link}: {e}")
             raise
 
-    def _process_team_stats(self, player_df, gk_df):
-        """process team statistics"""
-        # clean up column names
-        player_df.columns = player_df.columns.droplevel(0)
-        player_df = player_df.loc[:, ~player_df.columns.duplicated()]
+    def _fetch(self, url: str) -> bytes:
+        """return the raw content of a page, from the page cache when possible"""
+        return self.client.get_content(url)
 
-        gk_df.columns = gk_df.columns.droplevel(0)
-        gk_df = gk_df.loc[:, ~gk_df.columns.duplicated()]
+    def _host(self) -> str:
+        """scheme and host of scraper[base_url], match links are made absolute with it"""
+        base_url = urlsplit(self.config["base_url"])
+        return f"{base_url.scheme}://{base_url.netloc}"
 
-        team_df = player_df.iloc[[-1], 5:].reset_index(drop=True)
-        player_df = player_df.iloc[:-1]
+    def _schedule_url(self, season: str, league: str) -> str:
+        """scores and fixtures page of a league season"""
+        league_id = self.config["league_ids"][league]
+        return f"{self.config['base_url']}/{str(league_id)}/{str(season)}/schedule/{str(season)}-{league}-Scores-and-Fixtures"
 
-        return {"TeamStat": team_df, "PlayerStat": player_df, "GKStat": gk_df}
+    def _output_path(self) -> Path:
+        """raw data directory for the current mode"""
+        return scraped_raw_dir(self.g_config["paths"], self.inference)
 
-    def _save_matches(self, matches: list, league: str, season: str) -> None:
-        """save scraped matches to json file"""
-        # create output directory
-        paths = self.g_config["paths"]
-        if self.inference == True:
-            output_path = Path(paths["root_dir"]) / Path(paths["inf_raw_dir"])
-        else:
-            output_path = Path(paths["root_dir"]) / Path(paths["raw_dir"])
-        output_path.mkdir(parents=True, exist_ok=True)
-
-        # find matchweek info
-        last_match_dict = matches[-1]
-        match_info_dict = last_match_dict["MatchInfo"][0]
-        match_week = match_info_dict.get("Matchweek", None)
-
-        # save data
-        output_file = (
-            output_path
-            / f"{league}-{season}-match_week-{match_week}-matches-{len(matches)}.json"
+    def _writer(self, league: str, season: str) -> RawMatchWriter:
+        """streaming raw file writer for a league season"""
+        compression = self.config.get("raw_format", {}).get("compression")
+        return RawMatchWriter(
+            self._output_path(), league, season, compression, self._catalog()
         )
-        with open(output_file, "w") as f:
-            json.dump(matches, f, indent=4)
-        print(f"\nSaved {len(matches)} matches to {output_file}")
 
-    def scrape_season(self, season=None, league=None):
-        """scrape all matches in a season"""
-        if self.inference == False:
-            season = self.config["season"] or "2024-2025"
-            league = self.config["league"]
+    def _catalog(self) -> RawCatalog:
+        """catalog of the raw data directory, shared by this scraper's writers"""
+        if self._raw_catalog is None:
+            self._raw_catalog = RawCatalog(self._output_path())
+        return self._raw_catalog
 
-        # make url
-        league_id = self.config["league_ids"][league]
-        url = f"{self.config['base_url']}/{str(league_id)}/{str(season)}/schedule/{str(season)}-{league}-Scores-and-Fixtures"
+    def scrape_season(
+        self, season=None, league=None, resume=None, fixtures=None, schedule=None
+    ):
+        """scrape all matches in a season.
+
+        Outside inference mode the run is resumable: links already listed in
+        the league/season manifest are skipped and matches are saved every
+        scraper[checkpoint_every] matches, each save being recorded in the
+        manifest. In inference mode only the last inference[last_n_match]
+        matches of the teams in fixtures (Home/Away, the next match week of
+        the schedule by default) are scraped, leaving out the ones already in
+        the raw data, and the plan is saved for LoadData. schedule is the
+        season's parsed schedule if the caller already fetched it. Returns the
+        number of matches scraped and failed."""
+        if self.inference == False:
+            season = season or self.config["season"] or "2024-2025"
+            league = league or self.config["league"]
+        if resume is None:
+            resume = not self.inference
 
-        # get all match links
-        match_links = self.get_match_links(url, league)
+        match_links, manifest = self._links_to_scrape(
+            season, league, resume, fixtures, schedule
+        )
+        planned = match_links
+        if self.inference:
+            # planned matches already scraped are read from their raw files
+            stored = self._stored_matches(planned)
+            match_links = [link for link in planned if link not in stored]
+            print(f"{len(stored)} of {len(planned)} planned matches on disk")
         total_matches = len(match_links)
-
-        # TODO: grab last n game_week data instead of last 60
-        # for inference select last 100 matches
-        if self.inference == True:
-            match_links = match_links[-100:]
-            total_matches = len(match_links)
+        checkpoint_every = self.config.get("checkpoint_every") or total_matches
 
         print(f"Found {total_matches} matches to scrape")
-        # scrape each match
-        all_matches = []
+        # scrape each match, every record is flushed to disk right away
+        writer = self._writer(league, season)
+        batch_links = []
+        failed = 0
         for i, link in enumerate(match_links, 1):
             try:
+                # requests are paced by the client's rate limiter
                 print(f"\nProcessing {i}/{total_matches} matches")
                 match_data = self.scrape_match(link)
-                all_matches.append(match_data)
-
-                # wait between requests
-                sleep_time = random.uniform(*self.config["rate_limit"]["sleep_range"])
-                time.sleep(sleep_time)
+                match_data["MatchLink"] = link
+                writer.write(match_data)
+                batch_links.append(link)
 
             except Exception as e:
                 print(f"Error on match {i}: {e}")
+                failed += 1
                 continue
 
+            # checkpoint
+            if resume and len(batch_links) >= checkpoint_every:
+                self._checkpoint(manifest, writer, batch_links)
+                batch_links = []
+
         # save matches
-        self._save_matches(all_matches, league, season)
+        self._checkpoint(manifest, writer, batch_links)
+        if self.inference:
+            save_plan(self._output_path(), league, planned)
+        return {"scraped": total_matches - failed, "failed": failed}
+
+    def _links_to_scrape(
+        self, season: str, league: str, resume: bool, fixtures=None, schedule=None
+    ) -> tuple:
+        """match links still to scrape for a season, and the season's manifest"""
+        schedule_url = self._schedule_url(season, league)
+        if self.inference == True:
+            # the last n matches of every team playing next
+            if schedule is None:
+                schedule = self.get_schedule(schedule_url)
+            match_links = self._plan_team_links(schedule, league, fixtures)
+        elif schedule is not None:
+            match_links = self.get_match_links(schedule_url, league, schedule)
+        else:
+            # get all match links
+            match_links = self.get_match_links(schedule_url, league)
+
+        # skip matches a previous run already saved, including the ones
+        # streamed to a part file before the run was interrupted
+        manifest = ScrapeManifest(self._output_path(), league, season)
+        for output_file, links in RawMatchWriter.recover(
+            self._output_path(), league, season, self._catalog()
+        ):
+            manifest.record(links, output_file.name)
+        if resume:
+            match_links = manifest.pending(match_links)
+            print(f"{len(manifest)} matches already scraped for {league} {season}")
+        return match_links, manifest
+
+    def _plan_team_links(
+        self, schedule: pd.DataFrame, league: str, fixtures=None
+    ) -> list:
+        """links of the last inference[last_n_match] played matches of each
+        team in fixtures, or in the schedule's next match week"""
+        if fixtures is None or fixtures.empty:
+            fixtures = upcoming_fixtures(schedule)
+        if fixtures.empty:
+            # season over, every team's last matches
+            fixtures = schedule
+        teams = pd.concat([fixtures["Home"], fixtures["Away"]]).unique()
+        last_n_match = self.inf_config.get("last_n_match", 5)
+        match_links = plan_team_matches(schedule, teams, last_n_match, league)
+        print(f"Planned {len(match_links)} matches for {len(teams)} teams")
+        return match_links
+
+    def _stored_matches(self, match_links: list) -> set:
+        """the links whose matches are already in the raw data"""
+        ids = {}
+        for link in match_links:
+            found = MATCH_ID.search(link)
+            if found is not None:
+                ids[found.group(1)] = link
+        return {ids[match] for match in self._catalog().match_files(ids)}
+
+    def _checkpoint(
+        self, manifest: ScrapeManifest, writer: RawMatchWriter, match_links: list
+    ) -> None:
+        """finalize the current raw file and record its links in the manifest"""
+        output_file = writer.close_part()
+        if output_file is not None:
+            manifest.record(match_links, output_file.name)
 
 
 def main():
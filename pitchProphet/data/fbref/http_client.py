@@ -0,0 +1,170 @@
+"""
+Shared HTTP client for everything that downloads pages from FBref.
+
+One HttpClient is meant to be shared by the scraper, fixture lookups and any
+concurrent workers in a process. It keeps keep-alive connections in a pooled
+requests.Session, serves pages from the on-disk PageCache when possible, paces
+network requests with a TokenBucket and retries failed requests:
+    1. 429/503 responses honor Retry-After (seconds or HTTP date) and pause the
+       whole bucket, then halve the request rate (down to a floor)
+    2. Other 5xx responses and connection errors back off exponentially with jitter
+    3. Successful requests slowly raise the rate back to the configured budget
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from pitchProphet.data.fbref.page_cache import PageCache
+from pitchProphet.data.fbref.rate_limit import TokenBucket
+
+THROTTLED = (429, 503)
+
+
+class HttpClient:
+    """
+    Class for pooled, cached and rate limited page downloads.
+
+    Attributes:
+        session (requests.Session): Keep-alive session with a connection pool.
+        cache (PageCache | None): On-disk page cache.
+        bucket (TokenBucket): Rate limiter every network request waits on.
+        max_rate (float): Configured request budget in requests per second.
+        min_rate (float): Floor the adaptive rate never drops below.
+        network_requests (int): Number of requests that reached the network.
+
+    Methods:
+        get(url: str) -> dict:
+            Returns {"content": bytes, "from_network": bool} for a page.
+
+        get_content(url: str) -> bytes:
+            Returns only the page content.
+    """
+
+    def __init__(
+        self,
+        rate_limit: dict,
+        cache: Optional[PageCache] = None,
+        bucket: Optional[TokenBucket] = None,
+    ):
+        self.cache = cache
+        self.bucket = bucket or TokenBucket.from_config(rate_limit)
+        self.max_rate = self.bucket.rate
+        self.min_rate = rate_limit.get("min_requests_per_minute", 1) / 60
+        self.max_retries = rate_limit.get("max_retries", 5)
+        self.backoff_base = rate_limit.get("backoff_base", 10)
+        self.max_delay = rate_limit.get("retry_delay", 600)
+        self.timeout = rate_limit.get("timeout", 30)
+        self.network_requests = 0
+        self._lock = threading.Lock()
+
+        pool_size = rate_limit.get("pool_size", 10)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @classmethod
+    def from_config(cls, config: dict) -> "HttpClient":
+        """build the client and its page cache from the full config"""
+        return cls(config["scraper"]["rate_limit"], PageCache.from_config(config))
+
+    def get(self, url: str) -> Dict:
+        """fetch a page through the cache.
+
+        Fresh entries are served from disk, stale ones are revalidated with
+        If-None-Match/If-Modified-Since and only a changed or uncached page is
+        downloaded in full."""
+        entry = self.cache.lookup(url) if self.cache is not None else None
+        if entry is not None and entry["fresh"]:
+            return {"content": entry["content"], "from_network": False}
+
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self._request(url, headers)
+        if entry is not None and response.status_code == 304:
+            self.cache.refresh(url)
+            return {"content": entry["content"], "from_network": True}
+
+        if self.cache is not None:
+            self.cache.store(url, response.content, response.headers)
+        return {"content": response.content, "from_network": True}
+
+    def get_content(self, url: str) -> bytes:
+        return self.get(url)["content"]
+
+    def _request(self, url: str, headers: Dict) -> requests.Response:
+        """send a request, retrying throttled, failed and dropped requests"""
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            with self._lock:
+                self.network_requests += 1
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                wait_time = self._backoff(attempt)
+                print(f"\nRequest failed ({e}). Retrying in {wait_time:.0f} seconds...")
+                time.sleep(wait_time)
+                continue
+
+            if response.status_code in THROTTLED:
+                self._slow_down()
+                wait_time = self._retry_after(response)
+                if wait_time is None:
+                    wait_time = self._backoff(attempt)
+                if attempt < self.max_retries:
+                    print(f"\nRate limited. Waiting {wait_time:.0f} seconds...")
+                    self.bucket.pause(wait_time)
+                    continue
+            elif response.status_code >= 500 and attempt < self.max_retries:
+                time.sleep(self._backoff(attempt))
+                continue
+
+            response.raise_for_status()
+            self._speed_up()
+            return response
+
+    def _backoff(self, attempt: int) -> float:
+        """exponential backoff with jitter, capped at retry_delay"""
+        delay = min(self.max_delay, self.backoff_base * 2**attempt)
+        return random.uniform(delay / 2, delay)
+
+    def _retry_after(self, response: requests.Response) -> Optional[float]:
+        """seconds asked for by a Retry-After header, if any"""
+        value = response.headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            seconds = retry_at.timestamp() - time.time()
+        return min(max(seconds, 0.0), self.max_delay)
+
+    def _slow_down(self) -> None:
+        """halve the request rate after a throttled response"""
+        rate = max(self.min_rate, self.bucket.rate / 2)
+        self.bucket.set_rate(rate)
+        print(f"Request rate lowered to {rate * 60:.1f}/min")
+
+    def _speed_up(self) -> None:
+        """additively recover the request rate after a success"""
+        if self.bucket.rate < self.max_rate:
+            self.bucket.set_rate(
+                min(self.max_rate, self.bucket.rate + self.max_rate / 20)
+            )
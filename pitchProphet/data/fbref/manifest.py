@@ -0,0 +1,64 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, List
+
+
+class ScrapeManifest:
+    """
+    Class for tracking which match pages of a league season are already scraped.
+
+    The manifest is a small json file per league/season, kept in a manifests/
+    folder next to the raw data, that maps every scraped match URL to the raw
+    file it was saved in. It is rewritten atomically after every checkpoint so
+    an interrupted run can resume with only the missing matches.
+
+    Attributes:
+        path (Path): Location of the manifest json file.
+        league (str): League name as in scraper[league_ids].
+        season (str): Season in 20XX-20XX format.
+
+    Methods:
+        pending(match_links: list) -> list:
+            Returns the links that are not scraped yet, in their original order.
+
+        record(match_links: list, file_name: str) -> None:
+            Marks links as scraped into file_name and saves the manifest.
+    """
+
+    def __init__(self, output_path: Path, league: str, season: str):
+        self.league = league
+        self.season = season
+        self.path = Path(output_path) / "manifests" / f"{league}-{season}.json"
+        self.scraped: Dict[str, str] = {}
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                self.scraped = json.load(f)["scraped"]
+
+    def __len__(self) -> int:
+        return len(self.scraped)
+
+    def is_scraped(self, match_link: str) -> bool:
+        return match_link in self.scraped
+
+    def pending(self, match_links: List[str]) -> List[str]:
+        """links not scraped yet, in their original order"""
+        return [link for link in match_links if link not in self.scraped]
+
+    def record(self, match_links: List[str], file_name: str) -> None:
+        """mark links as scraped into file_name and checkpoint the manifest"""
+        for link in match_links:
+            self.scraped[link] = file_name
+        self.save()
+
+    def save(self) -> None:
+        """write the manifest atomically (tmp file + rename)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {"league": self.league, "season": self.season, "scraped": self.scraped},
+                f,
+                indent=4,
+            )
+        os.replace(tmp_path, self.path)
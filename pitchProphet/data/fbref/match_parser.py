@@ -0,0 +1,122 @@
+"""
+Targeted parser for FBref match report pages.
+
+A match page is parsed once with lxml and only the tables the scraper needs are
+converted to dataframes:
+    1. Team summary tables, found by id (stats_<team_id>_summary)
+    2. Goalkeeper tables, found by id (keeper_stats_<team_id>)
+    3. Scorebox match info (matchweek, teams, goals, xG) from the same tree
+"""
+
+import re
+from typing import Dict, List
+
+import lxml.html
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+SUMMARY_TABLE_ID = re.compile(r"^stats_[0-9a-f]+_summary$")
+KEEPER_TABLE_ID = re.compile(r"^keeper_stats_[0-9a-f]+$")
+MATCHWEEK = re.compile(r"Matchweek (\d+)")
+_RE_WHITESPACE = re.compile(r"[\r\n]+|\s{2,}")
+
+
+def _class_xpath(class_name: str) -> str:
+    """xpath predicate equivalent to the css class selector .class_name"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+def _cell_text(cell: lxml.html.HtmlElement) -> str:
+    """cell text, whitespace handled the same way as pd.read_html"""
+    for br in cell.xpath(".//br"):
+        br.tail = "\n" + (br.tail or "")
+    return _RE_WHITESPACE.sub(" ", cell.text_content().strip())
+
+
+def row_cells(row: lxml.html.HtmlElement) -> List[str]:
+    """text of all th/td cells in a row, with colspan expanded"""
+    cells = []
+    for cell in row.xpath("./td|./th"):
+        text = _cell_text(cell)
+        colspan = int(cell.get("colspan", 1) or 1)
+        cells.extend([text] * colspan)
+    return cells
+
+
+def table_to_frame(table: lxml.html.HtmlElement) -> pd.DataFrame:
+    """convert a stats table element to a dataframe.
+
+    Columns are taken from the last header row (the over-header is dropped) and
+    only the first of any duplicated column name is kept. Body and footer rows
+    go through the same TextParser type inference pd.read_html uses."""
+    header = row_cells(table.xpath(".//thead/tr")[-1])
+    rows = [row_cells(tr) for tr in table.xpath(".//tbody//tr")]
+    rows += [row_cells(tr) for tr in table.xpath(".//tfoot//tr")]
+
+    # fill out ragged rows
+    for row in rows:
+        row.extend([""] * (len(header) - len(row)))
+
+    with TextParser(rows, header=None, thousands=",") as parser:
+        df = parser.read()
+    df.columns = header
+    return df.loc[:, ~df.columns.duplicated()]
+
+
+def team_stats(player_df: pd.DataFrame, gk_df: pd.DataFrame) -> Dict:
+    """split a summary table into the team total row and player rows"""
+    team_df = player_df.iloc[[-1], 5:].reset_index(drop=True)
+    player_df = player_df.iloc[:-1]
+
+    return {"TeamStat": team_df, "PlayerStat": player_df, "GKStat": gk_df}
+
+
+def _match_info(tree: lxml.html.HtmlElement) -> Dict:
+    """read matchweek, teams, goals and xG from the scorebox"""
+    match_week = tree.xpath("//text()[contains(., 'Matchweek ')]")
+    match_week = next(
+        int(m.group(1)) for m in map(MATCHWEEK.search, match_week) if m is not None
+    )
+
+    xg = tree.xpath(f"//*[{_class_xpath('score_xg')}]")
+    goals = tree.xpath(f"//*[{_class_xpath('score')}]")
+    teams = tree.xpath(f"//*[{_class_xpath('scorebox')}]//strong//a")
+
+    return {
+        "Matchweek": match_week,
+        "HomeTeam": str(teams[0].text_content()),
+        "AwayTeam": str(teams[1].text_content()),
+        "HomeGoal": int(goals[0].text_content()),
+        "AwayGoal": int(goals[1].text_content()),
+        "HomeXG": float(xg[0].text_content()),
+        "AwayXG": float(xg[1].text_content()),
+    }
+
+
+def parse_match_page(content: bytes, player_data: bool = False) -> Dict:
+    """parse a match report page into the raw game data record"""
+    tree = lxml.html.fromstring(content)
+
+    summary = [t for t in tree.iter("table") if SUMMARY_TABLE_ID.match(t.get("id", ""))]
+    keeper = [t for t in tree.iter("table") if KEEPER_TABLE_ID.match(t.get("id", ""))]
+    if len(summary) != 2 or len(keeper) != 2:
+        raise ValueError(
+            f"expected 2 summary and 2 keeper tables, found {len(summary)} and {len(keeper)}"
+        )
+
+    # tables appear in page order: home team first, then away team
+    home_stats = team_stats(table_to_frame(summary[0]), table_to_frame(keeper[0]))
+    away_stats = team_stats(table_to_frame(summary[1]), table_to_frame(keeper[1]))
+
+    game_data = {
+        "MatchInfo": [_match_info(tree)],
+        "HomeStat": home_stats["TeamStat"].to_dict("records"),
+        "AwayStat": away_stats["TeamStat"].to_dict("records"),
+    }
+    if player_data == True:
+        game_data["HomePlayersStat"] = (home_stats["PlayerStat"].to_dict("records"),)
+        game_data["AwayPlayersStat"] = (away_stats["PlayerStat"].to_dict("records"),)
+        game_data["HomeGKStat"] = (home_stats["GKStat"].to_dict("records"),)
+        game_data["AwayGKStat"] = (away_stats["GKStat"].to_dict("records"),)
+
+    return game_data
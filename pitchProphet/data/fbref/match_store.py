@@ -0,0 +1,236 @@
+"""
+Columnar store of raw match data, partitioned by league and season.
+
+The raw files of a directory are converted into one HDF5 file per league
+season (store_dir/{league}/{season}.h5, PyTables format). Each partition holds
+the MatchInfo table with two indexed data columns:
+    1. match_week: matchweek of the match
+    2. file_week: matchweek in the name of the raw file the match came from,
+       which is what LoadData(match_week=n) selects on
+and the HomeStat and AwayStat columns as one typed, compressed array per
+column (HomeStat/c0, HomeStat/c1, ..., named in the group's attributes), row
+aligned with MatchInfo.
+
+Reads prune partitions by league/season, evaluate matchweek predicates on the
+MatchInfo index columns and read only the selected rows of the stat columns
+asked for, so only the partitions, rows and columns asked for are read.
+MatchStore.sync rebuilds just the partitions whose raw files changed, looking
+them up in the raw catalog.
+"""
+
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import tables
+
+from pitchProphet.data.fbref.raw_catalog import RawCatalog
+from pitchProphet.data.fbref.raw_io import parse_raw_name, read_raw_matches
+
+TABLES = ("MatchInfo", "HomeStat", "AwayStat")
+STAT_TABLES = ("HomeStat", "AwayStat")
+INDEX_COLUMNS = ["match_week", "file_week"]
+# partitions of an older layout are rebuilt by sync
+LAYOUT = "stat-column-tables"
+
+
+class MatchStore:
+    """
+    Class for reading and writing the partitioned columnar match store.
+
+    Attributes:
+        store_dir (Path): Root directory of the partitions.
+        complib (str): PyTables compression library.
+        complevel (int): Compression level, 0 disables compression.
+
+    Methods:
+        sync(raw_dir: Path) -> list:
+            Rebuilds the partitions whose raw files changed.
+
+        write_partition(league: str, season: str, raw_files: list) -> Path:
+            Converts the raw files of one league season into a partition.
+
+        read(leagues, seasons, where, columns) -> dict:
+            Returns the MatchInfo/HomeStat/AwayStat frames matching the filters
+            and the league of each match.
+    """
+
+    def __init__(self, store_dir: Path, complib: str = "blosc", complevel: int = 5):
+        self.store_dir = Path(store_dir)
+        self.complib = complib
+        self.complevel = complevel
+
+    @classmethod
+    def from_config(cls, config: dict, raw_dir: Path) -> Optional["MatchStore"]:
+        """store kept next to the raw files of raw_dir, None if disabled"""
+        store_config = config["processing"].get("raw_store", {})
+        if not store_config.get("enabled", False):
+            return None
+        return cls(
+            Path(raw_dir) / "store",
+            store_config.get("complib", "blosc"),
+            store_config.get("complevel", 5),
+        )
+
+    def partitions(self) -> List[tuple]:
+        """(league, season) of every partition, in file name order"""
+        return sorted((p.parent.name, p.stem) for p in self.store_dir.glob("*/*.h5"))
+
+    def _partition_path(self, league: str, season: str) -> Path:
+        return self.store_dir / league / f"{season}.h5"
+
+    def sync(self, raw_dir: Path) -> List[tuple]:
+        """rebuild partitions that are missing or older than their raw files"""
+        with RawCatalog(raw_dir) as catalog:
+            mtimes = defaultdict(dict)
+            for entry in catalog.entries():
+                if entry["league"] is None:
+                    print(
+                        f"Warning: skipping raw file with unknown name {entry['name']}"
+                    )
+                    continue
+                partition = (entry["league"], entry["season"])
+                mtimes[partition][entry["name"]] = entry["mtime_ns"] / 1e9
+
+            rebuilt = []
+            for league, season in sorted(mtimes):
+                # files holding only duplicate matches are left out
+                raw_files = catalog.select(league=league, season=season)
+                path = self._partition_path(league, season)
+                names = [Path(f).name for f in raw_files]
+                if path.exists() and self._sources(path) == names:
+                    newest = max(mtimes[(league, season)].values())
+                    if newest <= os.path.getmtime(path):
+                        continue
+                self.write_partition(league, season, raw_files)
+                rebuilt.append((league, season))
+        return rebuilt
+
+    def _sources(self, path: Path) -> Optional[List[str]]:
+        """raw file names a partition was built from, None for an old layout"""
+        with pd.HDFStore(path, mode="r") as store:
+            attrs = store.get_storer("MatchInfo").attrs
+            if getattr(attrs, "layout", None) != LAYOUT:
+                return None
+            return list(attrs.sources)
+
+    def write_partition(self, league: str, season: str, raw_files: List[str]) -> Path:
+        """convert the raw files of a league season into one partition"""
+        records, file_weeks = [], []
+        for raw_file in raw_files:
+            file_week = parse_raw_name(raw_file)[2]
+            for record in read_raw_matches(raw_file):
+                records.append({k: record[k] for k in TABLES})
+                file_weeks.append(file_week)
+
+        path = self._partition_path(league, season)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.unlink(missing_ok=True)
+        with pd.HDFStore(
+            tmp_path, mode="w", complib=self.complib, complevel=self.complevel
+        ) as store:
+            match_weeks, stats = None, {}
+            for table in TABLES:
+                df = pd.json_normalize(records, record_path=table)
+                if match_weeks is None:
+                    match_weeks = df["Matchweek"].to_numpy()
+                if table in STAT_TABLES:
+                    stats[table] = df
+                    continue
+                df.insert(0, "match_week", match_weeks)
+                df.insert(1, "file_week", file_weeks)
+                # string columns are cast explicitly, mixed object columns
+                # cannot be stored in a table
+                for col in df.columns[df.dtypes == object]:
+                    df[col] = df[col].astype(str)
+                store.put(
+                    table,
+                    df,
+                    format="table",
+                    data_columns=INDEX_COLUMNS,
+                    index=False,
+                )
+                store.create_table_index(table, columns=INDEX_COLUMNS, optlevel=6)
+            attrs = store.get_storer("MatchInfo").attrs
+            attrs.sources = [Path(f).name for f in raw_files]
+            attrs.layout = LAYOUT
+        self._write_stat_columns(tmp_path, stats)
+        os.replace(tmp_path, path)
+        print(f"Stored {len(records)} matches of {league} {season} in {path}")
+        return path
+
+    def _write_stat_columns(self, path: Path, stats: Dict[str, pd.DataFrame]) -> None:
+        """one compressed array per stat column, reads open only the columns
+        asked for"""
+        filters = tables.Filters(complib=self.complib, complevel=self.complevel)
+        with tables.open_file(path, mode="a") as h5:
+            for table, df in stats.items():
+                group = h5.create_group("/", table)
+                group._v_attrs.columns = list(df.columns)
+                for i, column in enumerate(df.columns):
+                    values = df[column].to_numpy()
+                    # strings are stored utf-8 encoded
+                    if values.dtype == object:
+                        values = np.char.encode(values.astype(str), "utf-8")
+                    h5.create_carray(group, f"c{i}", obj=values, filters=filters)
+
+    def read(
+        self,
+        leagues: Optional[List[str]] = None,
+        seasons: Optional[List[str]] = None,
+        where: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+    ) -> Dict[str, pd.DataFrame]:
+        """read MatchInfo/HomeStat/AwayStat across the selected partitions,
+        and League, the partition league of every MatchInfo row.
+
+        where is a PyTables condition on match_week/file_week, e.g.
+        "file_week == 5"; columns restricts the HomeStat/AwayStat columns."""
+        frames = {table: [] for table in TABLES}
+        match_leagues = []
+        for league, season in self.partitions():
+            if leagues and league not in leagues:
+                continue
+            if seasons and season not in seasons:
+                continue
+            path = self._partition_path(league, season)
+            with pd.HDFStore(path, mode="r") as store:
+                if where is None:
+                    match_info, rows = store.select("MatchInfo"), slice(None)
+                else:
+                    # the rows of the condition, looked up on the index columns
+                    rows = store.select_as_coordinates("MatchInfo", where=where)
+                    rows = rows.to_numpy()
+                    # no coordinates would select every row
+                    selection = {"where": rows} if len(rows) else {"stop": 0}
+                    match_info = store.select("MatchInfo", **selection)
+            frames["MatchInfo"].append(match_info)
+            match_leagues += [league] * len(match_info)
+
+            with tables.open_file(path, mode="r") as h5:
+                for table in STAT_TABLES:
+                    group = h5.get_node("/", table)
+                    stored = list(group._v_attrs.columns)
+                    names = stored if columns is None else columns
+                    data = {}
+                    for name in names:
+                        if name not in stored:
+                            continue
+                        values = h5.get_node(group, f"c{stored.index(name)}")[rows]
+                        if values.dtype.kind == "S":
+                            values = np.char.decode(values, "utf-8").astype(object)
+                        data[name] = values
+                    frames[table].append(
+                        pd.DataFrame(data, index=match_info.index, columns=list(data))
+                    )
+
+        result = {}
+        for table, dfs in frames.items():
+            df = pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+            result[table] = df.drop(columns=INDEX_COLUMNS, errors="ignore")
+        result["League"] = pd.Series(match_leagues, dtype=object)
+        return result
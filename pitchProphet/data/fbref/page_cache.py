@@ -0,0 +1,218 @@
+"""
+Persistent on-disk cache for pages fetched from FBref.
+
+Page bodies are stored content-addressed (sha256 of the body) under blobs/,
+optionally gzip compressed, and an sqlite index maps each URL to its blob along
+with fetch time, last access time and the ETag/Last-Modified validators.
+Every URL gets a TTL from the first matching rule in config; expired entries
+are revalidated with a conditional request and the least recently used entries
+are evicted once the cache grows past its size limit.
+"""
+
+import gzip
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class PageCache:
+    """
+    Class for caching raw page content on disk.
+
+    Attributes:
+        cache_dir (Path): Directory holding the blobs and the sqlite index.
+        max_size (int): Maximum total size of stored blobs in bytes.
+        compress (bool): Whether blobs are gzip compressed.
+        ttl_rules (list): Ordered [{"pattern": str, "seconds": int | None}] rules,
+            None meaning the page never expires.
+        default_ttl (int | None): TTL used when no rule matches.
+
+    Methods:
+        lookup(url: str) -> dict | None:
+            Returns the cached content, validators and freshness for a URL.
+
+        store(url: str, content: bytes, headers: dict) -> None:
+            Stores a fetched page and evicts old entries if over the size limit.
+
+        refresh(url: str) -> None:
+            Marks a cached page as freshly validated (after a 304).
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_size_mb: float = 1024,
+        compress: bool = True,
+        ttl_rules: List[Dict] = None,
+        default_ttl: Optional[int] = 3600,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.compress = compress
+        self.ttl_rules = ttl_rules or []
+        self.default_ttl = default_ttl
+
+        (self.cache_dir / "blobs").mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            self.cache_dir / "index.sqlite", check_same_thread=False
+        )
+        with self._db:
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY, digest TEXT, fetched_at REAL,
+                    last_access REAL, etag TEXT, last_modified TEXT)"""
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS blobs (digest TEXT PRIMARY KEY, size INTEGER)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS pages_access ON pages (last_access)"
+            )
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["PageCache"]:
+        """build the cache from the full config, None if caching is disabled"""
+        cache_config = config["scraper"].get("cache", {})
+        if not cache_config.get("enabled", False):
+            return None
+        paths = config["global"]["paths"]
+        return cls(
+            Path(paths["root_dir"]) / Path(paths["cache_dir"]),
+            max_size_mb=cache_config.get("max_size_mb", 1024),
+            compress=cache_config.get("compress", True),
+            ttl_rules=cache_config.get("ttl", []),
+            default_ttl=cache_config.get("default_ttl", 3600),
+        )
+
+    def ttl_for(self, url: str) -> Optional[int]:
+        """seconds a page stays fresh, first matching rule wins"""
+        for rule in self.ttl_rules:
+            if rule["pattern"] in url:
+                return rule["seconds"]
+        return self.default_ttl
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """cached content and validators for a url, None on a miss"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest, fetched_at, etag, last_modified FROM pages WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            digest, fetched_at, etag, last_modified = row
+            try:
+                content = self._read_blob(digest)
+            except FileNotFoundError:
+                self._db.execute("DELETE FROM pages WHERE url = ?", (url,))
+                self._db.commit()
+                return None
+            self._db.execute(
+                "UPDATE pages SET last_access = ? WHERE url = ?", (time.time(), url)
+            )
+            self._db.commit()
+
+        ttl = self.ttl_for(url)
+        return {
+            "content": content,
+            "fresh": ttl is None or time.time() - fetched_at < ttl,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+
+    def store(self, url: str, content: bytes, headers: Dict = None) -> None:
+        """store a fetched page, evicting least recently used pages if needed"""
+        headers = headers or {}
+        digest = hashlib.sha256(content).hexdigest()
+        now = time.time()
+        with self._lock:
+            previous = self._db.execute(
+                "SELECT digest FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if not self._blob_path(digest).exists():
+                size = self._write_blob(digest, content)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO blobs VALUES (?, ?)", (digest, size)
+                )
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    digest,
+                    now,
+                    now,
+                    headers.get("ETag"),
+                    headers.get("Last-Modified"),
+                ),
+            )
+            if previous is not None and previous[0] != digest:
+                self._drop_blob_if_orphaned(previous[0])
+            self._evict()
+            self._db.commit()
+
+    def refresh(self, url: str) -> None:
+        """restart the ttl of a page that revalidated as unchanged"""
+        with self._lock:
+            now = time.time()
+            self._db.execute(
+                "UPDATE pages SET fetched_at = ?, last_access = ? WHERE url = ?",
+                (now, now, url),
+            )
+            self._db.commit()
+
+    def size(self) -> int:
+        """total size of stored blobs in bytes"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM blobs"
+            ).fetchone()[0]
+
+    def _evict(self) -> None:
+        """drop least recently used pages and orphaned blobs until under max_size"""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[
+            0
+        ]
+        if total <= self.max_size:
+            return
+        for url, digest in self._db.execute(
+            "SELECT url, digest FROM pages ORDER BY last_access"
+        ).fetchall():
+            self._db.execute("DELETE FROM pages WHERE url = ?", (url,))
+            total -= self._drop_blob_if_orphaned(digest)
+            if total <= self.max_size:
+                break
+
+    def _drop_blob_if_orphaned(self, digest: str) -> int:
+        """delete a blob no page points to anymore, returns the bytes freed"""
+        shared = self._db.execute(
+            "SELECT 1 FROM pages WHERE digest = ? LIMIT 1", (digest,)
+        ).fetchone()
+        row = self._db.execute(
+            "SELECT size FROM blobs WHERE digest = ?", (digest,)
+        ).fetchone()
+        if shared is not None or row is None:
+            return 0
+        self._db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+        self._blob_path(digest).unlink(missing_ok=True)
+        return row[0]
+
+    def _blob_path(self, digest: str) -> Path:
+        suffix = ".gz" if self.compress else ""
+        return self.cache_dir / "blobs" / digest[:2] / f"{digest}{suffix}"
+
+    def _write_blob(self, digest: str, content: bytes) -> int:
+        path = self._blob_path(digest)
+        path.parent.mkdir(exist_ok=True)
+        data = gzip.compress(content, compresslevel=6) if self.compress else content
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        return len(data)
+
+    def _read_blob(self, digest: str) -> bytes:
+        data = self._blob_path(digest).read_bytes()
+        return gzip.decompress(data) if self.compress else data
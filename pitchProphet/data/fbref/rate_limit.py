@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+import warnings
+
+
+def requests_per_minute(rate_limit: dict) -> float:
+    """request budget of a rate_limit config section. The deprecated
+    sleep_range (seconds slept between requests) maps to the same mean rate"""
+    if "sleep_range" not in rate_limit:
+        return rate_limit.get("requests_per_minute", 6)
+    if "requests_per_minute" in rate_limit:
+        warnings.warn(
+            "scraper.rate_limit.sleep_range is deprecated and ignored, "
+            "requests_per_minute is used",
+            FutureWarning,
+            stacklevel=3,
+        )
+        return rate_limit["requests_per_minute"]
+
+    low, high = rate_limit["sleep_range"]
+    per_minute = 60 / ((low + high) / 2)
+    warnings.warn(
+        f"scraper.rate_limit.sleep_range is deprecated, use "
+        f"requests_per_minute: {per_minute:g} instead",
+        FutureWarning,
+        stacklevel=3,
+    )
+    return per_minute
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by everything that talks to one host.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Callers
+    reserve a token and wait only as long as needed for it to become available,
+    so the long run request rate never exceeds the budget while no time is lost
+    sleeping when budget is left. Reservations may run the bucket negative,
+    which queues callers in arrival order.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        capacity (int): Maximum burst of back-to-back requests.
+
+    Methods:
+        acquire() -> None:
+            Blocks the calling thread until a token is available.
+
+        acquire_async() -> None:
+            Awaits until a token is available without blocking the event loop.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, rate_limit: dict) -> "TokenBucket":
+        """build from the scraper rate_limit config section"""
+        return cls(requests_per_minute(rate_limit) / 60, rate_limit.get("burst", 1))
+
+    def set_rate(self, rate: float) -> None:
+        """change the refill rate, tokens earned so far are kept"""
+        with self._lock:
+            self._refill()
+            self.rate = rate
+
+    def pause(self, seconds: float) -> None:
+        """make every caller wait at least `seconds` before the next request"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self) -> float:
+        """take a token and return how many seconds to wait before using it"""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
@@ -0,0 +1,287 @@
+"""
+Catalog of the raw match files of a directory.
+
+An sqlite index (raw_dir/manifests/catalog.sqlite) records for every raw file
+its league, season and file match week (parsed from the file name), the range
+of match weeks it holds, its match count, the ids of its matches and the hash
+of its content. RawMatchWriter adds each file as it is finalized, so
+selecting files by league/season/match week is an indexed lookup instead of a
+glob with substring matching (which also confused week 1 with weeks 10-19).
+
+Files are returned in match order, by league, season and match week (a
+name sort would put week 10 before week 2). Files copied or deleted by hand
+are picked up by refresh, which lists and checks the directory again only
+when the directory's mtime changed since the last look. Files rewritten in
+place do not change it, so lookups also check the size and mtime of just the
+files they return and catalogue changed ones again.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from pitchProphet.data.fbref.raw_io import (
+    find_raw_files,
+    parse_raw_name,
+    read_raw_matches,
+)
+
+MATCH_ID = re.compile(r"/en/matches/([0-9a-f]+)/")
+# chronological order of the files of a league season
+FILE_ORDER = "ORDER BY league, season, file_week, min_week, name"
+
+
+def match_id(record: Dict) -> str:
+    """fbref id of a match record, a hash of its MatchInfo for older records"""
+    found = MATCH_ID.search(record.get("MatchLink") or "")
+    if found is not None:
+        return found.group(1)
+    match_info = json.dumps(record["MatchInfo"], sort_keys=True).encode()
+    return hashlib.sha1(match_info).hexdigest()[:16]
+
+
+class RawCatalog:
+    """
+    Class for indexing and selecting raw match files.
+
+    Attributes:
+        raw_dir (Path): Directory of the raw files.
+        auto_refresh (bool): Whether lookups refresh the catalog first, off
+            for readers of a catalog another process keeps in sync.
+
+    Methods:
+        add(path: Path) -> None:
+            Records (or updates) one raw file in the catalog.
+
+        refresh() -> None:
+            Syncs the catalog with the directory if it changed.
+
+        select(league, season, match_week, skip_duplicates) -> list:
+            Returns the paths of the matching raw files in match order.
+
+        entries() -> list:
+            Returns every catalogued file with its metadata.
+
+        match_files(ids: list) -> dict:
+            Returns the path of a raw file holding each known match id.
+    """
+
+    def __init__(self, raw_dir: Path, auto_refresh: bool = True):
+        self.raw_dir = Path(raw_dir)
+        self.auto_refresh = auto_refresh
+        catalog_dir = self.raw_dir / "manifests"
+        catalog_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            catalog_dir / "catalog.sqlite", check_same_thread=False, timeout=30
+        )
+        with self._db:
+            self._db.execute(
+                """CREATE TABLE IF NOT EXISTS files (
+                    name TEXT PRIMARY KEY, league TEXT, season TEXT,
+                    file_week INTEGER, min_week INTEGER, max_week INTEGER,
+                    n_matches INTEGER, digest TEXT, size INTEGER, mtime_ns INTEGER)"""
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS matches (match_id TEXT, name TEXT)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS files_key ON files (league, season, file_week)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS matches_name ON matches (name)"
+            )
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> "RawCatalog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def add(self, path: Path) -> None:
+        """record a raw file with its weeks, match ids and content hash"""
+        path = Path(path)
+        ids, weeks = [], []
+        for record in read_raw_matches(path):
+            ids.append(match_id(record))
+            weeks.append(record["MatchInfo"][0].get("Matchweek"))
+        weeks = [w for w in weeks if w is not None]
+        league, season, file_week = parse_raw_name(path) or (None, None, None)
+
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        stat = path.stat()
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM matches WHERE name = ?", (path.name,))
+            self._db.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    path.name,
+                    league,
+                    season,
+                    file_week,
+                    min(weeks, default=None),
+                    max(weeks, default=None),
+                    len(ids),
+                    digest,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                ),
+            )
+            self._db.executemany(
+                "INSERT INTO matches VALUES (?, ?)", [(i, path.name) for i in ids]
+            )
+
+    def refresh(self) -> None:
+        """add new or changed files and drop deleted ones, if the directory
+        changed since the last refresh"""
+        dir_mtime = str(os.stat(self.raw_dir).st_mtime_ns)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM meta WHERE key = 'dir_mtime'"
+            ).fetchone()
+        if row is not None and row[0] == dir_mtime:
+            return
+        with self._lock:
+            known = [n for (n,) in self._db.execute("SELECT name FROM files")]
+        on_disk = [Path(f).name for f in find_raw_files(self.raw_dir)]
+        self._check(set(known) | set(on_disk))
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('dir_mtime', ?)", (dir_mtime,)
+            )
+
+    def _check(self, names: Iterable[str]) -> bool:
+        """catalogue the named files again if their size or mtime changed,
+        drop the ones that are gone. Returns whether any file changed"""
+        names = list(names)
+        if not names:
+            return False
+        with self._lock:
+            known = {}
+            for start in range(0, len(names), 500):
+                chunk = names[start : start + 500]
+                marks = ", ".join("?" * len(chunk))
+                for name, size, mtime_ns in self._db.execute(
+                    f"SELECT name, size, mtime_ns FROM files WHERE name IN ({marks})",
+                    chunk,
+                ):
+                    known[name] = (size, mtime_ns)
+
+        changed, gone = False, []
+        for name in names:
+            try:
+                stat = (self.raw_dir / name).stat()
+            except FileNotFoundError:
+                if name in known:
+                    gone.append(name)
+                continue
+            if known.get(name) != (stat.st_size, stat.st_mtime_ns):
+                self.add(self.raw_dir / name)
+                changed = True
+        with self._lock, self._db:
+            for name in gone:
+                self._db.execute("DELETE FROM files WHERE name = ?", (name,))
+                self._db.execute("DELETE FROM matches WHERE name = ?", (name,))
+        return changed or bool(gone)
+
+    def entries(self) -> List[Dict]:
+        """every catalogued file with its metadata, in match order"""
+        if self.auto_refresh:
+            self.refresh()
+            with self._lock:
+                names = [n for (n,) in self._db.execute("SELECT name FROM files")]
+            self._check(names)
+        with self._lock:
+            cursor = self._db.execute(f"SELECT * FROM files {FILE_ORDER}")
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor]
+
+    def match_files(self, ids: Iterable[str]) -> Dict[str, str]:
+        """path of the first raw file (in match order) holding each match id,
+        unknown ids are left out"""
+        ids = list(dict.fromkeys(ids))
+        if self.auto_refresh:
+            self.refresh()
+        found = self._match_files(ids)
+        # files rewritten in place are only noticed when they are looked up
+        if self.auto_refresh and self._check({Path(f).name for f in found.values()}):
+            found = self._match_files(ids)
+        return found
+
+    def _match_files(self, ids: List[str]) -> Dict[str, str]:
+        found = {}
+        with self._lock:
+            # sqlite limits the number of parameters of a query
+            for start in range(0, len(ids), 500):
+                chunk = ids[start : start + 500]
+                marks = ", ".join("?" * len(chunk))
+                for match, name in self._db.execute(
+                    "SELECT match_id, name FROM matches JOIN files USING (name)"
+                    f" WHERE match_id IN ({marks}) {FILE_ORDER}",
+                    chunk,
+                ):
+                    found.setdefault(match, str(self.raw_dir / name))
+        return found
+
+    def select(
+        self,
+        league: Optional[str] = None,
+        season: Optional[str] = None,
+        match_week: Optional[int] = None,
+        skip_duplicates: bool = True,
+    ) -> List[str]:
+        """paths of the raw files matching the filters, in match order.
+
+        With skip_duplicates, files whose matches all appear in an earlier
+        selected file are left out."""
+        conditions, params = [], []
+        for column, value in (
+            ("league", league),
+            ("season", season),
+            ("file_week", match_week),
+        ):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if self.auto_refresh:
+            self.refresh()
+        query = "SELECT name FROM files"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        with self._lock:
+            names = [n for (n,) in self._db.execute(f"{query} {FILE_ORDER}", params)]
+        # files rewritten in place are only noticed when they are looked up
+        if self.auto_refresh and self._check(names):
+            with self._lock:
+                names = [
+                    n for (n,) in self._db.execute(f"{query} {FILE_ORDER}", params)
+                ]
+        with self._lock:
+            ids = {name: set() for name in names}
+            if skip_duplicates and names:
+                marks = ", ".join("?" * len(names))
+                for match, name in self._db.execute(
+                    f"SELECT match_id, name FROM matches WHERE name IN ({marks})", names
+                ):
+                    ids[name].add(match)
+
+        selected, seen = [], set()
+        for name in names:
+            if skip_duplicates and ids[name] and ids[name] <= seen:
+                print(f"Skipping {name}, it only holds matches already loaded")
+                continue
+            seen |= ids[name]
+            selected.append(str(self.raw_dir / name))
+        return selected
@@ -0,0 +1,224 @@
+"""
+Streaming storage for raw scraped matches.
+
+Matches are written as JSON lines, one compact record per match, appended and
+flushed as soon as each match is scraped. Records go to a .part file that is
+renamed to the usual {league}-{season}-match_week-{n}-matches-{n} name at every
+checkpoint, so a crash loses at most the record being written; leftover .part
+files are finalized by RawMatchWriter.recover on the next run. Files can be
+gzip or zstd compressed (zstd needs the optional `zstandard` package).
+
+read_raw_matches reads records one at a time from both these files and the
+older single-array .json files.
+"""
+
+import gzip
+import io
+import json
+import re
+import uuid
+import zlib
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+COMPRESSION_SUFFIX = {None: "", "none": "", "gzip": ".gz", "zstd": ".zst"}
+RAW_PATTERNS = ("*.json", "*.jsonl", "*.jsonl.gz", "*.jsonl.zst")
+RAW_NAME = re.compile(
+    r"^(?P<league>.+?)-(?P<season>\d{4}-\d{4})-match_week-(?P<week>\d+)"
+)
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "zstd compressed raw files need the zstandard package: pip install zstandard"
+        ) from e
+    return zstandard
+
+
+def scraped_raw_dir(paths: dict, inference: bool = False) -> Path:
+    """directory the scraper writes raw files to, from global.paths"""
+    key = "inf_raw_dir" if inference else "raw_dir"
+    return Path(paths["root_dir"]) / Path(paths[key])
+
+
+def training_raw_dir(paths: dict, player_data: bool = False) -> Path:
+    """directory LoadData reads the training raw files from, from global.paths"""
+    sub_dir = "team_and_player_data" if player_data else "team_data"
+    return Path(paths["root_dir"]) / Path(paths["raw_dir"]) / sub_dir
+
+
+def find_raw_files(raw_dir: Path) -> List[str]:
+    """all raw match files (json and jsonl, any compression) in a directory"""
+    files = []
+    for pattern in RAW_PATTERNS:
+        files.extend(str(p) for p in Path(raw_dir).glob(pattern))
+    return sorted(files)
+
+
+def parse_raw_name(raw_file: str) -> Optional[Tuple[str, str, int]]:
+    """(league, season, match week) from a raw file name, None if unknown"""
+    match = RAW_NAME.match(Path(raw_file).name)
+    if match is None:
+        return None
+    return match["league"], match["season"], int(match["week"])
+
+
+def _open_write(path: Path, compression: Optional[str]) -> IO[bytes]:
+    if compression == "gzip":
+        return gzip.open(path, "wb")
+    if compression == "zstd":
+        return _zstandard().ZstdCompressor().stream_writer(open(path, "wb"))
+    return open(path, "wb")
+
+
+def _open_read(path: Path) -> IO[bytes]:
+    name = Path(path).name.removesuffix(".part")
+    if name.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if name.endswith(".zst"):
+        reader = _zstandard().ZstdDecompressor().stream_reader(open(path, "rb"))
+        return io.BufferedReader(reader)
+    return open(path, "rb")
+
+
+def read_raw_matches(path: str) -> Iterator[Dict]:
+    """yield match records one by one from a raw file.
+
+    A truncated tail (the record being written when a scrape crashed) is
+    skipped."""
+    if str(path).endswith(".json"):
+        with open(path, "r") as f:
+            yield from json.load(f)
+        return
+
+    truncated = (EOFError, OSError, zlib.error)
+    if str(path).removesuffix(".part").endswith(".zst"):
+        truncated += (_zstandard().ZstdError,)
+
+    with _open_read(path) as f:
+        try:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # only the last, partially written line can be broken
+                    return
+        except truncated:
+            return
+
+
+class RawMatchWriter:
+    """
+    Class for streaming scraped matches of a league season to disk.
+
+    Attributes:
+        output_path (Path): Raw data directory.
+        league (str): League name as in scraper[league_ids].
+        season (str): Season in 20XX-20XX format.
+        compression (str | None): None, "gzip" or "zstd".
+        catalog (RawCatalog | None): Catalog every finalized file is added to.
+
+    Methods:
+        write(match: dict) -> None:
+            Appends one match record and flushes it to disk.
+
+        close_part() -> Path | None:
+            Closes the current part and renames it to its final file name.
+
+        recover(output_path, league, season) -> list:
+            Finalizes .part files left behind by an interrupted run.
+    """
+
+    def __init__(
+        self,
+        output_path: Path,
+        league: str,
+        season: str,
+        compression: Optional[str] = None,
+        catalog=None,
+    ):
+        if compression not in COMPRESSION_SUFFIX:
+            raise ValueError(f"unknown raw file compression: {compression}")
+        self.output_path = Path(output_path)
+        self.league = league
+        self.season = season
+        self.compression = compression
+        self.catalog = catalog
+        self._file = None
+        self._part_path = None
+        self._count = 0
+        self._match_week = None
+
+    def write(self, match: Dict) -> None:
+        """append one compact record and flush it"""
+        if self._file is None:
+            self.output_path.mkdir(parents=True, exist_ok=True)
+            suffix = COMPRESSION_SUFFIX[self.compression]
+            self._part_path = self.output_path / (
+                f"{self.league}-{self.season}-{uuid.uuid4().hex[:8]}.jsonl{suffix}.part"
+            )
+            self._file = _open_write(self._part_path, self.compression)
+            self._count = 0
+
+        line = json.dumps(match, separators=(",", ":")) + "\n"
+        self._file.write(line.encode("utf-8"))
+        self._file.flush()
+        self._count += 1
+        self._match_week = match["MatchInfo"][0].get("Matchweek", None)
+
+    def close_part(self) -> Optional[Path]:
+        """close the current part and give it its final name"""
+        if self._file is None:
+            return None
+        self._file.close()
+        self._file = None
+        return self._finalize(self._part_path, self._match_week, self._count)
+
+    def _finalize(self, part_path: Path, match_week, count: int) -> Path:
+        """rename a part file to the usual name, never overwriting a file"""
+        suffix = COMPRESSION_SUFFIX[self.compression]
+        file_stem = (
+            f"{self.league}-{self.season}-match_week-{match_week}-matches-{count}"
+        )
+        output_file = self.output_path / f"{file_stem}.jsonl{suffix}"
+        part = 1
+        while output_file.exists():
+            part += 1
+            output_file = self.output_path / f"{file_stem}-part-{part}.jsonl{suffix}"
+        part_path.rename(output_file)
+        if self.catalog is not None:
+            self.catalog.add(output_file)
+        print(f"\nSaved {count} matches to {output_file}")
+        return output_file
+
+    @classmethod
+    def recover(
+        cls, output_path: Path, league: str, season: str, catalog=None
+    ) -> List[Tuple[Path, List[str]]]:
+        """finalize leftover part files of a league season.
+
+        Returns (file, match links) for every recovered file so the caller can
+        record them in its scrape manifest."""
+        recovered = []
+        for part_path in sorted(Path(output_path).glob(f"{league}-{season}-*.part")):
+            records = list(read_raw_matches(part_path))
+            if not records:
+                part_path.unlink()
+                continue
+            name = part_path.name.removesuffix(".part")
+            compression = next(
+                (c for c, s in COMPRESSION_SUFFIX.items() if s and name.endswith(s)),
+                None,
+            )
+
+            # rewrite the complete records, dropping any truncated tail
+            writer = cls(output_path, league, season, compression, catalog)
+            for record in records:
+                writer.write(record)
+            output_file = writer.close_part()
+            part_path.unlink()
+            recovered.append((output_file, [r.get("MatchLink") for r in records]))
+        return recovered
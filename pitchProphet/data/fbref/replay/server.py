@@ -0,0 +1,190 @@
+"""
+Record/replay harness for scraping without FBref.
+
+record_pages downloads pages once (through the usual HttpClient, so the rate
+limit is respected) into a directory of html files plus an index.json that maps
+url paths to files. ReplayServer serves such a directory, or pages built by
+synthetic_pages.synthetic_season, from a local HTTP server that can mimic a
+slow and throttling FBref:
+    1. latency: seconds slept before answering every request
+    2. throttle_rate: share of requests answered with 429 and Retry-After
+    3. bandwidth: bytes per second the response bodies are sent at
+
+Pointing scraper[base_url] at ReplayServer.url + "/en/comps" runs the unchanged
+scrapers against it.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+from pitchProphet.data.fbref.http_client import HttpClient
+
+CHUNK_SIZE = 16 * 1024
+
+
+def record_pages(urls: Iterable[str], out_dir: Path, client: HttpClient) -> Path:
+    """download pages once and save them for replay, returns the index path"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index_path = out_dir / "index.json"
+    index = {}
+    if index_path.exists():
+        with open(index_path, "r") as f:
+            index = json.load(f)
+
+    for url in urls:
+        path = urlsplit(url).path
+        if path in index:
+            continue
+        file_name = hashlib.sha1(path.encode()).hexdigest()[:16] + ".html"
+        (out_dir / file_name).write_bytes(client.get_content(url))
+        index[path] = file_name
+        # keep the index usable if recording is interrupted
+        with open(index_path, "w") as f:
+            json.dump(index, f, indent=4)
+    return index_path
+
+
+def load_pages(pages_dir: Path) -> Dict[str, bytes]:
+    """url path -> page of a recorded directory"""
+    pages_dir = Path(pages_dir)
+    with open(pages_dir / "index.json", "r") as f:
+        index = json.load(f)
+    return {path: (pages_dir / name).read_bytes() for path, name in index.items()}
+
+
+class ReplayServer:
+    """
+    Class for serving recorded FBref pages from a local HTTP server.
+
+    Attributes:
+        pages (dict): Url path -> page content.
+        latency (float): Seconds slept before answering a request.
+        throttle_rate (float): Share of requests answered with 429.
+        retry_after (float): Retry-After sent with 429 responses.
+        bandwidth (float | None): Bytes per second for response bodies.
+        stats (dict): Counts of requests, throttled, not_found and bytes_sent.
+
+    Methods:
+        start() -> ReplayServer:
+            Starts serving in a background thread.
+
+        stop() -> None:
+            Shuts the server down.
+
+        url -> str:
+            Base url of the running server.
+    """
+
+    def __init__(
+        self,
+        pages: Dict[str, bytes],
+        latency: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1,
+        bandwidth: Optional[float] = None,
+        port: int = 0,
+        seed: int = 0,
+    ):
+        self.pages = pages
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.bandwidth = bandwidth
+        self.port = port
+        self.stats = {"requests": 0, "throttled": 0, "not_found": 0, "bytes_sent": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ReplayServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += n
+
+    def _throttle(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.throttle_rate
+
+    def _handler(self):
+        """request handler class bound to this server's pages and settings"""
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                replay._count("requests")
+                if replay.latency:
+                    time.sleep(replay.latency)
+
+                if replay._throttle():
+                    replay._count("throttled")
+                    self._send(429, b"", {"Retry-After": str(replay.retry_after)})
+                    return
+
+                content = replay.pages.get(urlsplit(self.path).path)
+                if content is None:
+                    replay._count("not_found")
+                    self._send(404, b"not found")
+                    return
+
+                etag = '"' + hashlib.sha1(content).hexdigest()[:16] + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    self._send(304, b"", {"ETag": etag})
+                    return
+                self._send(200, content, {"ETag": etag})
+
+            def _send(self, status, body, headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+
+                # pace the body to the configured bandwidth
+                for start in range(0, len(body), CHUNK_SIZE):
+                    chunk = body[start : start + CHUNK_SIZE]
+                    self.wfile.write(chunk)
+                    replay._count("bytes_sent", len(chunk))
+                    if replay.bandwidth:
+                        time.sleep(len(chunk) / replay.bandwidth)
+
+            def log_message(self, format, *args):
+                # keep benchmark and test output quiet
+                pass
+
+        return Handler
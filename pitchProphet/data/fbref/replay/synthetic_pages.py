@@ -0,0 +1,152 @@
+"""
+Synthetic FBref pages shaped like the real match report and schedule pages.
+
+Part of the replay tooling: synthetic_season is the stand-in season the replay
+server and the scraper benchmark serve when no recorded pages are at hand. The
+tests build their pages from the same functions.
+"""
+
+from typing import Dict, Optional, Sequence
+
+TEAMS = ["Arsenal", "Chelsea", "Everton", "Fulham", "Burnley", "Brighton"]
+TEAMS += ["Watford", "Leicester-City", "Newcastle-United", "Crystal-Palace"]
+
+SUMMARY_COLS = ["Player", "#", "Nation", "Pos", "Age", "Min", "Gls", "Ast", "PK"]
+SUMMARY_COLS += ["PKatt", "Sh", "SoT", "CrdY", "CrdR", "Touches", "Tkl", "Int"]
+SUMMARY_COLS += ["Blocks", "xG", "npxG", "xAG", "SCA", "GCA", "Cmp", "Att", "Cmp%"]
+SUMMARY_COLS += ["PrgP", "Carries", "PrgC", "Att", "Succ"]
+KEEPER_COLS = ["Player", "Nation", "Age", "Min", "SoTA", "GA", "Saves", "Save%"]
+
+
+def _table(table_id, columns, rows, footer=None):
+    over = f'<th colspan="{len(columns) - 1}"></th><th>Performance</th>'
+    head = "".join(f"<th>{c}</th>" for c in columns)
+    body = "".join(
+        "<tr>" + "".join(f"<td>{v}</td>" for v in row) + "</tr>" for row in rows
+    )
+    foot = ""
+    if footer is not None:
+        foot = (
+            "<tfoot><tr>" + "".join(f"<td>{v}</td>" for v in footer) + "</tr></tfoot>"
+        )
+    return (
+        f'<table id="{table_id}"><thead><tr>{over}</tr><tr>{head}</tr></thead>'
+        f"<tbody>{body}</tbody>{foot}</table>"
+    )
+
+
+def _summary(team_id, seed):
+    rows = []
+    for p in range(3):
+        stats = [seed + p + i for i in range(len(SUMMARY_COLS) - 5)]
+        rows.append([f"Player {team_id}{p}", p + 1, "eng ENG", "FW", "25-100"] + stats)
+    total = [sum(col) for col in zip(*[r[5:] for r in rows])]
+    total[-6] = 81.5  # Cmp%
+    footer = ["3 Players", "", "", "", ""] + [f"{v:,}" for v in total]
+    return _table(f"stats_{team_id}_summary", SUMMARY_COLS, rows, footer)
+
+
+def _keeper(team_id):
+    rows = [[f"Keeper {team_id}", "eng ENG", "30-001", 90, 4, 1, 3, 75.0]]
+    return _table(f"keeper_stats_{team_id}", KEEPER_COLS, rows)
+
+
+def _filler(table_id):
+    return _table(table_id, ["A", "B"], [[1, 2]])
+
+
+def match_page(
+    home="Arsenal",
+    away="Chelsea",
+    match_week=5,
+    score=(2, 1),
+    xg=(1.7, 0.9),
+    seed=1,
+):
+    """match report page with tables in the same order as on fbref"""
+    home_id, away_id = "18bb7c10", "cff3d9bb"
+    tables = [_filler("a"), _filler("b"), _filler("team_stats")]
+    for team_id, offset in ((home_id, 0), (away_id, 100)):
+        tables.append(_summary(team_id, seed + offset))
+        for kind in ("passing", "passing_types", "defense", "possession", "misc"):
+            tables.append(_filler(f"stats_{team_id}_{kind}"))
+        tables.append(_keeper(team_id))
+    tables.append(_filler("shots_all"))
+    return (
+        "<html><body>"
+        f"<div><a>Premier League</a> (Matchweek {match_week})</div>"
+        '<div class="scorebox">'
+        f'<div><strong><a href="/en/squads/{home_id}">{home}</a></strong>'
+        f'<div class="scores"><div class="score">{score[0]}</div>'
+        f'<div class="score_xg">{xg[0]}</div></div></div>'
+        f'<div><strong><a href="/en/squads/{away_id}">{away}</a></strong>'
+        f'<div class="scores"><div class="score">{score[1]}</div>'
+        f'<div class="score_xg">{xg[1]}</div></div></div>'
+        "</div>" + "".join(tables) + "</body></html>"
+    ).encode()
+
+
+def schedule_page(
+    league: str,
+    season: str,
+    n_matches: int,
+    n_played: Optional[int] = None,
+    postponed: Sequence[int] = (),
+) -> bytes:
+    """scores and fixtures page whose match report links follow fbref's.
+    Matches from n_played on, and the postponed ones, are upcoming and link a
+    head-to-head page"""
+    n_played = n_matches if n_played is None else n_played
+    rows = []
+    for i in range(n_matches):
+        home, away = _fixture(i)
+        if i < n_played and i not in postponed:
+            href = f"/en/matches/{i:08x}/{home}-{away}-{season}-{league}"
+            link = f'<a href="{href}">Match Report</a>'
+        else:
+            link = f'<a href="/en/stathead/matchup/{home}-vs-{away}">Head-to-Head</a>'
+        rows.append(
+            f"<tr><td>{i // 5 + 1}</td><td>{home}</td><td>{away}</td>"
+            f"<td>{link}</td></tr>"
+        )
+    return (
+        "<html><body>"
+        f'<a href="/en/comps/{league}">{league}</a>'
+        f'<table id="sched_{season}_1"><thead><tr><th>Wk</th><th>Home</th>'
+        "<th>Away</th><th>Match Report</th></tr></thead>"
+        f"<tbody>{''.join(rows)}</tbody></table></body></html>"
+    ).encode()
+
+
+def _fixture(i: int) -> tuple:
+    """home and away team of the i-th synthetic match"""
+    home = TEAMS[i % len(TEAMS)]
+    away = TEAMS[(i + 1 + i // len(TEAMS)) % len(TEAMS)]
+    if away == home:
+        away = TEAMS[(i + 1) % len(TEAMS)]
+    return home, away
+
+
+def synthetic_season(
+    league: str,
+    league_id: int,
+    season: str,
+    n_matches: int,
+    n_played: Optional[int] = None,
+    postponed: Sequence[int] = (),
+) -> Dict[str, bytes]:
+    """url path -> page for a schedule page and all of its match reports"""
+    schedule = (
+        f"/en/comps/{league_id}/{season}/schedule/{season}-{league}-Scores-and-Fixtures"
+    )
+    n_played = n_matches if n_played is None else n_played
+    pages = {schedule: schedule_page(league, season, n_matches, n_played, postponed)}
+    for i in range(n_played):
+        if i in postponed:
+            continue
+        home, away = _fixture(i)
+        path = f"/en/matches/{i:08x}/{home}-{away}-{season}-{league}"
+        pages[path] = match_page(
+            home, away, match_week=i // 5 + 1, score=(i % 3, i % 2), seed=i
+        )
+    return pages
@@ -0,0 +1,90 @@
+"""
+Parser for FBref scores and fixtures (schedule) pages.
+
+The page is fetched once and its schedule table (id sched_...) is read with
+lxml into one row per match: match week, date, home and away team, score and
+the match report link of matches that were played (None for upcoming
+matches, whose row links a head-to-head page instead). The same frame gives
+inference its fixtures, the scraper its match links and the scrape planner
+the link of each fixture. Columns are found by their header, so spacer and
+repeated header rows in the body are skipped, and columns a page does not
+have (Date, Score) are left empty. A table without the Wk, Home or Away
+columns is not a schedule and raises a ValueError.
+"""
+
+from typing import Optional
+from urllib.parse import urlsplit
+
+import lxml.html
+import pandas as pd
+
+from pitchProphet.data.fbref.http_client import HttpClient
+from pitchProphet.data.fbref.match_parser import row_cells
+from pitchProphet.data.fbref.raw_catalog import MATCH_ID
+
+SCHEDULE_COLUMNS = ["Wk", "Date", "Home", "Away", "Score", "MatchLink"]
+REQUIRED_COLUMNS = ["Wk", "Home", "Away"]
+
+
+def parse_schedule(content: bytes, host: str = "") -> pd.DataFrame:
+    """rows of a schedule page in page order, match links made absolute with
+    host"""
+    # decoded first, lxml falls back to latin-1 for pages without a charset
+    # and team names carry accents
+    tree = lxml.html.fromstring(content.decode("utf-8", errors="replace"))
+    tables = [t for t in tree.iter("table") if t.get("id", "").startswith("sched_")]
+    if not tables:
+        raise ValueError("no schedule table found")
+    table = tables[0]
+    header = row_cells(table.xpath(".//thead/tr")[-1])
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise ValueError(f"schedule table is missing columns {missing}")
+    position = {
+        name: header.index(name)
+        for name in ("Wk", "Date", "Home", "Away", "Score")
+        if name in header
+    }
+
+    rows = []
+    for tr in table.xpath(".//tbody/tr"):
+        cells = row_cells(tr)
+        if len(cells) < len(header) or cells[position["Home"]] in ("", "Home"):
+            continue
+        row = {name: cells[i] or None for name, i in position.items()}
+        row["Wk"] = _week(cells[position["Wk"]])
+        row["MatchLink"] = _match_link(tr, host)
+        rows.append(row)
+
+    schedule = pd.DataFrame(rows, columns=SCHEDULE_COLUMNS)
+    schedule["Date"] = pd.to_datetime(schedule["Date"], errors="coerce")
+    return schedule.astype({"Wk": "Int64"})
+
+
+def fetch_schedule(url: str, client: HttpClient) -> pd.DataFrame:
+    """fetch and parse a schedule page, links made absolute with its host"""
+    parts = urlsplit(url)
+    return parse_schedule(client.get_content(url), f"{parts.scheme}://{parts.netloc}")
+
+
+def week_fixtures(schedule: pd.DataFrame, match_week: int) -> pd.DataFrame:
+    """home and away teams of a match week's fixtures"""
+    in_week = schedule["Wk"].eq(match_week).fillna(False).astype(bool)
+    fixtures = schedule.loc[in_week, ["Home", "Away"]]
+    fixtures = fixtures.reset_index(drop=True)
+    fixtures.name = f"Matchweek {match_week}"
+    return fixtures
+
+
+def _week(text: str) -> Optional[int]:
+    return int(text) if text.isdigit() else None
+
+
+def _match_link(row: lxml.html.HtmlElement, host: str) -> Optional[str]:
+    """match report link of a row, None if the match was not played"""
+    # the date cell links /en/matches/<date>, a page of all matches that day,
+    # a match report link has the match id
+    for href in row.xpath(".//a/@href"):
+        if MATCH_ID.search(href) is not None:
+            return host + href
+    return None
@@ -0,0 +1,95 @@
+"""
+Team-scoped scrape plan for inference.
+
+Inference only needs, for every team playing the next match week, its
+last_n_match most recent completed matches. The planner reads them off the
+season's schedule instead of taking the last 100 matches: the teams of the
+upcoming fixtures (given, or the first match week with unplayed matches that
+is not only left with postponed ones) each get their last n played matches,
+and matches between two of those teams are planned once. The scraper then
+fetches only the planned pages that are not already in the raw data and saves
+the plan (raw_dir/manifests/plan-{league}.json), so LoadData reads the planned
+matches from the raw files that hold them.
+
+A team can have more than n matches in the plan, when an opponent's window
+(shifted back by a postponed match) holds an older match between the two;
+fixture statistics use each team's last n matches, so it does not replace
+one of the team's own.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import pandas as pd
+
+from pitchProphet.utils.team_registry import team_registry
+
+
+def upcoming_fixtures(
+    schedule: pd.DataFrame, match_week: Optional[int] = None
+) -> pd.DataFrame:
+    """fixtures of a match week, by default the first one with unplayed
+    matches that is not just left with postponed ones. Empty if the season is
+    over"""
+    if match_week is None:
+        played = schedule["MatchLink"].notna()
+        unplayed = (~played).groupby(schedule["Wk"]).mean()
+        upcoming = unplayed > 0
+        if played.any():
+            # a mostly played week before the last week with a played match is
+            # over, its unplayed matches were postponed
+            over = (unplayed < 0.5) & (unplayed.index < schedule["Wk"][played].max())
+            upcoming &= ~over
+        if not upcoming.any():
+            return schedule.iloc[:0]
+        match_week = unplayed.index[upcoming].min()
+    return schedule[schedule["Wk"].eq(match_week).fillna(False).astype(bool)]
+
+
+def plan_team_matches(
+    schedule: pd.DataFrame,
+    teams: Iterable[str],
+    last_n_match: int,
+    league: Optional[str] = None,
+) -> List[str]:
+    """match links of each team's last n played matches, without duplicates,
+    in schedule order"""
+    registry = team_registry()
+    played = schedule[schedule["MatchLink"].notna()]
+    home = [registry.canonical(name, league) for name in played["Home"]]
+    away = [registry.canonical(name, league) for name in played["Away"]]
+    home = pd.Series(home, index=played.index)
+    away = pd.Series(away, index=played.index)
+
+    planned = set()
+    for team in {registry.canonical(name, league) for name in teams}:
+        rows = played.index[(home == team) | (away == team)]
+        if len(rows) < last_n_match:
+            print(f"Warning: {team} has {len(rows)} of {last_n_match} matches")
+        planned.update(rows[-last_n_match:])
+    return played.loc[sorted(planned), "MatchLink"].tolist()
+
+
+def plan_path(raw_dir: Path, league: str) -> Path:
+    return Path(raw_dir) / "manifests" / f"plan-{league}.json"
+
+
+def save_plan(raw_dir: Path, league: str, match_links: List[str]) -> None:
+    """write a league's latest plan atomically (tmp file + rename)"""
+    path = plan_path(raw_dir, league)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"league": league, "match_links": match_links}, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def load_plan(raw_dir: Path, league: str) -> Optional[List[str]]:
+    """match links of a league's latest plan, None if it was never planned"""
+    path = plan_path(raw_dir, league)
+    if not path.exists():
+        return None
+    with open(path, "r") as f:
+        return json.load(f)["match_links"]
@@ -0,0 +1,108 @@
+"""
+Aggregation kernels for last-n match statistics.
+
+Every kernel reduces a window array of shape (..., m, features), m matches in
+chronological order, to one value per feature, shape (..., features), so one
+call aggregates the windows of all teams (or matches) and all features at once.
+Kernels are registered by name and selected with processing.aggregation_methods
+in config.yaml; a method name becomes the suffix of its feature columns
+({feature}_{method}).
+
+Available: mean, sum, std (ddof=1, 0 for a single match), trend (least squares
+slope over match order, 0 for a single match), ewma (recency weighted mean,
+alpha 0.5), min, max, median and quantiles as q{percent} (e.g. q25, q75).
+"""
+
+import re
+from typing import Callable, Dict, Sequence
+
+import numpy as np
+
+Kernel = Callable[[np.ndarray], np.ndarray]
+
+AGGREGATIONS: Dict[str, Kernel] = {}
+EWMA_ALPHA = 0.5
+QUANTILE = re.compile(r"^q(\d{1,2})$")
+
+# statistics of the trained models, used when no methods are configured
+DEFAULT_METHODS = ("mean", "std", "trend")
+
+
+def aggregation(name: str) -> Callable[[Kernel], Kernel]:
+    """register a kernel under a method name"""
+
+    def register(kernel: Kernel) -> Kernel:
+        AGGREGATIONS[name] = kernel
+        return kernel
+
+    return register
+
+
+@aggregation("mean")
+def _mean(window: np.ndarray) -> np.ndarray:
+    return window.mean(axis=-2)
+
+
+@aggregation("sum")
+def _sum(window: np.ndarray) -> np.ndarray:
+    return window.sum(axis=-2)
+
+
+@aggregation("std")
+def _std(window: np.ndarray) -> np.ndarray:
+    if window.shape[-2] < 2:
+        return np.zeros(window.shape[:-2] + window.shape[-1:])
+    return window.std(axis=-2, ddof=1)
+
+
+@aggregation("trend")
+def _trend(window: np.ndarray) -> np.ndarray:
+    """closed-form least squares slope against x = 0..m-1"""
+    m = window.shape[-2]
+    if m < 2:
+        return np.zeros(window.shape[:-2] + window.shape[-1:])
+    x = np.arange(m, dtype=np.float64)
+    x -= x.mean()
+    return np.tensordot(window, x, axes=([-2], [0])) / (x**2).sum()
+
+
+@aggregation("ewma")
+def _ewma(window: np.ndarray) -> np.ndarray:
+    """exponentially weighted mean, the latest match weighted most"""
+    m = window.shape[-2]
+    weights = (1 - EWMA_ALPHA) ** np.arange(m - 1, -1, -1, dtype=np.float64)
+    return np.tensordot(window, weights / weights.sum(), axes=([-2], [0]))
+
+
+@aggregation("min")
+def _min(window: np.ndarray) -> np.ndarray:
+    return window.min(axis=-2)
+
+
+@aggregation("max")
+def _max(window: np.ndarray) -> np.ndarray:
+    return window.max(axis=-2)
+
+
+@aggregation("median")
+def _median(window: np.ndarray) -> np.ndarray:
+    return np.median(window, axis=-2)
+
+
+def get_aggregation(name: str) -> Kernel:
+    """kernel of a method name, q{percent} names build a quantile kernel"""
+    if name in AGGREGATIONS:
+        return AGGREGATIONS[name]
+    quantile = QUANTILE.match(name)
+    if quantile is not None:
+        q = int(quantile.group(1)) / 100
+        return lambda window: np.quantile(window, q, axis=-2)
+    raise ValueError(
+        f"unknown aggregation method '{name}', available: "
+        f"{', '.join(AGGREGATIONS)} and q<percent>"
+    )
+
+
+def aggregate(window: np.ndarray, methods: Sequence[str]) -> Dict[str, np.ndarray]:
+    """every configured statistic of a window array"""
+    return {name: get_aggregation(name)(window) for name in methods}
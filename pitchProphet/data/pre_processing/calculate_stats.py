@@ -1,8 +1,11 @@
-from typing import Dict
+from typing import Dict, Sequence
 
 import numpy as np
 import pandas as pd
 
+from pitchProphet.data.pre_processing.aggregations import DEFAULT_METHODS, aggregate
+from pitchProphet.utils.team_registry import team_registry
+
 
 class DescriptiveStats:
     """
@@ -16,6 +19,8 @@ class DescriptiveStats:
         last_n_match (int): Number of previous matches to consider to calculate
             descriptive statistics - such as mean, variance and slope.
         inference (bool): Whether to use the class for inference or training data.
+        aggregation_methods (list): Statistics to calculate for each feature,
+            see aggregations.py.
 
     Methods:
         process_home_away_features(row: pd.Series, inference=False) -> Dict[str, pd.Series]:
@@ -24,20 +29,40 @@ class DescriptiveStats:
             _get_last_n_data().
     """
 
-    def __init__(self, data: pd.DataFrame, last_n_match=5, inference=False):
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        last_n_match=5,
+        inference=False,
+        aggregation_methods: Sequence[str] = DEFAULT_METHODS,
+    ):
         self.data = data
         self.last_n_match = last_n_match
         self.inference = inference
+        self.aggregation_methods = list(aggregation_methods)
+
+        # teams of every match as registry ids, matched as integers. teams
+        # the registry does not know get local ids from this instance's map
+        self.registry = team_registry()
+        self._unknown = {}
+        match_info = self.data.loc["MatchInfo"]
+        self._home_ids = self.registry.ids(match_info["HomeTeam"], local=self._unknown)
+        self._away_ids = self.registry.ids(match_info["AwayTeam"], local=self._unknown)
+        self._home_id_of = dict(zip(match_info.index, self._home_ids))
 
     def _standardize_team_name(self, team_name: str) -> str:
         """standardizes team names to match between fixtures and match data."""
-        team_mapping = {
-            "Newcastle Utd": "Newcastle United",
-            "Nott'ham Forest": "Nottingham Forest",
-            "Manchester Utd": "Manchester United",
-            "Tottenham": "Tottenham Hotspur",
-        }
-        return team_mapping.get(team_name, team_name)
+        return self.registry.canonical(team_name)
+
+    def _team_indices(self, team_id: int, before=None) -> pd.Index:
+        """first last_n_match matches of a team before an index, without an
+        index (inference) the team's last last_n_match matches"""
+        match_index = self.data.loc["MatchInfo"].index
+        played = (self._home_ids == team_id) | (self._away_ids == team_id)
+        if before is None:
+            return match_index[played][-self.last_n_match :]
+        played &= match_index < before
+        return match_index[played][: self.last_n_match]
 
     def _get_last_n_data(self, row: pd.Series) -> Dict[str, pd.DataFrame]:
         """retrieves last n matches' home team features and away team features.
@@ -62,33 +87,12 @@ class DescriptiveStats:
         if current_idx is not None:
             print(f"Current index: {current_idx}")
 
-        # Get indices for matches where teams played
-        if self.inference:
-            # For inference, get the last n matches without index filtering
-            home_indices = match_info[
-                (match_info["HomeTeam"] == home_team)
-                | (match_info["AwayTeam"] == home_team)
-            ].index[: self.last_n_match]
-            away_indices = match_info[
-                (match_info["HomeTeam"] == away_team)
-                | (match_info["AwayTeam"] == away_team)
-            ].index[: self.last_n_match]
-        else:
-            # For training, get only matches before the current index
-            home_indices = match_info[
-                (
-                    (match_info["HomeTeam"] == home_team)
-                    | (match_info["AwayTeam"] == home_team)
-                )
-                & (match_info.index < current_idx)
-            ].index[: self.last_n_match]
-            away_indices = match_info[
-                (
-                    (match_info["HomeTeam"] == away_team)
-                    | (match_info["AwayTeam"] == away_team)
-                )
-                & (match_info.index < current_idx)
-            ].index[: self.last_n_match]
+        # Get indices for matches where teams played, for training only
+        # matches before the current index
+        home_id = self.registry.team_id(home_team, local=self._unknown)
+        away_id = self.registry.team_id(away_team, local=self._unknown)
+        home_indices = self._team_indices(home_id, current_idx)
+        away_indices = self._team_indices(away_id, current_idx)
 
         print(f"Found {len(home_indices)} matches for {home_team}")
         print(f"Found {len(away_indices)} matches for {away_team}")
@@ -97,7 +101,7 @@ class DescriptiveStats:
         home_data = pd.DataFrame()
         for idx in home_indices:
             match_slice = self.data.xs(idx, level=1)
-            if match_info.loc[idx, "HomeTeam"] == home_team:
+            if self._home_id_of[idx] == home_id:
                 stats = match_slice.loc["HomeStat"]
             else:
                 stats = match_slice.loc["AwayStat"]
@@ -107,7 +111,7 @@ class DescriptiveStats:
         away_data = pd.DataFrame()
         for idx in away_indices:
             match_slice = self.data.xs(idx, level=1)
-            if match_info.loc[idx, "HomeTeam"] == away_team:
+            if self._home_id_of[idx] == away_id:
                 stats = match_slice.loc["HomeStat"]
             else:
                 stats = match_slice.loc["AwayStat"]
@@ -132,28 +136,14 @@ class DescriptiveStats:
         except ValueError as e:
             print(f"Error converting column {col} to numeric: {str(e)}")
 
-        # calculate statistics for each numeric column
+        # calculate every statistic for all numeric columns at once
         stats_dict = {}
-        for col in numeric_cols:
-            try:
-                # get column data
-                col_data = numeric_data[col]
-
-                # basic statistics
-                stats_dict[f"{col}_mean"] = col_data.mean()
-                stats_dict[f"{col}_std"] = col_data.std() if len(col_data) > 1 else 0
-
-                # calculate slope (trend)
-                if len(col_data) > 1:
-                    x = np.arange(len(col_data))
-                    slope = np.polyfit(x, col_data, 1)[0]
-                    stats_dict[f"{col}_trend"] = slope
-                else:
-                    stats_dict[f"{col}_trend"] = 0
-
-            except Exception as e:
-                print(f"Error calculating statistics for column {col}: {str(e)}")
-                continue
+        if len(numeric_cols) and len(numeric_data):
+            values = numeric_data[numeric_cols].to_numpy(dtype=np.float64)
+            stats = aggregate(values, self.aggregation_methods)
+            for i, col in enumerate(numeric_cols):
+                for name in self.aggregation_methods:
+                    stats_dict[f"{col}_{name}"] = stats[name][i]
 
         if not stats_dict:
             print("Warning: No statistics could be calculated")
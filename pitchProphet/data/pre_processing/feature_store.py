@@ -0,0 +1,270 @@
+"""
+Persistent, incrementally updated store of last-n match statistics.
+
+A store keeps, for one dataset (training data, or a league's inference data):
+    1. the statistics of every match computed so far ({name}.h5, appendable
+       PyTables tables home_stats/away_stats holding all feature columns)
+    2. every team's timeline state, the number of matches it played and the
+       stats of its first and of its last last_n_match matches, with the
+       hashes of the matches processed so far ({name}.state.npz, replaced
+       atomically)
+
+FeatureStore.update takes all loaded matches and finds the stored ones by
+their hash, so the order the files were loaded in does not matter. When every
+stored match is still loaded and, for every team, the other loaded matches
+come after its stored ones, only those new matches are computed, continuing
+from the stored team state, and their rows are appended; a weekly update
+costs the new matches, not the history. Otherwise (stored matches were
+removed, older matches were added, or the window, methods or features
+changed) the store is rebuilt. Both give exactly what RollingStats gives over
+all matches. A league's inference store is rebuilt once a week, as the new
+week's raw file replaces the matches of the previous one.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from pitchProphet.data.pre_processing.aggregations import DEFAULT_METHODS
+from pitchProphet.data.pre_processing.match_frame import MatchFrame
+from pitchProphet.data.pre_processing.rolling_stats import (
+    RollingStats,
+    TeamWindows,
+    select_features,
+)
+
+SIDES = ("home_stats", "away_stats")
+
+
+def match_keys(frame: MatchFrame) -> np.ndarray:
+    """hash of every match's MatchInfo row, stable across loads"""
+    info = frame.info.reset_index(drop=True)
+    names = np.asarray(frame.teams, dtype=object)
+    info["HomeTeam"] = names[frame.home_team_ids()]
+    info["AwayTeam"] = names[frame.away_team_ids()]
+    # numbers are hashed as floats, int columns turn float when a value is NaN
+    for col in info.columns[info.dtypes != object]:
+        info[col] = info[col].astype(np.float64)
+    info = info[sorted(info.columns)]
+    return pd.util.hash_pandas_object(info, index=False).to_numpy()
+
+
+def _row_keys(keys: np.ndarray) -> pd.MultiIndex:
+    """match keys with their occurrence number, unique for repeated matches"""
+    occurrence = pd.Series(keys).groupby(keys).cumcount().to_numpy()
+    return pd.MultiIndex.from_arrays([keys, occurrence])
+
+
+def _select_rows(store: pd.HDFStore, side: str, rows=None) -> pd.DataFrame:
+    """rows of a stored table in the given order, reading only those rows"""
+    if rows is None:
+        return store.select(side)
+    rows = np.asarray(rows)
+    if len(rows) == 0:
+        return store.select(side, stop=0)
+    start, stop = int(rows.min()), int(rows.max()) + 1
+    if stop - start == len(rows):
+        # a range, e.g. all rows or the rows appended last
+        return store.select(side, start=start, stop=stop).iloc[rows - start]
+    coordinates = np.unique(rows)
+    selected = store.select(side, where=coordinates)
+    return selected.iloc[np.searchsorted(coordinates, rows)]
+
+
+class FeatureStore:
+    """
+    Class for keeping last-n match statistics up to date incrementally.
+
+    Attributes:
+        path (Path): HDF5 file of the match statistics, the team state is
+            kept next to it.
+        last_n_match (int): Number of previous matches the statistics use.
+        aggregation_methods (list): Statistics computed per feature.
+
+    Methods:
+        from_config(config: dict, name: str) -> FeatureStore | None:
+            Returns the store of a dataset, None if disabled in config.
+
+        update(frame: MatchFrame) -> dict:
+            Brings the store up to date with the loaded matches and returns
+            home and away team statistics for every match.
+
+        fixture_features(fixtures: pd.DataFrame) -> dict:
+            Returns home and away team statistics for upcoming fixtures.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        last_n_match: int = 5,
+        aggregation_methods: Sequence[str] = DEFAULT_METHODS,
+    ):
+        self.path = Path(path)
+        self.state_path = self.path.with_name(self.path.stem + ".state.npz")
+        self.last_n_match = last_n_match
+        self.aggregation_methods = list(aggregation_methods)
+        self._rolling = None
+
+    @classmethod
+    def from_config(
+        cls, config: dict, name: str, last_n_match: Optional[int] = None
+    ) -> Optional["FeatureStore"]:
+        """store {name} in processed_dir/features, None if disabled"""
+        processing = config["processing"]
+        if not processing.get("feature_store", {}).get("enabled", False):
+            return None
+        paths = config["global"]["paths"]
+        store_dir = Path(paths["root_dir"]) / Path(paths["processed_dir"]) / "features"
+        return cls(
+            store_dir / f"{name}.h5",
+            last_n_match or processing["last_n_match"],
+            processing.get("aggregation_methods") or DEFAULT_METHODS,
+        )
+
+    def _meta(self, features) -> str:
+        return json.dumps(
+            {
+                "last_n_match": self.last_n_match,
+                "aggregation_methods": self.aggregation_methods,
+                "features": list(features),
+            }
+        )
+
+    def _load_state(self, frame: MatchFrame):
+        """stored team state and the keys of the stored matches"""
+        if not (self.state_path.exists() and self.path.exists()):
+            return None
+        with np.load(self.state_path, allow_pickle=False) as saved:
+            # states written before the last matches were kept are rebuilt
+            if str(saved["meta"]) != self._meta(frame.features):
+                return None
+            if "recent" not in saved.files:
+                return None
+            stored_keys = saved["keys"]
+            state = TeamWindows(
+                saved["teams"].tolist(),
+                saved["n_played"],
+                saved["windows"],
+                frame.features,
+                saved["recent"],
+            )
+        # rows appended without their state (interrupted update) force a rebuild
+        with pd.HDFStore(self.path, mode="r") as store:
+            if any(store.get_storer(s).nrows != len(stored_keys) for s in SIDES):
+                return None
+        return state, stored_keys
+
+    def _store_rows(
+        self, frame: MatchFrame, keys: np.ndarray, stored_keys: np.ndarray
+    ) -> Optional[np.ndarray]:
+        """store row of every loaded match, -1 for matches not stored yet. None
+        if the stored state cannot be continued with the other matches"""
+        loaded, stored = _row_keys(keys), _row_keys(stored_keys)
+        rows = stored.get_indexer(loaded)
+        # every stored match is loaded, in the order it was stored
+        position = loaded.get_indexer(stored)
+        if (position < 0).any() or (np.diff(position) <= 0).any():
+            return None
+
+        # no team has a new match before one of its stored matches
+        new = rows < 0
+        teams = np.column_stack([frame.home_team_ids(), frame.away_team_ids()])
+        order = np.repeat(np.arange(len(frame)), 2)
+        last_stored = np.full(len(frame.teams), -1)
+        np.maximum.at(last_stored, teams[~new].ravel(), order[np.repeat(~new, 2)])
+        first_new = np.full(len(frame.teams), len(frame))
+        np.minimum.at(first_new, teams[new].ravel(), order[np.repeat(new, 2)])
+        if (first_new <= last_stored).any():
+            return None
+        return rows
+
+    def _save_state(self, frame: MatchFrame, keys: np.ndarray) -> None:
+        """replace the state file in one step, it commits the appended rows"""
+        state = self._rolling.team_windows()
+        tmp_path = self.state_path.with_name(self.state_path.name + ".tmp.npz")
+        np.savez(
+            tmp_path,
+            meta=np.array(self._meta(frame.features)),
+            keys=keys,
+            teams=np.array(state.teams, dtype=str),
+            n_played=state.n_played,
+            windows=state.windows,
+            recent=state.recent,
+        )
+        os.replace(tmp_path, self.state_path)
+
+    def update(self, frame: MatchFrame) -> Dict[str, pd.DataFrame]:
+        """compute the statistics of matches not in the store yet, append them
+        and return the statistics of all matches of the frame"""
+        keys = match_keys(frame)
+        state, rows = None, None
+        loaded = self._load_state(frame)
+        if loaded is not None:
+            state, stored_keys = loaded
+            rows = self._store_rows(frame, keys, stored_keys)
+        if rows is None:
+            state, stored_keys = None, keys[:0]
+            rows = np.full(len(frame), -1)
+        new = np.flatnonzero(rows < 0)
+        start = len(stored_keys)
+        if start == 0:
+            print(f"Building feature store {self.path.name} ({len(frame)} matches)")
+        else:
+            print(f"Updating feature store {self.path.name} ({len(new)} new)")
+
+        self._rolling = RollingStats(
+            frame.subset(new),
+            self.last_n_match,
+            False,
+            self.aggregation_methods,
+            state,
+        )
+        new_stats = self._rolling.match_features(all_features=True)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with pd.HDFStore(self.path, mode="a" if start else "w") as store:
+            for side in SIDES:
+                stats = new_stats[side].reset_index(drop=True)
+                stats.index += start
+                if len(stats):
+                    store.append(side, stats, index=False)
+        rows[new] = start + np.arange(len(new))
+        self._save_state(frame, np.concatenate([stored_keys, keys[new]]))
+        return self.match_features(frame.info.index, rows)
+
+    def match_features(self, index=None, rows=None) -> Dict[str, pd.DataFrame]:
+        """stored statistics of the matches at rows (all, in store order, by
+        default), with the columns RollingStats would return over them"""
+        features = list(json.loads(self._meta_saved())["features"])
+        stats = {}
+        with pd.HDFStore(self.path, mode="r") as store:
+            for side in SIDES:
+                # nothing is written for a frame without matches
+                if side not in store:
+                    stats[side] = pd.DataFrame(index=index)
+                    continue
+                side_stats = _select_rows(store, side, rows)
+                side_stats = select_features(
+                    side_stats, features, self.aggregation_methods
+                )
+                if index is not None:
+                    side_stats.index = index
+                stats[side] = side_stats
+        return stats
+
+    def _meta_saved(self) -> str:
+        with np.load(self.state_path, allow_pickle=False) as saved:
+            return str(saved["meta"])
+
+    def fixture_features(
+        self, fixtures: pd.DataFrame, league: Optional[str] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """statistics for the Home and Away teams of fixtures, from the state
+        of the last update"""
+        if self._rolling is None:
+            raise RuntimeError("update the feature store before asking for fixtures")
+        return self._rolling.fixture_features(fixtures, league)
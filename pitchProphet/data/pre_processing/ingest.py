@@ -0,0 +1,123 @@
+"""
+Parallel, columnar ingestion of raw match files.
+
+Raw files are parsed in a process pool, one file per task. A worker streams the
+records of its file and appends every row of the MatchInfo/HomeStat/AwayStat
+tables straight into per-column lists, so no record dicts outlive their line;
+it returns one numpy array per column. The main process then allocates one
+buffer per column for all files and copies the arrays in, file order kept.
+
+The result matches pd.json_normalize(records, record_path=table) over all
+records: columns in order of first appearance, keys missing from a row are
+NaN, and a column's dtype is the common type of its values.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from pitchProphet.data.fbref.raw_io import read_raw_matches
+
+TABLES = ("MatchInfo", "HomeStat", "AwayStat")
+
+
+class _ColumnBuilder:
+    """rows of one table collected column by column"""
+
+    def __init__(self):
+        self.columns: Dict[str, list] = {}
+        self.n_rows = 0
+
+    def add(self, row: dict) -> None:
+        for key, value in row.items():
+            column = self.columns.get(key)
+            if column is None:
+                # key first seen now, earlier rows did not have it
+                column = self.columns[key] = [np.nan] * self.n_rows
+            column.append(value)
+        self.n_rows += 1
+        for column in self.columns.values():
+            if len(column) < self.n_rows:
+                column.append(np.nan)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {k: pd.Series(v).to_numpy() for k, v in self.columns.items()}
+
+
+def read_columns(path: str, tables: Sequence[str] = TABLES) -> Dict:
+    """column arrays of the given tables of one raw file"""
+    builders = {table: _ColumnBuilder() for table in tables}
+    for record in read_raw_matches(path):
+        for table in tables:
+            for row in record[table]:
+                builders[table].add(row)
+    return {table: b.to_arrays() for table, b in builders.items()}
+
+
+def _column_dtype(chunks: List[Dict[str, np.ndarray]], column: str) -> np.dtype:
+    """common dtype of a column over all chunks, NaN-able if a chunk lacks it"""
+    dtypes = [c[column].dtype for c in chunks if column in c and len(c[column])]
+    if not dtypes:
+        return np.dtype(object)
+    dtype = np.result_type(*dtypes)
+    missing = any(column not in c and _n_rows(c) for c in chunks)
+    if missing and dtype.kind in "iub":
+        dtype = np.dtype(float) if dtype.kind != "b" else np.dtype(object)
+    return dtype
+
+
+def _n_rows(chunk: Dict[str, np.ndarray]) -> int:
+    return len(next(iter(chunk.values()))) if chunk else 0
+
+
+def _fill_table(chunks: List[Dict[str, np.ndarray]]) -> pd.DataFrame:
+    """copy the column chunks of all files into one buffer per column"""
+    columns = list(dict.fromkeys(k for chunk in chunks for k in chunk))
+    sizes = [_n_rows(chunk) for chunk in chunks]
+    total = sum(sizes)
+
+    buffers = {}
+    for column in columns:
+        dtype = _column_dtype(chunks, column)
+        buffers[column] = np.empty(total, dtype=dtype)
+        if dtype.kind in "fO":
+            # rows of files without the column stay NaN
+            buffers[column].fill(np.nan)
+
+    start = 0
+    for i, size in enumerate(sizes):
+        for column, values in chunks[i].items():
+            buffers[column][start : start + size] = values
+        # drop each file's arrays once copied
+        chunks[i] = None
+        start += size
+    return pd.DataFrame(buffers, columns=columns, copy=False)
+
+
+def load_tables(
+    files: List[str],
+    workers: int = 0,
+    tables: Sequence[str] = TABLES,
+    leagues: Optional[Sequence[Optional[str]]] = None,
+) -> Dict[str, pd.DataFrame]:
+    """MatchInfo/HomeStat/AwayStat frames of all raw files, parsed in parallel.
+
+    workers is the size of the process pool, 0 or 1 parses in this process.
+    With leagues, the league of each file, frames["League"] holds the league
+    of every MatchInfo row."""
+    if workers > 1 and len(files) > 1:
+        with ProcessPoolExecutor(min(workers, len(files))) as pool:
+            results = list(pool.map(read_columns, files, [tables] * len(files)))
+    else:
+        results = [read_columns(path, tables) for path in files]
+
+    frames = {}
+    if leagues is not None:
+        rows = [_n_rows(result["MatchInfo"]) for result in results]
+        frames["League"] = pd.Series(np.repeat(list(leagues), rows), dtype=object)
+    for table in tables:
+        chunks = [result.pop(table) for result in results]
+        frames[table] = _fill_table(chunks)
+    return frames
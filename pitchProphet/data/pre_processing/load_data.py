@@ -1,11 +1,23 @@
-import glob
-import json
 from pathlib import Path
 from typing import List
 
+import numpy as np
 import pandas as pd
 import yaml
 
+from pitchProphet.data.fbref.match_store import MatchStore
+from pitchProphet.data.fbref.raw_catalog import MATCH_ID, RawCatalog
+from pitchProphet.data.fbref.raw_io import (
+    parse_raw_name,
+    read_raw_matches,
+    scraped_raw_dir,
+    training_raw_dir,
+)
+from pitchProphet.data.fbref.scrape_plan import load_plan
+from pitchProphet.data.pre_processing.ingest import load_tables
+from pitchProphet.data.pre_processing.match_frame import MatchFrame
+from pitchProphet.utils.team_registry import team_registry
+
 
 class LoadData:
     """
@@ -15,9 +27,18 @@ class LoadData:
     Attributes:
         raw_dir (str): Path to the JSON file with match data.
         config_path (str): Path to the YAML configuration file.
+        store (MatchStore | None): Columnar store of raw_dir, when enabled.
+        sync (bool): Whether the raw catalog and store are synced with raw_dir
+            before reading, off in shard workers.
+        plan (list | None): Match links of the league's latest inference scrape
+            plan, read from the raw files holding them.
+        data (list): Raw match records, read from the raw files on first use.
     Methods:
         game_data_process() -> pd.DataFrame:
             Processes and returns a DataFrame of all match data.
+
+        match_frame(dtype) -> MatchFrame:
+            Returns the same data as compact typed arrays.
     """
 
     def __init__(
@@ -27,30 +48,44 @@ class LoadData:
         match_week: int = None,
         player_data: bool = False,
         inference: bool = False,
+        season: str = None,
+        sync: bool = True,
     ):
         self.config_path = config_path
         self.league = league
+        self.season = season
         self.match_week = match_week
         self.player_data = player_data
         self.inference = inference
+        self.sync = sync
         self.all_config = self._open_yaml(self.config_path)
         self.config = self.all_config["processing"]
         self.paths = self.all_config["global"]["paths"]
-        self.raw_dir = (
-            Path(self.paths["root_dir"]) / Path(self.paths["raw_dir"]) / "team_data"
-        )
-        if self.player_data == True:
-            self.raw_dir = (
-                Path(self.paths["root_dir"])
-                / Path(self.paths["raw_dir"])
-                / "team_and_player_data"
-            )
+        self.raw_dir = training_raw_dir(self.paths, self.player_data)
         if self.inference == True:
-            self.raw_dir = (
-                Path(self.paths["root_dir"]) / Path(self.paths["raw_dir"]) / "inference"
-            )
-
-        self.data = self._open_json(self._find_relv_files())
+            self.raw_dir = scraped_raw_dir(self.paths, inference=True)
+
+        # inference reads the matches of the league's latest scrape plan,
+        # which are spread over the raw files of earlier runs
+        self.plan = None
+        if self.inference == True and self.league:
+            self.plan = load_plan(self.raw_dir, self.league)
+
+        # team data is read from the columnar store when it is enabled,
+        # the raw files are only parsed if data is accessed
+        self.store = None
+        if self.player_data == False and self.plan is None:
+            self.store = MatchStore.from_config(self.all_config, self.raw_dir)
+        # with sync off another process keeps the catalog and store in sync
+        if self.store is not None and self.sync:
+            self.store.sync(self.raw_dir)
+        self._data = None
+
+    @property
+    def data(self) -> list:
+        if self._data is None:
+            self._data = self._open_json(self._find_relv_files())
+        return self._data
 
     def game_data_process(self) -> pd.DataFrame:
         """
@@ -62,23 +97,7 @@ class LoadData:
             2. Home team statistics
             3. Away team statistics
         """
-
-        # TODO: drop duplicate hinders synthetic copies of data
-        # flatten dataset
-        home_stat_df = pd.json_normalize(
-            self.data, record_path="HomeStat"
-        ).drop_duplicates()
-        away_stat_df = pd.json_normalize(
-            self.data, record_path="AwayStat"
-        ).drop_duplicates()
-        game_data_df = pd.json_normalize(
-            self.data, record_path="MatchInfo"
-        ).drop_duplicates()
-
-        # filter out variables as defined in config file
-        home_stat_df, away_stat_df = self._filter_x_vars(
-            home_stat_df, away_stat_df, self.config["x_vars"]
-        )
+        game_data_df, home_stat_df, away_stat_df = self._tables()
 
         # add first level index to make it multi-indexed
         home_stat_df.index = pd.MultiIndex.from_product(
@@ -93,6 +112,59 @@ class LoadData:
 
         return pd.concat([game_data_df, home_stat_df, away_stat_df], axis=0)
 
+    def match_frame(self, dtype=np.float32) -> MatchFrame:
+        """same data as game_data_process, as compact typed arrays"""
+        return MatchFrame.from_tables(*self._tables(), dtype=dtype)
+
+    def _tables(self) -> tuple:
+        """deduplicated MatchInfo table and x_vars filtered HomeStat/AwayStat tables"""
+        # TODO: drop duplicate hinders synthetic copies of data
+        # flatten dataset
+        if self.store is not None:
+            frames = self._read_store()
+        else:
+            # raw files are parsed in parallel straight into column buffers
+            files = self._find_relv_files()
+            leagues = [(parse_raw_name(f) or (self.league,))[0] for f in files]
+            frames = load_tables(
+                files, self.config.get("ingest_workers", 0), leagues=leagues
+            )
+        home_stat_df = frames["HomeStat"].drop_duplicates()
+        away_stat_df = frames["AwayStat"].drop_duplicates()
+        game_data_df = frames["MatchInfo"].drop_duplicates()
+
+        # filter out variables as defined in config file
+        home_stat_df, away_stat_df = self._filter_x_vars(
+            home_stat_df, away_stat_df, self.config["x_vars"]
+        )
+
+        # one canonical name per team, whichever page or source it came from,
+        # resolved in the league of each match. unknown names are kept as they
+        # are, without adding them to the shared registry
+        registry = team_registry()
+        leagues = frames["League"].loc[game_data_df.index]
+        unknown = {}
+        teams = {
+            col: registry.names(
+                registry.ids(game_data_df[col], leagues, unknown), unknown
+            )
+            for col in ["HomeTeam", "AwayTeam"]
+            if col in game_data_df.columns
+        }
+        game_data_df = game_data_df.assign(**teams)
+        return game_data_df, home_stat_df, away_stat_df
+
+    def _read_store(self) -> dict:
+        """read only the league, match week and x_vars asked for from the store"""
+        where = None
+        if self.match_week is not None:
+            where = f"file_week == {int(self.match_week)}"
+        leagues = [self.league] if self.league else None
+        seasons = [self.season] if self.season else None
+        return self.store.read(
+            leagues, seasons, where=where, columns=self.config["x_vars"]
+        )
+
     def _filter_x_vars(
         self, home_player_df: pd.DataFrame, away_player_df: pd.DataFrame, x_vars: list
     ):
@@ -100,27 +172,20 @@ class LoadData:
         return home_player_df[x_vars], away_player_df[x_vars]
 
     def _find_relv_files(self):
-        """iterate through raw file dir and return relevant files based on filters"""
-        pattern = f"{self.raw_dir}/*.json"
-        str_match_week = str(self.match_week) if self.match_week is not None else None
-
-        # get all JSON files and retrun if no filters
-        all_files = glob.glob(pattern)
-        if not self.league and not str_match_week:
-            return all_files
-
-        # ilter files based on league and match week if specified
-        filtered_files = []
-        for file in all_files:
-            # check league filter if specified
-            if self.league and self.league not in file:
-                continue
-            # check match week filter if specified
-            if str_match_week and f"match_week-{str_match_week}" not in file:
-                continue
-            filtered_files.append(file)
-        if not self.league and not str_match_week:
-            return all_files
+        """return relevant raw files based on filters, looked up in the raw catalog"""
+        if not self.raw_dir.exists():
+            return []
+        if self.plan is not None:
+            return self._plan_files()
+
+        # files holding only matches of earlier files are skipped
+        catalog = RawCatalog(self.raw_dir, auto_refresh=self.sync)
+        filtered_files = catalog.select(
+            league=self.league, season=self.season, match_week=self.match_week
+        )
+        catalog.close()
+        if not self.league and not self.season and self.match_week is None:
+            return filtered_files
 
         if not filtered_files:
             print(
@@ -131,12 +196,24 @@ class LoadData:
 
         return filtered_files
 
-    def _open_json(self, all_json: List[str]) -> dict:
+    def _plan_files(self) -> List[str]:
+        """raw files holding the planned matches, in match order"""
+        ids = [found.group(1) for found in map(MATCH_ID.search, self.plan) if found]
+        with RawCatalog(self.raw_dir, auto_refresh=self.sync) as catalog:
+            files = set(catalog.match_files(ids).values())
+            ordered = [str(self.raw_dir / e["name"]) for e in catalog.entries()]
+        return [path for path in ordered if path in files]
+
+    def _open_json(self, all_json: List[str]) -> list:
+        """stream match records from raw files, keeping only the tables in use"""
+        keep = ["MatchInfo", "HomeStat", "AwayStat"]
+        if self.player_data == True:
+            keep += ["HomePlayersStat", "AwayPlayersStat", "HomeGKStat", "AwayGKStat"]
+
         combined_data = []
         for file in all_json:
-            with open(file, "r") as file:
-                data = json.load(file)
-                combined_data.extend(data)
+            for record in read_raw_matches(file):
+                combined_data.append({k: record[k] for k in keep if k in record})
         return combined_data
 
     def _open_yaml(self, config_path: str) -> dict:
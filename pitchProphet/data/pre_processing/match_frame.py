@@ -0,0 +1,155 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+
+class MatchFrame:
+    """
+    Class for holding loaded match data as compact, typed arrays.
+
+    Teams are integer ids into `teams`, the match table keeps one row per match
+    and the home and away team stats are contiguous (matches x features)
+    arrays whose rows are aligned with the match table by match id. This is
+    what the stacked MultiIndex frame of LoadData.game_data_process holds,
+    without its object columns and NaN padding.
+
+    Attributes:
+        teams (list): Team names, a team's id is its position in the list.
+        match_ids (np.ndarray): MatchInfo index labels, in match order.
+        info (pd.DataFrame): Match table indexed by match id, with HomeTeam
+            and AwayTeam as int32 team ids.
+        features (list): Names of the stat columns.
+        home_stats (np.ndarray): Home team stats, one row per match.
+        away_stats (np.ndarray): Away team stats, one row per match.
+
+    Methods:
+        from_tables(match_info, home_stat, away_stat, dtype) -> MatchFrame:
+            Builds the arrays from the MatchInfo/HomeStat/AwayStat tables.
+
+        from_frame(data: pd.DataFrame, dtype) -> MatchFrame:
+            Builds the arrays from the stacked MultiIndex frame.
+
+        to_frame() -> pd.DataFrame:
+            Converts back to the stacked MultiIndex frame.
+
+        team_id(name: str) -> int:
+            Returns the id of a team, -1 if it has no matches.
+
+        subset(rows) -> MatchFrame:
+            Returns the given matches, with the same team ids.
+    """
+
+    def __init__(
+        self,
+        teams: List[str],
+        info: pd.DataFrame,
+        features: List[str],
+        home_stats: np.ndarray,
+        away_stats: np.ndarray,
+        stat_dtypes: dict = None,
+    ):
+        self.teams = teams
+        self.info = info
+        self.match_ids = info.index.to_numpy()
+        self.features = features
+        self.home_stats = home_stats
+        self.away_stats = away_stats
+        self._stat_dtypes = stat_dtypes or {}
+        self._team_ids = {name: i for i, name in enumerate(teams)}
+
+    @classmethod
+    def from_tables(
+        cls,
+        match_info: pd.DataFrame,
+        home_stat: pd.DataFrame,
+        away_stat: pd.DataFrame,
+        dtype=np.float32,
+    ) -> "MatchFrame":
+        """build from the three tables, stat rows are aligned on the match index"""
+        teams = match_info[["HomeTeam", "AwayTeam"]].to_numpy().ravel()
+        teams, team_ids = np.unique(teams.astype(str), return_inverse=True)
+        team_ids = team_ids.reshape(-1, 2).astype(np.int32)
+
+        info = match_info.copy()
+        info["HomeTeam"] = team_ids[:, 0]
+        info["AwayTeam"] = team_ids[:, 1]
+
+        # stat rows without a match are dropped, matches without stats get NaN
+        features = list(home_stat.columns)
+        home = home_stat.reindex(index=info.index, columns=features)
+        away = away_stat.reindex(index=info.index, columns=features)
+        stat_dtypes = {
+            "HomeStat": home_stat.dtypes.to_dict(),
+            "AwayStat": away_stat.dtypes.to_dict(),
+        }
+        return cls(
+            list(teams),
+            info,
+            features,
+            np.ascontiguousarray(home.to_numpy(dtype=dtype, na_value=np.nan)),
+            np.ascontiguousarray(away.to_numpy(dtype=dtype, na_value=np.nan)),
+            stat_dtypes,
+        )
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame, dtype=np.float32) -> "MatchFrame":
+        """build from the stacked frame of LoadData.game_data_process"""
+        match_info = data.loc["MatchInfo"].dropna(axis=1, how="all")
+        stat_columns = [c for c in data.columns if c not in match_info.columns]
+        home_stat = data.loc["HomeStat"][stat_columns].apply(pd.to_numeric)
+        away_stat = data.loc["AwayStat"][stat_columns].apply(pd.to_numeric)
+        return cls.from_tables(match_info, home_stat, away_stat, dtype)
+
+    def __len__(self) -> int:
+        return len(self.match_ids)
+
+    @property
+    def nbytes(self) -> int:
+        """memory held by the match table and stat arrays"""
+        info_bytes = self.info.memory_usage(index=True, deep=True).sum()
+        return int(info_bytes + self.home_stats.nbytes + self.away_stats.nbytes)
+
+    def team_id(self, name: str) -> int:
+        return self._team_ids.get(name, -1)
+
+    def subset(self, rows) -> "MatchFrame":
+        """matches at the given positions (slice or array), team ids kept"""
+        return MatchFrame(
+            self.teams,
+            self.info.iloc[rows],
+            self.features,
+            self.home_stats[rows],
+            self.away_stats[rows],
+            self._stat_dtypes,
+        )
+
+    def home_team_ids(self) -> np.ndarray:
+        return self.info["HomeTeam"].to_numpy()
+
+    def away_team_ids(self) -> np.ndarray:
+        return self.info["AwayTeam"].to_numpy()
+
+    def to_frame(self) -> pd.DataFrame:
+        """stacked MultiIndex frame as returned by LoadData.game_data_process"""
+        names = np.asarray(self.teams, dtype=object)
+        match_info = self.info.copy()
+        match_info["HomeTeam"] = names[self.home_team_ids()]
+        match_info["AwayTeam"] = names[self.away_team_ids()]
+
+        frames = [match_info]
+        for table, stats in (
+            ("HomeStat", self.home_stats),
+            ("AwayStat", self.away_stats),
+        ):
+            df = pd.DataFrame(stats, index=self.info.index, columns=self.features)
+            df = df.dropna(how="all").astype(np.float64)
+            # restore the loaded dtypes where it loses nothing (e.g. int goals)
+            for col, col_dtype in self._stat_dtypes.get(table, {}).items():
+                if col_dtype.kind in "iu" and not df[col].isna().any():
+                    df[col] = df[col].astype(col_dtype)
+            frames.append(df)
+
+        for df, table in zip(frames, ["MatchInfo", "HomeStat", "AwayStat"]):
+            df.index = pd.MultiIndex.from_product([[table], df.index])
+        return pd.concat(frames, axis=0)
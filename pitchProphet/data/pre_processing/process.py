@@ -3,23 +3,32 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 
-from pitchProphet.data.pre_processing.calculate_stats import DescriptiveStats
+from pitchProphet.data.pre_processing.aggregations import DEFAULT_METHODS
+from pitchProphet.data.pre_processing.feature_store import FeatureStore
+from pitchProphet.data.pre_processing.match_frame import MatchFrame
+from pitchProphet.data.pre_processing.processed_data import write_processed
+from pitchProphet.data.pre_processing.rolling_stats import RollingStats
+from pitchProphet.data.pre_processing.window_cache import WindowCache
 
 
 class Process:
     """
     Class for processing all football match data to add descriptive statistics.
 
-    This class iterates over all matches, applying the `process_home_away_features`
-    method from the `DescriptiveStats` class to calculate statistics for each match.
-    It generates a processed DataFrame separately for all home team statistics,
-    all away team statistics saves those separatly. This is used as x variable for training.
-    It also saves a separete file that has general game information that can be used as
-    y label variable for training.
+    This class calculates statistics for all matches with `RollingStats`, which
+    gives the same result as applying the `process_home_away_features` method
+    from the `DescriptiveStats` class to each match.
+    It generates a processed DataFrame separately for all home team statistics and
+    all away team statistics. This is used as x variable for training.
+    Together with the general game information, that can be used as y label
+    variable for training, they are saved into one file (see processed_data.py).
 
     Attributes:
         data (pd.DataFrame): DataFrame containing all match data.
-
+        name (str): Name of the feature store, window cache and saved file of the data.
+        window_cache (bool): Whether processing writes the window cache, shards
+            leave it to the merged data.
+        frame (MatchFrame | None): The processed matches as typed arrays.
 
     Methods:
         process_all_match() -> None:
@@ -28,42 +37,74 @@ class Process:
         final_dataframe() -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
             Generates final DataFrames with match outcome labels.
 
-        save_file(save_dir: str) -> None:
-            Saves processed DataFrames to CSV files in the specified directory.
+        save_file(paths: dict) -> Path:
+            Saves features, labels and metadata to one file in processed_dir.
+
+        merge(config: dict, shards: list) -> Process:
+            Combines the outputs of Processes of separate shards of the data.
     """
 
     def __init__(
-        self, config: dict, data: pd.DataFrame, all_home_stats=[], all_away_stats=[]
+        self,
+        config: dict,
+        data: pd.DataFrame,
+        all_home_stats=[],
+        all_away_stats=[],
+        name: str = "training",
+        window_cache: bool = True,
     ):
         self.all_home_stats = all_home_stats
         self.all_away_stats = all_away_stats
         self.data = data
         self.match_info_df = self._get_match_info()
         self.config = config
+        self.name = name
+        self.window_cache = window_cache
+        self.frame = None
+
+    @classmethod
+    def merge(cls, config: dict, shards: list) -> "Process":
+        """outputs of processed shards, in shard order, re-indexed 0..n-1"""
+        match_info = pd.concat([p.match_info_df for p in shards], ignore_index=True)
+        merged = cls(config, pd.concat({"MatchInfo": match_info}), [], [])
+        merged.match_info_df = match_info
+        merged.all_home_stats = pd.concat(
+            [p.all_home_stats for p in shards], ignore_index=True
+        )
+        merged.all_away_stats = pd.concat(
+            [p.all_away_stats for p in shards], ignore_index=True
+        )
+        return merged
 
     def _get_match_info(self) -> pd.DataFrame:
-        return self.data.loc["MatchInfo"]
+        return self.data.loc["MatchInfo"].copy()
 
     def process_all_match(self):
-        """process each match one by one"""
+        """calculate the statistics of all matches"""
         # initialize class that calculates the statistical variables for each row based on las n rows
         last_n_match = self.config["processing"]["last_n_match"]
-        calc_stats = DescriptiveStats(self.data, last_n_match)
-
-        # TODO: dont process the first 5 matchweeks and remove the first five matchweek from the match_info_df
-        # iterate over eatch match
-        for idx in self.match_info_df.index:
-            try:
-                match_stats = calc_stats.process_home_away_features(
-                    self.match_info_df.loc[idx]
-                )
-                # store the stats
-                self.all_home_stats.append(match_stats["home_stats"])
-                self.all_away_stats.append(match_stats["away_stats"])
-            except Exception as e:
-                print(f"Error processing match {idx}: {str(e)}")
-                continue
-        return
+        methods = self.config["processing"].get("aggregation_methods")
+        methods = methods or DEFAULT_METHODS
+
+        # all matches at once in vectorized passes, the match index is always
+        # in load order. with the feature store only matches added since the
+        # last run are computed
+        frame = MatchFrame.from_frame(self.data, np.float64)
+        self.frame = frame
+        store = FeatureStore.from_config(self.config, self.name)
+        if store is not None:
+            match_stats = store.update(frame)
+        else:
+            rolling_stats = RollingStats(frame, last_n_match, False, methods)
+            match_stats = rolling_stats.match_features()
+        self.all_home_stats = match_stats["home_stats"]
+        self.all_away_stats = match_stats["away_stats"]
+
+        # windows for other window sizes, for experiments
+        cache = WindowCache.from_config(self.config, self.name)
+        if cache is not None and self.window_cache:
+            max_window = self.config["processing"]["window_cache"]["max_window"]
+            cache.build(frame, max(max_window, last_n_match))
 
     def final_dataframe(self) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
         """create final output file after processing te data"""
@@ -97,30 +138,30 @@ class Process:
         print("\nIndices verification passed: All DataFrames have matching indices")
         return
 
-    def save_file(self, paths):
-        """save the processed dataframes with row counts in filenames"""
-
-        home_rows = len(self.all_home_stats)
-        away_rows = len(self.all_away_stats)
-        match_rows = len(self.match_info_df)
-
-        # get matchweek information
-        match_week = self.match_info_df["Matchweek"].iloc[-1]
+    def save_file(self, paths) -> Path:
+        """save features, labels and their metadata into one processed data file"""
+        processing = self.config["processing"]
+        metadata = {
+            "name": self.name,
+            "last_n_match": processing["last_n_match"],
+            "x_vars": processing["x_vars"],
+            "aggregation_methods": list(
+                processing.get("aggregation_methods") or DEFAULT_METHODS
+            ),
+            "last_match_week": float(self.match_info_df["Matchweek"].iloc[-1]),
+        }
 
         # check directory and make math
         save_dir = Path(paths["root_dir"]) / Path(paths["processed_dir"])
-
-        save_dir.mkdir(exist_ok=True, parents=True)
-
-        self.all_home_stats.to_csv(
-            f"{save_dir}/home_stats_{home_rows}_matches_{match_week}_game_week.csv"
-        )
-        self.all_away_stats.to_csv(
-            f"{save_dir}/away_stats_{away_rows}_{match_week}_game_week.csv"
-        )
-        self.match_info_df.to_csv(
-            f"{save_dir}/match_info_with_labels_{match_rows}rows.csv"
+        save_path = write_processed(
+            save_dir / f"{self.name}_data.h5",
+            self.all_home_stats,
+            self.all_away_stats,
+            self.match_info_df,
+            metadata,
         )
 
-        print(f"Files saved to {save_dir}!!")
-        return
+        print(
+            f"Processed data of {len(self.match_info_df)} matches saved to {save_path}!!"
+        )
+        return save_path
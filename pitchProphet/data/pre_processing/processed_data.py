@@ -0,0 +1,84 @@
+"""
+Single file artifact of processed training data.
+
+Process.save_file writes one HDF5 file (PyTables, compressed) holding:
+    1. home_stats: home team features, float32 columns
+    2. away_stats: away team features, float32 columns
+    3. match_info: match table with the label column
+all with the same match index, and metadata stored with match_info: window
+size, x_vars, aggregation methods, column lists and a hash of the source
+matches. load_processed returns the frames and the metadata, so training
+code gets the schema from the file instead of file names and column order.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+TABLES = ("home_stats", "away_stats", "match_info")
+
+
+def source_hash(match_info: pd.DataFrame) -> str:
+    """hash of the matches the features were computed from"""
+    hashed = pd.util.hash_pandas_object(match_info, index=True).to_numpy()
+    return hashlib.sha256(hashed.tobytes()).hexdigest()
+
+
+def write_processed(
+    path: Path,
+    home_stats: pd.DataFrame,
+    away_stats: pd.DataFrame,
+    match_info: pd.DataFrame,
+    metadata: dict,
+    complib: str = "blosc",
+    complevel: int = 5,
+) -> Path:
+    """write features, labels and metadata into one file, replacing it at once"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    metadata = {
+        "format_version": FORMAT_VERSION,
+        "n_matches": len(match_info),
+        "home_columns": list(home_stats.columns),
+        "away_columns": list(away_stats.columns),
+        "source_hash": source_hash(match_info),
+        **metadata,
+    }
+
+    # string columns are cast explicitly, mixed object columns cannot be
+    # stored in a table
+    match_info = match_info.copy()
+    for col in match_info.columns[match_info.dtypes == object]:
+        match_info[col] = match_info[col].astype(str)
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+    with pd.HDFStore(tmp_path, mode="w", complib=complib, complevel=complevel) as store:
+        for table, df in (("home_stats", home_stats), ("away_stats", away_stats)):
+            store.put(table, df.astype(np.float32), format="table")
+        store.put("match_info", match_info, format="table")
+        store.get_storer("match_info").attrs.metadata = json.dumps(metadata)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_metadata(path: Path) -> dict:
+    """metadata of a processed data file, without reading the tables"""
+    with pd.HDFStore(path, mode="r") as store:
+        return json.loads(store.get_storer("match_info").attrs.metadata)
+
+
+def load_processed(path: Path) -> Dict:
+    """home_stats, away_stats and match_info frames and the metadata"""
+    with pd.HDFStore(path, mode="r") as store:
+        processed = {table: store.select(table) for table in TABLES}
+        processed["metadata"] = json.loads(
+            store.get_storer("match_info").attrs.metadata
+        )
+    return processed
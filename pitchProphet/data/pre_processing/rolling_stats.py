@@ -0,0 +1,331 @@
+"""
+Batch computation of last-n match statistics for every match.
+
+Gives the same features as DescriptiveStats.process_home_away_features called
+match by match, in a few vectorized passes over a MatchFrame:
+    1. every team's matches are put in one chronological timeline, with the
+       stats of the side the team played on
+    2. DescriptiveStats takes a team's first n matches before the current one,
+       so every window is a prefix of the team's timeline and only prefixes of
+       length 0..n exist. The configured statistics (aggregations.py) of
+       each prefix length are computed for all teams and features at once
+    3. each match looks up the prefix of its home and away team, by the number
+       of matches the team played before it
+
+Columns with a missing value inside a window are left out of that window's
+statistics (NaN in the result), as DescriptiveStats drops them.
+
+Upcoming fixtures (fixture_features) use every team's last n matches instead,
+so a team whose data holds more than n matches (matches loaded for its
+opponents) still gets its most recent ones.
+
+The per team windows (TeamWindows) can be kept and passed back in with the
+next matches, which continues the timelines where they stopped: the new
+matches get the same statistics as a computation over all matches would give.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pitchProphet.data.pre_processing.aggregations import (
+    DEFAULT_METHODS,
+    aggregate,
+    get_aggregation,
+)
+from pitchProphet.data.pre_processing.match_frame import MatchFrame
+from pitchProphet.utils.team_registry import team_registry
+
+
+def present_features(valid: np.ndarray) -> List[int]:
+    """features with a value in some row, in the order rows first show them"""
+    present = valid.any(axis=0)
+    first_row = np.where(present, valid.argmax(axis=0), len(valid))
+    order = np.lexsort((np.arange(len(first_row)), first_row))
+    return [f for f in order if present[f]]
+
+
+def select_features(
+    stats: pd.DataFrame, features: List[str], methods: Sequence[str]
+) -> pd.DataFrame:
+    """columns of a match_features(all_features=True) frame that
+    match_features() would have returned, in the same order"""
+    valid = stats[[f"{f}_{methods[0]}" for f in features]].notna().to_numpy()
+    columns = [
+        f"{features[f]}_{name}" for f in present_features(valid) for name in methods
+    ]
+    return stats[columns]
+
+
+class TeamWindows:
+    """
+    Class for holding every team's timeline state: the number of matches it
+    played and the stats of its first and of its last last_n_match matches.
+
+    Attributes:
+        teams (list): Team names.
+        n_played (np.ndarray): Matches played by each team.
+        windows (np.ndarray): (teams x last_n_match x features) stats, NaN
+            after a team's last match.
+        features (list): Names of the stat columns.
+        recent (np.ndarray): (teams x last_n_match x features) stats of the
+            last matches, the latest last, NaN before a team's first match.
+    """
+
+    def __init__(
+        self,
+        teams: List[str],
+        n_played: np.ndarray,
+        windows: np.ndarray,
+        features: List[str],
+        recent: np.ndarray,
+    ):
+        self.teams = list(teams)
+        self.n_played = np.asarray(n_played, dtype=np.int64)
+        self.windows = windows
+        self.features = list(features)
+        self.recent = recent
+
+
+class RollingStats:
+    """
+    Class for computing last-n match statistics of all matches at once.
+
+    Attributes:
+        frame (MatchFrame): Loaded match data.
+        last_n_match (int): Number of previous matches the statistics use.
+        inference (bool): Whether windows ignore the match order (fixtures).
+        aggregation_methods (list): Statistics computed per feature.
+        state (TeamWindows | None): Team timelines before the frame's matches.
+        teams (list): Teams of the frame, then teams only in the state.
+
+    Methods:
+        match_features(all_features: bool) -> dict:
+            Returns home and away team statistics for every match.
+
+        team_windows() -> TeamWindows:
+            Returns the team timelines after the frame's matches.
+
+        match_windows() -> tuple:
+            Returns the stats every match's statistics are computed over.
+
+        team_features(team: str) -> pd.Series:
+            Returns the statistics of one team's last matches, for inference.
+
+        fixture_features(fixtures: pd.DataFrame, league: str) -> dict:
+            Returns home and away team statistics for upcoming fixtures.
+    """
+
+    def __init__(
+        self,
+        frame: MatchFrame,
+        last_n_match: int = 5,
+        inference=False,
+        aggregation_methods: Sequence[str] = DEFAULT_METHODS,
+        state: Optional[TeamWindows] = None,
+    ):
+        self.frame = frame
+        self.last_n_match = last_n_match
+        self.inference = inference
+        self.aggregation_methods = list(aggregation_methods)
+        self.state = state
+        # fail on unknown methods or a mismatched state before any work
+        for name in self.aggregation_methods:
+            get_aggregation(name)
+        if state is not None and (
+            state.features != list(frame.features)
+            or state.windows.shape[1] != last_n_match
+        ):
+            raise ValueError("state was built with other features or last_n_match")
+        self.teams = list(frame.teams)
+        if state is not None:
+            known = set(self.teams)
+            self.teams += [t for t in state.teams if t not in known]
+        self._team_ids = {name: i for i, name in enumerate(self.teams)}
+        self._appearances()
+        self._window_stats()
+
+    def _appearances(self) -> None:
+        """team, side and number of earlier matches of every team appearance"""
+        frame = self.frame
+        # appearances interleaved in match order: home of match 0, away of
+        # match 0, home of match 1, ...
+        self._team = np.column_stack(
+            [frame.home_team_ids(), frame.away_team_ids()]
+        ).ravel()
+        self._team = self._team.astype(np.int64)
+
+        # matches of the state come before the frame's
+        self._prior = np.zeros(len(self.teams), dtype=np.int64)
+        if self.state is not None:
+            ids = [self._team_ids[t] for t in self.state.teams]
+            self._prior[ids] = self.state.n_played
+        self._played_before = (
+            pd.Series(self._team).groupby(self._team).cumcount().to_numpy()
+            + self._prior[self._team]
+        )
+        self._n_played = (
+            np.bincount(self._team, minlength=len(self.teams)) + self._prior
+        )
+
+    def _window_stats(self) -> None:
+        """statistics of every team's first m matches, for m = 0..last_n_match"""
+        n, frame = self.last_n_match, self.frame
+        n_teams, n_features = len(self.teams), len(frame.features)
+
+        # (teams, n, features) stats of each team's first n matches
+        side_stats = np.stack([frame.home_stats, frame.away_stats], axis=1)
+        side_stats = side_stats.reshape(-1, n_features).astype(np.float64)
+        first = self._played_before < n
+        windows = np.full((n_teams, n, n_features), np.nan)
+        if self.state is not None:
+            ids = [self._team_ids[t] for t in self.state.teams]
+            windows[ids] = self.state.windows
+        windows[self._team[first], self._played_before[first]] = side_stats[first]
+        self._windows = windows
+
+        # (teams, n, features) stats of each team's last n matches, the
+        # stored ones move left by the number of new matches
+        n_new = self._n_played - self._prior
+        recent = np.full((n_teams, n, n_features), np.nan)
+        if self.state is not None:
+            ids = np.array([self._team_ids[t] for t in self.state.teams], dtype=int)
+            slot = np.arange(n)[None, :] - n_new[ids][:, None]
+            kept = slot >= 0
+            rows, old_slot = np.nonzero(kept)
+            recent[ids[rows], slot[kept]] = self.state.recent[rows, old_slot]
+        after = n_new[self._team] - 1 - (self._played_before - self._prior[self._team])
+        last = after < n
+        recent[self._team[last], n - 1 - after[last]] = side_stats[last]
+        self._recent = recent
+
+        # every prefix length m, each kernel call covers all teams and features
+        valid = ~np.cumsum(np.isnan(windows), axis=1).astype(bool)
+        values = np.nan_to_num(windows)
+        shape = (n_teams, n + 1, n_features)
+        self._stats = {
+            name: np.full(shape, np.nan) for name in self.aggregation_methods
+        }
+        for m in range(1, n + 1):
+            stats = aggregate(values[:, :m], self.aggregation_methods)
+            for name, stat in stats.items():
+                self._stats[name][:, m] = stat
+
+        # index 0 is the empty window
+        self._valid = np.concatenate(
+            [np.zeros((n_teams, 1, n_features), bool), valid], axis=1
+        )
+
+    def _features(
+        self, team: np.ndarray, window: np.ndarray, index, all_features=False
+    ) -> pd.DataFrame:
+        """statistics for (team, window length) pairs as a frame"""
+        valid = self._valid[team, window]
+        if all_features:
+            features = range(len(self.frame.features))
+        else:
+            features = present_features(valid)
+        columns, data = [], {}
+        for f in features:
+            feature = self.frame.features[f]
+            for name in self.aggregation_methods:
+                values = self._stats[name][team, window, f]
+                data[f"{feature}_{name}"] = np.where(valid[:, f], values, np.nan)
+                columns.append(f"{feature}_{name}")
+        return pd.DataFrame(data, index=index, columns=columns, dtype=np.float64)
+
+    def match_features(self, all_features=False) -> Dict[str, pd.DataFrame]:
+        """statistics of each match's home and away team over their last n matches.
+
+        all_features keeps the columns of features without any value, so
+        frames of consecutive batches line up."""
+        if self.inference:
+            window = self._n_played[self._team]
+        else:
+            window = self._played_before
+        window = np.minimum(window, self.last_n_match).reshape(-1, 2)
+        team = self._team.reshape(-1, 2)
+        index = self.frame.info.index
+        return {
+            "home_stats": self._features(team[:, 0], window[:, 0], index, all_features),
+            "away_stats": self._features(team[:, 1], window[:, 1], index, all_features),
+        }
+
+    def team_windows(self) -> TeamWindows:
+        """team timelines after the frame's matches, to continue from later"""
+        return TeamWindows(
+            self.teams,
+            self._n_played,
+            self._windows,
+            self.frame.features,
+            self._recent,
+        )
+
+    def match_windows(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(matches x 2 x last_n_match x features) stats of the home and away
+        team's window of every match, NaN after the window's length, and the
+        (matches x 2) window lengths"""
+        if self.inference:
+            length = self._n_played[self._team]
+        else:
+            length = self._played_before
+        length = np.minimum(length, self.last_n_match)
+        windows = self._windows[self._team]
+        windows[np.arange(self.last_n_match)[None, :] >= length[:, None]] = np.nan
+        n_features = len(self.frame.features)
+        return (
+            windows.reshape(-1, 2, self.last_n_match, n_features),
+            length.reshape(-1, 2),
+        )
+
+    def team_features(self, team: str) -> pd.Series:
+        """statistics of a team's last last_n_match matches (inference)"""
+        fixture = pd.DataFrame({"Home": [team], "Away": [team]})
+        stats = self.fixture_features(fixture)["home_stats"].iloc[0]
+        stats.name = None
+        return stats
+
+    def _recent_features(self, team: np.ndarray) -> pd.DataFrame:
+        """statistics over the last n matches of teams, -1 for no matches"""
+        n, methods = self.last_n_match, self.aggregation_methods
+        n_features = len(self.frame.features)
+        length = np.where(team >= 0, np.minimum(self._n_played[team], n), 0)
+        valid = np.zeros((len(team), n_features), bool)
+        values = {name: np.full((len(team), n_features), np.nan) for name in methods}
+        # teams with the same number of matches are aggregated together
+        for m in range(1, n + 1):
+            rows = np.flatnonzero(length == m)
+            if not len(rows):
+                continue
+            block = self._recent[team[rows], n - m :]
+            block_valid = ~np.isnan(block).any(axis=1)
+            valid[rows] = block_valid
+            for name, stat in aggregate(np.nan_to_num(block), methods).items():
+                values[name][rows] = np.where(block_valid, stat, np.nan)
+
+        data = {
+            f"{self.frame.features[f]}_{name}": values[name][:, f]
+            for f in present_features(valid)
+            for name in methods
+        }
+        return pd.DataFrame(data, index=pd.RangeIndex(len(team)), dtype=np.float64)
+
+    def fixture_features(
+        self, fixtures: pd.DataFrame, league: Optional[str] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """statistics for the Home and Away teams of fixtures over each team's
+        last n matches (inference)"""
+        registry = team_registry()
+        stats = {}
+        for side, column in (("home_stats", "Home"), ("away_stats", "Away")):
+            names = [registry.canonical(t, league) for t in fixtures[column]]
+            team = np.array([self._team_ids.get(t, -1) for t in names], dtype=int)
+            for name, found in zip(fixtures[column], team >= 0):
+                if not found:
+                    print(
+                        f"Warning: no matches of fixture team '{name}' "
+                        f"in the data, its statistics are empty"
+                    )
+            stats[side] = self._recent_features(team)
+        return stats
@@ -0,0 +1,94 @@
+"""
+Sharded pre-processing on a process pool.
+
+Teams of different leagues never play each other in the league data, so the
+last-n statistics of a league's matches only depend on that league. The raw
+data is split into shards by league (or by league and season), every shard is
+loaded and processed in its own process, and the shard outputs are merged in
+sorted shard order, which is the order the unsharded data is loaded in.
+
+by: league gives the features of processing all data at once. by: season is
+faster for few leagues, but a team's window then starts again every season,
+while unsharded it spans the seasons loaded together.
+
+Every shard keeps its own feature store (features/training-{league}.h5, or
+training-{league}-{season}.h5), so a shard's next run only computes its new
+matches. The window cache is written once, in the main process, from the
+matches of all shards, to the same window_cache/training as unsharded.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from pitchProphet.data.fbref.raw_catalog import RawCatalog
+from pitchProphet.data.pre_processing.load_data import LoadData
+from pitchProphet.data.pre_processing.process import Process
+from pitchProphet.data.pre_processing.window_cache import WindowCache
+
+SHARD_KEYS = ("league", "season")
+
+
+def list_shards(raw_dir: Path, by: str = "league") -> List[Tuple[str, Optional[str]]]:
+    """sorted (league, season) shards of the raw files, season None by league"""
+    if by not in SHARD_KEYS:
+        raise ValueError(f"shards are by one of {SHARD_KEYS}, not '{by}'")
+    with RawCatalog(raw_dir) as catalog:
+        entries = catalog.entries()
+    shards = {
+        (entry["league"], entry["season"] if by == "season" else None)
+        for entry in entries
+        if entry["league"] is not None
+    }
+    return sorted(shards, key=lambda shard: (shard[0], shard[1] or ""))
+
+
+def process_shard(
+    config_path: str, league: str, season: Optional[str] = None
+) -> Optional[Process]:
+    """load and process one shard, None if it has no matches"""
+    # the main process synced the raw catalog and store, workers only read
+    ld_data = LoadData(config_path, league=league, season=season, sync=False)
+    data = ld_data.game_data_process()
+    if data.empty:
+        return None
+
+    name = "-".join(["training", league] + ([season] if season else []))
+    process_games = Process(ld_data.all_config, data, [], [], name, False)
+    process_games.process_all_match()
+    process_games.final_dataframe()
+    # only the outputs and the typed matches go back to the main process
+    process_games.data = None
+    return process_games
+
+
+def process_sharded(ld_data: LoadData, workers: int, by: str = "league") -> Process:
+    """process every shard of LoadData's raw data and merge the outputs.
+
+    workers is the size of the process pool, 0 or 1 processes the shards one
+    after another in this process."""
+    # ld_data synced the raw catalog and store, the workers read them without
+    # syncing again
+    shards = list_shards(ld_data.raw_dir, by)
+    leagues = [league for league, _ in shards]
+    seasons = [season for _, season in shards]
+    config_paths = [ld_data.config_path] * len(shards)
+    print(f"Processing {len(shards)} shards by {by} with {workers} workers")
+
+    if workers > 1 and len(shards) > 1:
+        with ProcessPoolExecutor(min(workers, len(shards))) as pool:
+            results = list(pool.map(process_shard, config_paths, leagues, seasons))
+    else:
+        results = list(map(process_shard, config_paths, leagues, seasons))
+    processed = [r for r in results if r is not None]
+    if not processed:
+        raise ValueError(f"no matches found in {ld_data.raw_dir}")
+
+    # one window cache of all shards, in the order of the merged outputs
+    config = ld_data.all_config
+    cache = WindowCache.from_config(config)
+    if cache is not None:
+        last_n_match = config["processing"]["last_n_match"]
+        max_window = config["processing"]["window_cache"]["max_window"]
+        cache.build_shards([p.frame for p in processed], max(max_window, last_n_match))
+    return Process.merge(config, processed)
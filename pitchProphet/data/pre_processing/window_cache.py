@@ -0,0 +1,208 @@
+"""
+Memory-mapped cache of every match's prior-match windows.
+
+Pre-processing writes, for max_window, the stats of each match's home and away
+team window (matches x 2 x max_window x features, windows.npy) and the window
+lengths (lengths.npy). A team's window for a smaller last_n_match is the start
+of its window for max_window, so features for any window size up to
+max_window are computed from a slice of the memory-mapped array, without
+loading raw data or looking matches up again:
+
+    cache = WindowCache(processed_dir / "window_cache" / "training")
+    for n in range(1, 11):
+        stats = cache.match_features(n, ["mean", "std", "trend"], ["xG", "Sh"])
+
+The statistics equal RollingStats(frame, n).match_features() (up to the float32
+precision the cache is stored in by default).
+"""
+
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pitchProphet.data.pre_processing.aggregations import DEFAULT_METHODS, aggregate
+from pitchProphet.data.pre_processing.match_frame import MatchFrame
+from pitchProphet.data.pre_processing.rolling_stats import (
+    RollingStats,
+    present_features,
+)
+
+SIDES = ("home_stats", "away_stats")
+
+
+class WindowCache:
+    """
+    Class for writing and reading the memory-mapped match window cache.
+
+    Attributes:
+        cache_dir (Path): Directory of the cache files.
+
+    Methods:
+        from_config(config: dict, name: str) -> WindowCache | None:
+            Returns the cache in processed_dir, None if disabled in config.
+
+        build(frame: MatchFrame, max_window: int, dtype) -> None:
+            Writes the windows of every match of a frame.
+
+        build_shards(frames: list, max_window: int, dtype) -> None:
+            Writes the windows of the matches of processed shards.
+
+        window(last_n_match: int, features: list) -> tuple:
+            Returns the windows of a smaller size and their lengths.
+
+        match_features(last_n_match, aggregation_methods, features) -> dict:
+            Returns home and away team statistics for every match.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self._windows = None
+
+    @classmethod
+    def from_config(
+        cls, config: dict, name: str = "training"
+    ) -> Optional["WindowCache"]:
+        """cache {name} in processed_dir/window_cache, None if disabled"""
+        if not config["processing"].get("window_cache", {}).get("enabled", False):
+            return None
+        paths = config["global"]["paths"]
+        processed_dir = Path(paths["root_dir"]) / Path(paths["processed_dir"])
+        return cls(processed_dir / "window_cache" / name)
+
+    def build(self, frame: MatchFrame, max_window: int, dtype=np.float32) -> None:
+        """write the windows of every match, replacing the cache at once"""
+        windows, lengths = RollingStats(
+            frame, max_window, aggregation_methods=[]
+        ).match_windows()
+        self._write(windows, lengths, frame.match_ids, frame.features, dtype)
+
+    def build_shards(
+        self, frames: List[MatchFrame], max_window: int, dtype=np.float32
+    ) -> None:
+        """write the windows of the matches of processed shards, in shard
+        order and re-indexed 0..n-1 as Process.merge does. a team's window
+        does not continue from one shard into the next"""
+        windows, lengths = zip(
+            *[
+                RollingStats(frame, max_window, aggregation_methods=[]).match_windows()
+                for frame in frames
+            ]
+        )
+        match_ids = np.arange(sum(len(frame) for frame in frames))
+        self._write(
+            np.concatenate(windows),
+            np.concatenate(lengths),
+            match_ids,
+            frames[0].features,
+            dtype,
+        )
+
+    def _write(
+        self,
+        windows: np.ndarray,
+        lengths: np.ndarray,
+        match_ids: np.ndarray,
+        features: List[str],
+        dtype,
+    ) -> None:
+        tmp_dir = self.cache_dir.with_name(self.cache_dir.name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        mapped = np.lib.format.open_memmap(
+            tmp_dir / "windows.npy", mode="w+", dtype=dtype, shape=windows.shape
+        )
+        mapped[:] = windows
+        mapped.flush()
+        del mapped
+        np.save(tmp_dir / "lengths.npy", lengths.astype(np.int32))
+        np.save(tmp_dir / "match_ids.npy", np.asarray(match_ids))
+        with open(tmp_dir / "meta.json", "w") as f:
+            json.dump({"max_window": windows.shape[2], "features": features}, f)
+
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        tmp_dir.rename(self.cache_dir)
+        self._windows = None
+        print(f"Window cache of {len(windows)} matches saved to {self.cache_dir}")
+
+    def _open(self) -> None:
+        """memory-map the windows and read the small arrays"""
+        if self._windows is not None:
+            return
+        with open(self.cache_dir / "meta.json", "r") as f:
+            meta = json.load(f)
+        self.max_window = meta["max_window"]
+        self.features = meta["features"]
+        self._windows = np.load(self.cache_dir / "windows.npy", mmap_mode="r")
+        self._lengths = np.load(self.cache_dir / "lengths.npy")
+        self.match_ids = np.load(self.cache_dir / "match_ids.npy")
+
+    def _feature_index(self, features: Optional[List[str]]) -> Optional[List[int]]:
+        if features is None:
+            return None
+        position = {name: i for i, name in enumerate(self.features)}
+        missing = [f for f in features if f not in position]
+        if missing:
+            raise KeyError(f"features not in the window cache: {missing}")
+        return [position[f] for f in features]
+
+    def window(
+        self, last_n_match: int, features: Optional[List[str]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(matches x 2 x last_n_match x features) windows and (matches x 2)
+        lengths. Without a feature subset the windows are a view of the cache"""
+        self._open()
+        if last_n_match > self.max_window:
+            raise ValueError(
+                f"last_n_match {last_n_match} is larger than the cached "
+                f"max_window {self.max_window}"
+            )
+        windows = self._windows[:, :, :last_n_match]
+        index = self._feature_index(features)
+        if index is not None:
+            windows = windows[..., index]
+        return windows, np.minimum(self._lengths, last_n_match)
+
+    def match_features(
+        self,
+        last_n_match: int,
+        aggregation_methods: Sequence[str] = DEFAULT_METHODS,
+        features: Optional[List[str]] = None,
+    ) -> Dict[str, pd.DataFrame]:
+        """statistics of each match's home and away team over their last n matches"""
+        windows, lengths = self.window(last_n_match, features)
+        names = features if features is not None else self.features
+        n_matches, n_features = len(windows), len(names)
+
+        stats = {}
+        for s, side in enumerate(SIDES):
+            valid = np.zeros((n_matches, n_features), bool)
+            values = {
+                name: np.full((n_matches, n_features), np.nan)
+                for name in aggregation_methods
+            }
+            # rows with the same window length are aggregated together
+            for m in range(1, last_n_match + 1):
+                rows = np.flatnonzero(lengths[:, s] == m)
+                if not len(rows):
+                    continue
+                block = np.asarray(windows[rows, s, :m], dtype=np.float64)
+                block_valid = ~np.isnan(block).any(axis=1)
+                valid[rows] = block_valid
+                for name, stat in aggregate(
+                    np.nan_to_num(block), aggregation_methods
+                ).items():
+                    values[name][rows] = np.where(block_valid, stat, np.nan)
+
+            data = {
+                f"{names[f]}_{name}": values[name][:, f]
+                for f in present_features(valid)
+                for name in aggregation_methods
+            }
+            stats[side] = pd.DataFrame(
+                data, index=pd.Index(self.match_ids), dtype=np.float64
+            )
+        return stats
@@ -0,0 +1,183 @@
+"""
+Registry of the trained models, loaded once per process.
+
+Models are saved in XGBoost's native format (xgb_model.ubj, or .json), which
+unlike pickle loads with any xgboost version and no sklearn. A league or a
+model version has its own slot next to the default model:
+
+    model_dir/xgb_model.ubj                          default model
+    model_dir/xgb_model-Premier-League.ubj           league model
+    model_dir/xgb_model-Premier-League-v2.ubj        league model version
+
+get(league, version) returns the most specific slot that exists, falling back
+to the default model. A model is read from disk the first time it is asked for
+(or after its file changed) and kept in an LRU cache of max_models models, so
+inference for every league and any serving path share the loaded models.
+
+A model that only exists as the legacy xgb_model.pkl is unpickled once and
+converted to the native format next to it.
+"""
+
+import pickle
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+MODEL_NAME = "xgb_model"
+NATIVE_FORMATS = (".ubj", ".json")
+
+
+def model_name(league: Optional[str] = None, version: Optional[str] = None) -> str:
+    """file name stem of a model slot"""
+    return "-".join(part for part in (MODEL_NAME, league, version) if part)
+
+
+class LoadedModel:
+    """
+    Class for a loaded model with its feature order.
+
+    Attributes:
+        model (xgb.XGBClassifier): The model.
+        path (Path): File the model was loaded from.
+        feature_names (list): Features in the order the model expects them.
+
+    Methods:
+        feature_index(columns: list) -> np.ndarray:
+            Returns the positions of the model features in columns.
+
+        predict_proba(x_df: pd.DataFrame) -> np.ndarray:
+            Returns the class probabilities of every row.
+    """
+
+    def __init__(self, model: xgb.XGBClassifier, path: Path):
+        self.model = model
+        self.path = Path(path)
+        self.feature_names: List[str] = list(model.get_booster().feature_names or [])
+        self._indices: Dict[Tuple[str, ...], np.ndarray] = {}
+
+    def feature_index(self, columns: Sequence[str]) -> np.ndarray:
+        """positions of the model features in columns, computed once per
+        column layout"""
+        key = tuple(columns)
+        index = self._indices.get(key)
+        if index is None:
+            position = {name: i for i, name in enumerate(key)}
+            missing = [f for f in self.feature_names if f not in position]
+            if missing:
+                raise KeyError(f"features missing for {self.path.name}: {missing}")
+            index = np.array([position[f] for f in self.feature_names], np.intp)
+            self._indices[key] = index
+        return index
+
+    def predict_proba(self, x_df: pd.DataFrame) -> np.ndarray:
+        """class probabilities of every row of x_df, columns in any order"""
+        index = self.feature_index(x_df.columns)
+        x = x_df.to_numpy(dtype=np.float32)[:, index]
+        return self.model.predict_proba(x)
+
+
+class ModelRegistry:
+    """
+    Class for finding, loading and caching the models of a model directory.
+
+    Attributes:
+        model_dir (Path): Directory of the model files.
+        max_models (int): Models kept loaded, least recently used go first.
+
+    Methods:
+        from_config(config: dict) -> ModelRegistry:
+            Returns the registry of the config's model_dir.
+
+        path(league: str, version: str) -> Path:
+            Returns the model file used for a league and version.
+
+        get(league: str, version: str) -> LoadedModel:
+            Returns the loaded model of a league and version.
+
+        convert(pkl_path: Path) -> Path:
+            Saves a pickled model in the native format.
+    """
+
+    def __init__(self, model_dir: Path, max_models: int = 4):
+        self.model_dir = Path(model_dir)
+        self.max_models = max_models
+        self._models: "OrderedDict[Path, Tuple[int, LoadedModel]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "ModelRegistry":
+        paths = config["global"]["paths"]
+        model_dir = Path(paths["root_dir"]) / Path(paths["model_dir"])
+        registry_config = config.get("inference", {}).get("model_registry", {})
+        return cls(model_dir, registry_config.get("max_models", 4))
+
+    def path(self, league: Optional[str] = None, version: Optional[str] = None) -> Path:
+        """most specific existing slot: league and version, league, default.
+        The legacy pickle is the last fallback"""
+        slots = [model_name(league, version), model_name(league), model_name()]
+        for stem in dict.fromkeys(slots):
+            for suffix in NATIVE_FORMATS:
+                path = self.model_dir / f"{stem}{suffix}"
+                if path.exists():
+                    return path
+        pkl_path = self.model_dir / f"{MODEL_NAME}.pkl"
+        if pkl_path.exists():
+            return pkl_path
+        raise FileNotFoundError(
+            f"no model for league {league} version {version} in {self.model_dir}"
+        )
+
+    def get(
+        self, league: Optional[str] = None, version: Optional[str] = None
+    ) -> LoadedModel:
+        """loaded model of a league and version, read from disk only if it is
+        not cached or its file changed"""
+        path = self.path(league, version)
+        if path.suffix == ".pkl":
+            path = self.convert(path)
+        mtime_ns = path.stat().st_mtime_ns
+        with self._lock:
+            cached = self._models.get(path)
+            if cached is not None and cached[0] == mtime_ns:
+                self._models.move_to_end(path)
+                return cached[1]
+
+            model = xgb.XGBClassifier()
+            model.load_model(path)
+            loaded = LoadedModel(model, path)
+            self._models[path] = (mtime_ns, loaded)
+            self._models.move_to_end(path)
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+            print(f"Loaded model {path.name}")
+            return loaded
+
+    def convert(self, pkl_path: Path, suffix: str = ".ubj") -> Path:
+        """save a pickled model in the native format next to it, returns the
+        new path. An existing native file is kept"""
+        pkl_path = Path(pkl_path)
+        native_path = pkl_path.with_suffix(suffix)
+        with self._lock:
+            if not native_path.exists():
+                with open(pkl_path, "rb") as f:
+                    model = pickle.load(f)
+                model.save_model(native_path)
+                print(f"Converted {pkl_path.name} to {native_path.name}")
+        return native_path
+
+
+@lru_cache(maxsize=None)
+def _shared_registry(model_dir: Path, max_models: int) -> ModelRegistry:
+    return ModelRegistry(model_dir, max_models)
+
+
+def model_registry(config: dict) -> ModelRegistry:
+    """registry of the config's model_dir, shared by the whole process"""
+    registry = ModelRegistry.from_config(config)
+    return _shared_registry(registry.model_dir, registry.max_models)
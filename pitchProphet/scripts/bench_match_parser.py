@@ -0,0 +1,95 @@
+"""
+Per-page parse time benchmark for saved FBref match report pages.
+
+Compares the previous scrape_match parsing (pd.read_html over every table on the
+page plus a BeautifulSoup pass for the scorebox) with the targeted lxml parser
+in match_parser.py. Both run on the same saved HTML so no network is involved.
+
+    python pitchProphet/scripts/bench_match_parser.py path/to/pages/*.html
+"""
+
+import argparse
+import re
+import time
+from io import StringIO
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from pitchProphet.data.fbref.match_parser import parse_match_page, team_stats
+
+
+def legacy_parse_match_page(content: bytes) -> Dict:
+    """the positional read_html + BeautifulSoup parse scrape_match used to do"""
+    tables = pd.read_html(StringIO(content.decode("utf-8")))
+
+    def process_team_stats(player_df, gk_df):
+        player_df.columns = player_df.columns.droplevel(0)
+        player_df = player_df.loc[:, ~player_df.columns.duplicated()]
+        gk_df.columns = gk_df.columns.droplevel(0)
+        gk_df = gk_df.loc[:, ~gk_df.columns.duplicated()]
+        return team_stats(player_df, gk_df)
+
+    home_stats = process_team_stats(tables[3], tables[9])
+    away_stats = process_team_stats(tables[10], tables[16])
+
+    soup = BeautifulSoup(content, "html.parser")
+    match_week = soup.find(string=re.compile(r"Matchweek \d+"))
+    match_week = int(re.sub(r"\D", "", match_week))
+    xg = soup.find_all(class_="score_xg")
+    goals = soup.find_all(class_="score")
+    teams = soup.select(".scorebox strong a")
+
+    match_info = {
+        "Matchweek": match_week,
+        "HomeTeam": str(teams[0].text),
+        "AwayTeam": str(teams[1].text),
+        "HomeGoal": int(goals[0].text),
+        "AwayGoal": int(goals[1].text),
+        "HomeXG": float(xg[0].text),
+        "AwayXG": float(xg[1].text),
+    }
+    return {
+        "MatchInfo": [match_info],
+        "HomeStat": home_stats["TeamStat"].to_dict("records"),
+        "AwayStat": away_stats["TeamStat"].to_dict("records"),
+    }
+
+
+def time_parser(parse: Callable, pages: List[bytes], repeat: int) -> List[float]:
+    """best-of-repeat wall time in milliseconds for each page"""
+    timings = []
+    for content in pages:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parse(content)
+            best = min(best, time.perf_counter() - start)
+        timings.append(best * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pages", nargs="+", type=Path, help="saved match html files")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = [p.read_bytes() for p in args.pages]
+    legacy = time_parser(legacy_parse_match_page, pages, args.repeat)
+    targeted = time_parser(parse_match_page, pages, args.repeat)
+
+    print(f"{'page':40s} {'legacy ms':>10s} {'targeted ms':>12s} {'speedup':>8s}")
+    for path, old, new in zip(args.pages, legacy, targeted):
+        print(f"{path.name[:40]:40s} {old:10.1f} {new:12.1f} {old / new:7.1f}x")
+    total_old, total_new = sum(legacy), sum(targeted)
+    print(
+        f"\nmean per page: legacy {total_old / len(pages):.1f} ms, "
+        f"targeted {total_new / len(pages):.1f} ms ({total_old / total_new:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+End-to-end scraper throughput benchmark against a local FBref stand-in.
+
+Pages are recorded once from FBref (record), or built synthetically, and served
+by ReplayServer with configurable latency, 429 injection and bandwidth. A full
+season is then scraped by FBRefScraper (sync) or AsyncFBRefScraper (async)
+with the page cache disabled, reporting matches/minute, bytes fetched, network
+requests and CPU time. --min-matches-per-minute makes it fail for CI.
+
+    python -m pitchProphet.scripts.bench_scraper record --limit 40 --out pages/
+    python -m pitchProphet.scripts.bench_scraper run --pages pages/ --latency 0.2
+    python -m pitchProphet.scripts.bench_scraper run --synthetic 60 --engine async
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+import yaml
+
+from pitchProphet.data.fbref.async_scraper import AsyncFBRefScraper
+from pitchProphet.data.fbref.fbref_scrapper import FBRefScraper
+from pitchProphet.data.fbref.http_client import HttpClient
+from pitchProphet.data.fbref.match_parser import parse_match_page
+from pitchProphet.data.fbref.raw_io import find_raw_files, read_raw_matches
+from pitchProphet.data.fbref.replay.server import ReplayServer, load_pages, record_pages
+from pitchProphet.data.fbref.replay.synthetic_pages import synthetic_season
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "config" / "config.yaml"
+
+
+def _cpu_seconds() -> float:
+    """user + system time of this process and its finished children"""
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def parse_cpu_ms(pages: Dict[str, bytes]) -> float:
+    """mean cpu milliseconds parse_match_page spends on a match page"""
+    match_pages = [c for path, c in pages.items() if "/en/matches/" in path]
+    if not match_pages:
+        return 0.0
+    start = time.process_time()
+    for content in match_pages:
+        parse_match_page(content)
+    return (time.process_time() - start) * 1000 / len(match_pages)
+
+
+def run_benchmark(
+    pages: Dict[str, bytes],
+    league: str,
+    season: str,
+    engine: str = "sync",
+    requests_per_minute: float = 600,
+    max_in_flight: int = 4,
+    parse_workers: int = 2,
+    **server_options,
+) -> Dict:
+    """scrape a replayed season once and return the throughput figures"""
+    with open(CONFIG_PATH, "r") as f:
+        config = yaml.safe_load(f)
+
+    with tempfile.TemporaryDirectory() as root_dir, ReplayServer(
+        pages, **server_options
+    ) as server:
+        config["global"]["paths"]["root_dir"] = root_dir
+        scraper_config = config["scraper"]
+        scraper_config["base_url"] = f"{server.url}/en/comps"
+        scraper_config["cache"]["enabled"] = False
+        scraper_config["rate_limit"]["requests_per_minute"] = requests_per_minute
+        scraper_config["rate_limit"]["backoff_base"] = 1
+        scraper_config["concurrency"] = {
+            "max_in_flight": max_in_flight,
+            "parse_workers": parse_workers,
+        }
+        config_path = Path(root_dir) / "config.yaml"
+        with open(config_path, "w") as f:
+            yaml.safe_dump(config, f)
+
+        client = HttpClient.from_config(config)
+        cpu_start, start = _cpu_seconds(), time.perf_counter()
+        if engine == "async":
+            scraper = AsyncFBRefScraper(config_path, client=client)
+            asyncio.run(scraper.scrape_leagues(season, [league]))
+        else:
+            scraper = FBRefScraper(config_path, client=client)
+            scraper.scrape_season(season, league)
+        elapsed = time.perf_counter() - start
+        cpu = _cpu_seconds() - cpu_start
+
+        matches = sum(
+            1
+            for path in find_raw_files(scraper._output_path())
+            for _ in read_raw_matches(path)
+        )
+        stats = dict(server.stats)
+
+    return {
+        "engine": engine,
+        "matches": matches,
+        "seconds": round(elapsed, 3),
+        "matches_per_minute": round(matches / elapsed * 60, 1),
+        "bytes_fetched": stats["bytes_sent"],
+        "network_requests": client.network_requests,
+        "throttled": stats["throttled"],
+        # includes the replay server thread, which runs in this process
+        "cpu_seconds": round(cpu, 3),
+        "parse_cpu_ms_per_match": round(parse_cpu_ms(pages), 2),
+    }
+
+
+def record(args) -> None:
+    """record a schedule page and its match reports from FBref"""
+    scraper = FBRefScraper(CONFIG_PATH)
+    schedule_url = scraper._schedule_url(args.season, args.league)
+    links = scraper.get_match_links(schedule_url, args.league)
+    if args.limit:
+        links = links[: args.limit]
+    index_path = record_pages([schedule_url] + links, args.out, scraper.client)
+    print(f"Recorded {len(links)} matches to {index_path.parent}")
+
+
+def run(args) -> None:
+    if args.pages is not None:
+        # links of the schedule that were not recorded are served as 404s
+        # and count as failed matches
+        pages = load_pages(args.pages)
+    else:
+        with open(CONFIG_PATH, "r") as f:
+            league_id = yaml.safe_load(f)["scraper"]["league_ids"][args.league]
+        pages = synthetic_season(args.league, league_id, args.season, args.synthetic)
+
+    result = run_benchmark(
+        pages,
+        args.league,
+        args.season,
+        engine=args.engine,
+        requests_per_minute=args.requests_per_minute,
+        max_in_flight=args.max_in_flight,
+        parse_workers=args.parse_workers,
+        latency=args.latency,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        bandwidth=args.bandwidth,
+    )
+    print(json.dumps(result))
+    if result["matches_per_minute"] < args.min_matches_per_minute:
+        print(
+            f"throughput {result['matches_per_minute']} matches/min is below "
+            f"{args.min_matches_per_minute}"
+        )
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--league", default="Premier-League")
+    parser.add_argument("--season", default="2017-2018")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="record pages from fbref")
+    record_parser.add_argument("--out", type=Path, required=True)
+    record_parser.add_argument("--limit", type=int, default=None)
+
+    run_parser = commands.add_parser("run", help="scrape replayed pages")
+    source = run_parser.add_mutually_exclusive_group()
+    source.add_argument("--pages", type=Path, help="directory made by record")
+    source.add_argument("--synthetic", type=int, default=40, help="n fake matches")
+    run_parser.add_argument("--engine", choices=["sync", "async"], default="sync")
+    run_parser.add_argument("--requests-per-minute", type=float, default=600)
+    run_parser.add_argument("--max-in-flight", type=int, default=4)
+    run_parser.add_argument("--parse-workers", type=int, default=2)
+    run_parser.add_argument("--latency", type=float, default=0.0)
+    run_parser.add_argument("--throttle-rate", type=float, default=0.0)
+    run_parser.add_argument("--retry-after", type=float, default=0.5)
+    run_parser.add_argument("--bandwidth", type=float, default=None, help="bytes/s")
+    run_parser.add_argument("--min-matches-per-minute", type=float, default=0.0)
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
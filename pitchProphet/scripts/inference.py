@@ -1,29 +1,42 @@
-import glob
-import pickle
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 import yaml
 
 from pitchProphet.data.fbref.fbref_scrapper import FBRefScraper
-from pitchProphet.data.pre_processing.calculate_stats import DescriptiveStats
+from pitchProphet.data.fbref.http_client import HttpClient
+from pitchProphet.data.fbref.raw_catalog import RawCatalog
+from pitchProphet.data.fbref.schedule import fetch_schedule, week_fixtures
+from pitchProphet.data.pre_processing.aggregations import DEFAULT_METHODS
+from pitchProphet.data.pre_processing.feature_store import FeatureStore
 from pitchProphet.data.pre_processing.load_data import LoadData
+from pitchProphet.data.pre_processing.match_frame import MatchFrame
+from pitchProphet.data.pre_processing.rolling_stats import RollingStats
+from pitchProphet.models.registry import LoadedModel, ModelRegistry, model_registry
 from pitchProphet.utils.matchweek_date import get_current_matchweek
 
+_STORE_LOCK = threading.Lock()
 
-def get_fixtures(match_week: int, url: str) -> pd.DataFrame:
-    """returns a fixture list from FBRef for a given match week."""
+
+def get_schedule(url: str, client: Optional[HttpClient] = None) -> pd.DataFrame:
+    """returns the parsed scores and fixtures page of a league season."""
     try:
-        all_fixtures = pd.read_html(url)
-        week_fixtures = all_fixtures[0][all_fixtures[0]["Wk"] == match_week]
-        team_list = week_fixtures[["Home", "Away"]].reset_index(drop=True)
-        team_list.name = f"Matchweek {match_week}"
-        return team_list
+        return fetch_schedule(url, client or HttpClient({}))
     except Exception as e:
-        print(f"Error fetching fixtures: {e}")
+        print(f"Error fetching schedule: {e}")
+        return pd.DataFrame()
+
+
+def get_fixtures(match_week: int, schedule: pd.DataFrame) -> pd.DataFrame:
+    """returns the fixture list of a given match week from the schedule."""
+    if schedule.empty:
         return pd.DataFrame()
+    return week_fixtures(schedule, match_week)
 
 
 def load_config(path: str) -> dict:
@@ -39,10 +52,12 @@ def load_config(path: str) -> dict:
 
 def check_existing_data(inf_raw_dir: Path, league: str, match_week: int) -> bool:
     """check if data for the specified league and match week exists"""
-    print(inf_raw_dir)
-    match_week = str(match_week)
-    pattern = f"{str(inf_raw_dir)}/*{league}*match_week-{match_week}*.json"
-    existing_files = glob.glob(pattern)
+    if not Path(inf_raw_dir).exists():
+        return False
+    with RawCatalog(inf_raw_dir) as catalog:
+        existing_files = catalog.select(
+            league=league, match_week=match_week, skip_duplicates=False
+        )
     if existing_files:
         print(f"\nFound existing data file(s):")
         for f in existing_files:
@@ -54,11 +69,14 @@ def check_existing_data(inf_raw_dir: Path, league: str, match_week: int) -> bool
 def inference_raw_data(
     config_path: Path,
     league: str,
+    client: Optional[HttpClient] = None,
+    fixtures: Optional[pd.DataFrame] = None,
+    schedule: Optional[pd.DataFrame] = None,
 ) -> bool:
-    """scrape match data"""
+    """scrape the last matches of the teams in fixtures"""
     try:
-        scraper = FBRefScraper(config_path, inference=True)
-        scraper.scrape_season("2024-2025", league)
+        scraper = FBRefScraper(config_path, inference=True, client=client)
+        scraper.scrape_season("2024-2025", league, fixtures=fixtures, schedule=schedule)
         return True
     except Exception as e:
         print(f"Error scraping data: {e}")
@@ -75,79 +93,103 @@ def load_data(config_path, league=None, match_week=None):
     return data
 
 
-def add_stats(fixtures, data, config: dict):
+def add_stats(fixtures, data, config: dict, league: Optional[str] = None):
     """add historical stats for each team in the fixtures."""
-    # initialize DescriptiveStats with inference mode
-    last_n_match = config["inference"]["last_n_match"]
-    stats_calculator = DescriptiveStats(data, last_n_match, inference=True)
-
-    all_home_stats = []
-    all_away_stats = []
-
-    # process each fixture
-    for _, row in fixtures.iterrows():
-        try:
-            # Calculate stats for the match
-            match_stats = stats_calculator.process_home_away_features(row)
-            all_home_stats.append(match_stats["home_stats"])
-            all_away_stats.append(match_stats["away_stats"])
-        except Exception as e:
-            print(f"Error processing fixture: {e}")
-            continue
+    if fixtures.empty:
+        return {"home_data": pd.DataFrame(), "away_data": pd.DataFrame()}
 
-    # convert lists to DataFrames
-    home_stats_df = pd.DataFrame(all_home_stats)
-    away_stats_df = pd.DataFrame(all_away_stats)
-
-    return {"home_data": home_stats_df, "away_data": away_stats_df}
-
-
-def process_data(data: Dict[str, pd.DataFrame], model_path: Path) -> pd.DataFrame:
-    """process data and make predictions using the loaded model"""
+    # stats of every fixture's teams in one pass, in inference mode
+    last_n_match = config["inference"]["last_n_match"]
+    methods = config.get("processing", {}).get("aggregation_methods")
+    methods = methods or DEFAULT_METHODS
+    frame = MatchFrame.from_frame(data, np.float64)
+
+    # a league's team state is kept between runs, only new matches are added
+    store = None
+    if league is not None:
+        store = FeatureStore.from_config(config, f"inference-{league}", last_n_match)
+    if store is not None:
+        store.update(frame)
+        stats_calculator = store
+    else:
+        stats_calculator = RollingStats(frame, last_n_match, True, methods)
+    match_stats = stats_calculator.fixture_features(fixtures, league)
+
+    return {
+        "home_data": match_stats["home_stats"],
+        "away_data": match_stats["away_stats"],
+    }
+
+
+def feature_matrix(data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """model input of fixtures, home and away team stats side by side"""
 
     # process data for inference
-    home_stat = data["home_data"]
-    away_stat = data["away_data"]
-
-    if "Unnamed: 0" in home_stat.columns:
-        home_stat.drop(columns=["Unnamed: 0"], inplace=True)
-    if "Unnamed: 0" in away_stat.columns:
-        away_stat.drop(columns=["Unnamed: 0"], inplace=True)
+    home_stat = data["home_data"].drop(columns=["Unnamed: 0"], errors="ignore")
+    away_stat = data["away_data"].drop(columns=["Unnamed: 0"], errors="ignore")
 
     # rename columns
-    home_stat.columns = ["h" + col for col in home_stat.columns]
-    away_stat.columns = ["a" + col for col in away_stat.columns]
+    home_stat = home_stat.add_prefix("h")
+    away_stat = away_stat.add_prefix("a")
 
     # combine features
     x_df = pd.concat([home_stat, away_stat], axis=1)
-    x_df = x_df.apply(pd.to_numeric)
+    return x_df.apply(pd.to_numeric)
 
-    # load model
-    with open(model_path, "rb") as f:
-        model = pickle.load(f)
 
-    # re-order the input according to model's expectation
-    model_features = model.get_booster().feature_names
-    x_df = x_df[model_features]
-
-    # make predictions
-    # predictions = model.predict(x_df)
-    probabilities = model.predict_proba(x_df)
-
-    # create results DataFrame
-    results = pd.DataFrame(
+def probability_frame(probabilities: np.ndarray) -> pd.DataFrame:
+    """results DataFrame of the predicted class probabilities"""
+    return pd.DataFrame(
         {
             "p(Home Win)": probabilities[:, 0],
             "p(Draw)": probabilities[:, 1],
             "p(Away Win)": probabilities[:, 2],
         }
     )
-    return results
+
+
+def process_data(data: Dict[str, pd.DataFrame], model: LoadedModel) -> pd.DataFrame:
+    """process data and make predictions using the loaded model"""
+    # the input is re-ordered according to the model's feature order
+    probabilities = model.predict_proba(feature_matrix(data))
+    return probability_frame(probabilities)
+
+
+def predict_batch(
+    inputs: Dict[str, pd.DataFrame], registry: ModelRegistry
+) -> Dict[str, pd.DataFrame]:
+    """predictions of every league's model input, the rows of all leagues
+    using the same model are predicted in one call"""
+    # leagues grouped by the model file they use
+    groups: Dict[Path, List[str]] = {}
+    for league in inputs:
+        groups.setdefault(registry.path(league), []).append(league)
+
+    predictions = {}
+    for leagues in groups.values():
+        model = registry.get(leagues[0])
+        batch = []
+        for league in leagues:
+            try:
+                model.feature_index(inputs[league].columns)
+                batch.append(league)
+            except KeyError as e:
+                print(f"Error predicting {league}: {e}")
+        if not batch:
+            continue
+
+        # one aligned matrix, split back per league by row counts
+        x_df = pd.concat([inputs[league] for league in batch], ignore_index=True)
+        probabilities = model.predict_proba(x_df)
+        offsets = np.cumsum([0] + [len(inputs[league]) for league in batch])
+        for league, start, stop in zip(batch, offsets[:-1], offsets[1:]):
+            predictions[league] = probability_frame(probabilities[start:stop])
+    return predictions
 
 
 def save_predictions(
     config: dict, results: pd.DataFrame, league: str, match_week: int
-) -> None:
+) -> Path:
     """save prediction results to CSV file in web assets directory"""
     # TODO: think about refactoring later!
     # create directory path
@@ -162,80 +204,134 @@ def save_predictions(
     # save to CSV
     results.to_csv(save_path, index=False)
     print(f"\nPredictions saved to: {save_path}")
-    return
+    return save_path
 
 
-def main():
-    script_dir = Path(__file__).parent.parent
-    config_path = script_dir / "config" / "config.yaml"
-    config = load_config(config_path)
+def prepare_league(
+    config_path: Path,
+    config: dict,
+    league: str,
+    current_week: int,
+    client: Optional[HttpClient] = None,
+) -> Optional[Dict]:
+    """fixtures of a league's next match week with their model input, None if
+    there is nothing to predict"""
     paths = config["global"]["paths"]
+    print(f"\nProcessing {league}...")
+    league_id = config["scraper"]["league_ids"][league]
+    url = f"{config['scraper']['base_url']}/{league_id}/2024-2025/schedule/2024-2025-{league}-Scores-and-Fixtures"
+
+    next_week = current_week + 1
+    print(f"Getting fixtures for week {next_week}")
+
+    # get fixtures for next week, the schedule is fetched once and also
+    # gives the scraper the match links
+    schedule = get_schedule(url, client)
+    fixtures = get_fixtures(next_week, schedule)
+    if fixtures.empty:
+        print(f"No fixtures found for {league} week {next_week}")
+        return None
+
+    print(f"\nFixtures for {league} week {next_week}:")
+    print(fixtures)
+
+    # if data exists or if force scrap is false, use existing data
+    inf_raw_dir = Path(paths["root_dir"]) / Path(paths["inf_raw_dir"])
+    force_scrape = config["inference"]["force_scrape"]
+    if not force_scrape and check_existing_data(inf_raw_dir, league, current_week):
+        print(f"Using existing data for {league} week {current_week}")
+    else:
+        # data doesn't exist or force_scrape=True, so scrape new data
+        print(f"\nScraping data for {league} week {current_week}...")
+        inference_raw_data(config_path, league, client, fixtures, schedule)
+
+    # pre-process inference raw data. hdf5 (raw and feature stores) is not
+    # thread safe, leagues load their data and stats one at a time
+    with _STORE_LOCK:
+        data = load_data(config_path, league=league, match_week=current_week)
+        if data.empty:
+            print(f"No data available for {league} week {next_week}")
+            return None
+        inf_input = add_stats(fixtures, data, config, league)
+    return {
+        "fixtures": fixtures,
+        "x_df": feature_matrix(inf_input),
+        "match_week": next_week,
+    }
+
+
+def run(config_path: Path) -> Dict[str, Optional[Path]]:
+    """predict the next match week of every league without active matches.
+    returns the predictions file of each league with fixtures to predict,
+    None for the leagues that failed. leagues with nothing to predict (no
+    fixtures next week, no data) are left out"""
+    config = load_config(config_path)
+    client = HttpClient.from_config(config)
 
     # get current match weeks for all leagues
     current_weeks = get_current_matchweek()
-    # process each league
+    leagues = {}
     for league, current_week in current_weeks.items():
-        try:
-            # skip if there are active matches (current_week is None)
-            if current_week is None:
-                print(f"\nSkipping {league} - active matches or no data")
-                continue
-
-            print(f"\nProcessing {league}...")
-            league_id = config["scraper"]["league_ids"][league]
-            url = f"{config['scraper']['base_url']}/{league_id}/2024-2025/schedule/2024-2025-{league}-Scores-and-Fixtures"
-
-            next_week = current_week + 1
-            print(f"Getting fixtures for week {next_week}")
-
-            # get fixtures for next week
-            fixtures = get_fixtures(next_week, url)
-            if fixtures.empty:
-                print(f"No fixtures found for {league} week {next_week}")
-                continue
-
-            print(f"\nFixtures for {league} week {next_week}:")
-            print(fixtures)
-
-            # if data exists or if force scrap is false, use existing data
-            inf_raw_dir = Path(paths["root_dir"]) / Path(paths["inf_raw_dir"])
-            force_scrape = config["inference"]["force_scrape"]
-            if not force_scrape and check_existing_data(
-                inf_raw_dir, league, current_week
-            ):
-                print(f"Using existing data for {league} week {current_week}")
-            else:
-                # data doesn't exist or force_scrape=True, so scrape new data
-                print(f"\nScraping data for {league} week {current_week}...")
-                inference_raw_data(
-                    config_path,
-                    league,
-                )
-
-            # pre-process inference raw data
-            data = load_data(config_path, league=league, match_week=current_week)
-            if data.empty:
-                print(f"No data available for {league} week {next_week}")
-                continue
-            inf_input = add_stats(fixtures, data, config)
-
-            model_path = (
-                Path(paths["root_dir"]) / Path(paths["model_dir"]) / "xgb_model.pkl"
+        # skip if there are active matches (current_week is None)
+        if current_week is None:
+            print(f"\nSkipping {league} - active matches or no data")
+            continue
+        leagues[league] = current_week
+    saved: Dict[str, Optional[Path]] = {}
+    if not leagues:
+        return saved
+
+    # fixtures and model input of each league, prepared concurrently. the
+    # workers share the client, so its rate limit holds for all of them
+    workers = max(1, min(config["inference"].get("workers", 1), len(leagues)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            league: pool.submit(
+                prepare_league, config_path, config, league, current_week, client
             )
-            predictions = process_data(inf_input, model_path)
+            for league, current_week in leagues.items()
+        }
+    prepared = {}
+    for league, future in futures.items():
+        try:
+            league_input = future.result()
+        except Exception as e:
+            print(f"Error processing {league}: {e}")
+            saved[league] = None
+            continue
+        if league_input is not None:
+            prepared[league] = league_input
+            saved[league] = None
+    if not prepared:
+        return saved
+
+    # the fixtures of all leagues are predicted together, models are loaded
+    # once per process
+    try:
+        predictions = predict_batch(
+            {league: p["x_df"] for league, p in prepared.items()},
+            model_registry(config),
+        )
+    except Exception as e:
+        print(f"Error predicting fixtures: {e}")
+        return saved
 
-            # combine fixtures with predictions
-            results = pd.concat([fixtures, predictions], axis=1)
-            print(f"\nPredictions for {league}:")
-            print(results)
+    for league, predicted in predictions.items():
+        # combine fixtures with predictions
+        results = pd.concat([prepared[league]["fixtures"], predicted], axis=1)
+        print(f"\nPredictions for {league}:")
+        print(results)
 
-            # save
+        # save
+        saved[league] = save_predictions(
+            config, results, league, prepared[league]["match_week"]
+        )
+    return saved
 
-            save_predictions(config, results, league, next_week)
 
-        except Exception as e:
-            print(f"Error processing {league}: {e}")
-            continue
+def main():
+    script_dir = Path(__file__).parent.parent
+    run(script_dir / "config" / "config.yaml")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,370 @@
+"""
+Cached pipeline of the get-data, pre-process and inference-data stages.
+
+Every stage declares its inputs: the config sections it reads, content hashes
+of the raw files (from their catalog), of the model files and, for get-data
+and inference, the current match weeks. The hash of the inputs is the stage's fingerprint,
+and after a stage ran its fingerprint and the hashes of its outputs are
+written to pipeline_dir/{stage}.json. A stage is skipped when its fingerprint
+and its outputs on disk are unchanged since it last ran, and downstream
+stages see the output hashes of their upstream stages, so an upstream re-run
+that writes the same files does not re-run them either.
+
+    poetry run pipeline                 # every stage that changed
+    poetry run pipeline inference-data  # one stage (and its upstream stages)
+    poetry run pipeline --force pre-process
+    poetry run pipeline --dry-run
+
+A config tweak only re-runs the stages reading the changed section, and a
+cron tick with nothing new (same match weeks, model and data) is a few hashes.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from pitchProphet.data.fbref.raw_catalog import RawCatalog
+from pitchProphet.data.fbref.raw_io import scraped_raw_dir, training_raw_dir
+from pitchProphet.models.registry import MODEL_NAME
+from pitchProphet.scripts.inference import load_config
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "config" / "config.yaml"
+
+# scraper settings that change how pages are fetched, not the scraped data
+SCRAPER_RUNTIME_KEYS = ("rate_limit", "cache", "concurrency", "checkpoint_every")
+
+
+def file_digest(path: Path) -> Optional[str]:
+    """sha256 of a file's content, None if it does not exist"""
+    path = Path(path)
+    if not path.is_file():
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def raw_digest(raw_dir: Path) -> Optional[str]:
+    """hash of every raw file of a directory, from the content hashes of its
+    catalog. None if the directory does not exist"""
+    raw_dir = Path(raw_dir)
+    if not raw_dir.is_dir():
+        return None
+    with RawCatalog(raw_dir) as catalog:
+        entries = catalog.entries()
+    digest = hashlib.sha256()
+    for entry in entries:
+        digest.update(f"{entry['name']}:{entry['digest']}\n".encode())
+    return digest.hexdigest()
+
+
+def fingerprint(inputs: Dict) -> str:
+    """hash of a stage's inputs"""
+    encoded = json.dumps(inputs, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _path(config: dict, key: str) -> Path:
+    paths = config["global"]["paths"]
+    return Path(paths["root_dir"]) / Path(paths[key])
+
+
+class Stage:
+    """
+    Class for one stage of the pipeline.
+
+    Attributes:
+        name (str): Name of the stage, the command it replaces.
+        run (Callable): Runs the stage with a config path.
+        inputs (Callable): Returns the stage's inputs of a config as a dict.
+        outputs (Callable): Returns the hashes of the stage's outputs.
+        deps (tuple): Names of the stages that run before it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[Path], None],
+        inputs: Callable[[dict], Dict],
+        outputs: Callable[[dict], Dict],
+        deps: Sequence[str] = (),
+    ):
+        self.name = name
+        self.run = run
+        self.inputs = inputs
+        self.outputs = outputs
+        self.deps = tuple(deps)
+
+
+class Pipeline:
+    """
+    Class for running stages in dependency order, skipping unchanged ones.
+
+    Attributes:
+        config_path (Path): Path of the config the stages run with.
+        config (dict): The loaded config.
+        stages (dict): Stages by name, in declaration order.
+        state_dir (Path): Directory of the last run record of every stage.
+
+    Methods:
+        order(targets: list) -> list:
+            Returns the stages to run for the targets, upstream first.
+
+        fingerprint(name: str) -> str:
+            Returns the current fingerprint of a stage.
+
+        is_fresh(name: str) -> bool:
+            Returns whether a stage's inputs and outputs are unchanged.
+
+        run(targets: list, force: bool, dry_run: bool) -> dict:
+            Runs the changed stages and returns the status of every stage.
+    """
+
+    def __init__(
+        self,
+        config_path: Path,
+        stages: Optional[List[Stage]] = None,
+        state_dir: Optional[Path] = None,
+    ):
+        self.config_path = Path(config_path)
+        self.config = load_config(self.config_path)
+        self.stages = {s.name: s for s in (stages or default_stages())}
+        self.state_dir = Path(state_dir or _path(self.config, "pipeline_dir"))
+
+    def order(self, targets: Optional[Iterable[str]] = None) -> List[str]:
+        """targets and their upstream stages, every stage after its deps"""
+        ordered, visiting = [], set()
+
+        def visit(name: str) -> None:
+            if name not in self.stages:
+                raise ValueError(
+                    f"unknown stage '{name}', available: {', '.join(self.stages)}"
+                )
+            if name in ordered:
+                return
+            if name in visiting:
+                raise ValueError(f"stage '{name}' depends on itself")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            ordered.append(name)
+
+        for name in targets or self.stages:
+            visit(name)
+        return ordered
+
+    def _record_path(self, name: str) -> Path:
+        return self.state_dir / f"{name}.json"
+
+    def _record(self, name: str) -> Optional[Dict]:
+        """last run record of a stage, None if it never ran"""
+        path = self._record_path(name)
+        if not path.exists():
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _save_record(self, name: str, record: Dict) -> None:
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        path = self._record_path(name)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(record, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def fingerprint(self, name: str) -> str:
+        """hash of a stage's inputs and the outputs of its upstream stages"""
+        stage = self.stages[name]
+        upstream = {dep: (self._record(dep) or {}).get("outputs") for dep in stage.deps}
+        return fingerprint({"inputs": stage.inputs(self.config), "upstream": upstream})
+
+    def is_fresh(self, name: str) -> bool:
+        """whether a stage ran with its current inputs and its outputs are
+        still the ones it wrote"""
+        record = self._record(name)
+        if record is None or record["fingerprint"] != self.fingerprint(name):
+            return False
+        return record["outputs"] == self.stages[name].outputs(self.config)
+
+    def run(
+        self,
+        targets: Optional[Iterable[str]] = None,
+        force: bool = False,
+        dry_run: bool = False,
+    ) -> Dict[str, str]:
+        """run the stages of the targets whose inputs or outputs changed.
+        force re-runs the targets even if unchanged"""
+        targets = list(targets or [])
+        forced = set(targets or self.stages) if force else set()
+        status = {}
+        for name in self.order(targets):
+            if name not in forced and self.is_fresh(name):
+                print(f"[{name}] unchanged, skipped")
+                status[name] = "cached"
+                continue
+            if dry_run:
+                print(f"[{name}] would run")
+                status[name] = "stale"
+                continue
+
+            print(f"[{name}] running")
+            start = time.perf_counter()
+            # a stage that raises is not recorded and runs again next time
+            self.stages[name].run(self.config_path)
+            seconds = time.perf_counter() - start
+            # the fingerprint is taken after the run, stages that extend their
+            # own inputs (inference scrapes the data it predicts from) are
+            # fresh on the next run
+            self._save_record(
+                name,
+                {
+                    "fingerprint": self.fingerprint(name),
+                    "outputs": self.stages[name].outputs(self.config),
+                    "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "seconds": round(seconds, 3),
+                },
+            )
+            print(f"[{name}] done in {seconds:.1f}s")
+            status[name] = "ran"
+        return status
+
+
+def _scrape(config_path: Path) -> None:
+    from pitchProphet.data.fbref.fbref_scrapper import FBRefScraper
+
+    FBRefScraper(config_path).scrape_season()
+
+
+def _pre_process(config_path: Path) -> None:
+    from pitchProphet.data.pre_processing import pre_process
+
+    pre_process.run(config_path)
+
+
+def _inference(config_path: Path) -> None:
+    from pitchProphet.scripts import inference
+
+    # a league that wrote no predictions must be run again, so the stage is
+    # not recorded
+    failed = [league for league, path in inference.run(config_path).items() if not path]
+    if failed:
+        raise RuntimeError(f"no predictions written for {failed}")
+
+
+def _scrape_inputs(config: dict) -> Dict:
+    from pitchProphet.utils.matchweek_date import get_current_matchweek
+
+    scraper = config["scraper"]
+    return {
+        "scraper": {k: v for k, v in scraper.items() if k not in SCRAPER_RUNTIME_KEYS},
+        # the season's schedule grows every match week
+        "match_weeks": get_current_matchweek(),
+    }
+
+
+def _scrape_outputs(config: dict) -> Dict:
+    # the directory the scraper writes to
+    return {"raw": raw_digest(scraped_raw_dir(config["global"]["paths"]))}
+
+
+def _pre_process_inputs(config: dict) -> Dict:
+    processing = dict(config["processing"])
+    # worker counts change how fast, not what is processed
+    processing.pop("ingest_workers", None)
+    processing["sharding"] = {"by": processing.get("sharding", {}).get("by", "league")}
+    # the scraped raw files (also from backfill and get-data-async runs) and
+    # the ones LoadData reads
+    paths = config["global"]["paths"]
+    return {
+        "processing": processing,
+        "raw": raw_digest(scraped_raw_dir(paths)),
+        "team_data": raw_digest(training_raw_dir(paths)),
+    }
+
+
+def _pre_process_outputs(config: dict) -> Dict:
+    path = _path(config, "processed_dir") / "training_data.h5"
+    return {path.name: file_digest(path)}
+
+
+def _inference_inputs(config: dict) -> Dict:
+    from pitchProphet.utils.matchweek_date import get_current_matchweek
+
+    processing = config["processing"]
+    return {
+        "inference": config["inference"],
+        "processing": {
+            key: processing.get(key)
+            for key in ("x_vars", "aggregation_methods", "feature_store")
+        },
+        "scraper": {
+            key: config["scraper"].get(key) for key in ("base_url", "league_ids")
+        },
+        "models": {
+            path.name: file_digest(path)
+            for path in sorted(_path(config, "model_dir").glob(f"{MODEL_NAME}*"))
+        },
+        "match_weeks": get_current_matchweek(),
+        "raw": raw_digest(scraped_raw_dir(config["global"]["paths"], inference=True)),
+    }
+
+
+def _inference_outputs(config: dict) -> Dict:
+    out_dir = _path(config, "inf_out_dir")
+    return {
+        path.name: file_digest(path)
+        for path in sorted(out_dir.glob("*_predictions.csv"))
+    }
+
+
+def default_stages() -> List[Stage]:
+    """get-data -> pre-process, and inference-data, which reads the model
+    trained from the processed data and its own raw data"""
+    return [
+        Stage("get-data", _scrape, _scrape_inputs, _scrape_outputs),
+        Stage(
+            "pre-process",
+            _pre_process,
+            _pre_process_inputs,
+            _pre_process_outputs,
+            deps=("get-data",),
+        ),
+        Stage("inference-data", _inference, _inference_inputs, _inference_outputs),
+    ]
+
+
+def main() -> None:
+    stage_names = [stage.name for stage in default_stages()]
+    parser = argparse.ArgumentParser(description="run the changed pipeline stages")
+    parser.add_argument(
+        "stages",
+        nargs="*",
+        help=f"stages to run with their upstream stages ({', '.join(stage_names)}), "
+        "default all",
+    )
+    parser.add_argument("--config", type=Path, default=CONFIG_PATH)
+    parser.add_argument(
+        "--force", action="store_true", help="re-run the stages even if unchanged"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only print which stages would run"
+    )
+    args = parser.parse_args()
+
+    unknown = [name for name in args.stages if name not in stage_names]
+    if unknown:
+        parser.error(f"unknown stages {unknown}, available: {stage_names}")
+
+    pipeline = Pipeline(args.config)
+    pipeline.run(args.stages, force=args.force, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,9 @@ cd $PITCH_PROPHET_ROOT || { echo "Failed to change directory to $PITCH_PROPHET_R
 # create logs directory
 mkdir -p logs
 
-# run inference with logging
-poetry run python pitchProphet/scripts/inference.py >> logs/prediction_updates.log 2>&1
+# run inference with logging, skipped when match weeks, model, config and
+# data are unchanged since the last run
+poetry run pipeline inference-data >> logs/prediction_updates.log 2>&1
 
 exit 0
                      
\ No newline at end of file
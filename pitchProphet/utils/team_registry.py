@@ -0,0 +1,167 @@
+"""
+Canonical team names and integer team ids shared across the pipeline.
+
+Team names differ between fbref pages (match reports say "Manchester United",
+scores and fixtures pages "Manchester Utd") and between sources. The registry
+reads the teams of every league with their aliases from config/teams.yaml and
+resolves a name by:
+    1. its alias in the given league, then in any league
+    2. its normalized form (case, accents, punctuation and "Utd" ignored)
+Every registered team has one dense integer id, and columns of names become
+integer arrays with TeamRegistry.ids. Names it does not know keep their own
+name and get a local id (-2, -3, ...) from a map owned by the caller, so the
+shared registry only changes through add.
+"""
+
+import re
+import threading
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import yaml
+
+TEAMS_PATH = Path(__file__).resolve().parent.parent / "config" / "teams.yaml"
+
+
+def normalize_name(name: str) -> str:
+    """lowercase words of a team name without accents or punctuation"""
+    text = unicodedata.normalize("NFKD", str(name))
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    words = re.findall(r"[a-z0-9]+", text.replace("&", " and "))
+    return " ".join("united" if w == "utd" else w for w in words)
+
+
+class TeamRegistry:
+    """
+    Class for resolving team names to canonical names and integer ids.
+
+    Attributes:
+        teams (list): Canonical team names, a team's id is its position.
+
+    Methods:
+        from_yaml(path: Path) -> TeamRegistry:
+            Returns the registry of the leagues and aliases of a yaml file.
+
+        add(team: str, league: str, aliases: list) -> int:
+            Registers a team with its aliases and returns its id.
+
+        find(name: str, league: str) -> str | None:
+            Returns the canonical name of a known team, None otherwise.
+
+        canonical(name: str, league: str) -> str:
+            Returns the canonical name, the name itself if unknown.
+
+        team_id(name: str, league: str, local: dict) -> int:
+            Returns the id of a team, a local id for unknown teams.
+
+        ids(names, league, local: dict) -> np.ndarray:
+            Returns the ids of a column of team names.
+
+        names(ids: np.ndarray, local: dict) -> np.ndarray:
+            Returns the canonical names of team ids.
+    """
+
+    def __init__(self, leagues: Optional[Dict[str, Dict[str, List[str]]]] = None):
+        self.teams: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._names: Dict[str, Optional[str]] = {}
+        self._league_names: Dict[tuple, str] = {}
+        self._lock = threading.Lock()
+        for league, teams in (leagues or {}).items():
+            for team, aliases in (teams or {}).items():
+                self.add(team, league, aliases or [])
+
+    @classmethod
+    def from_yaml(cls, path: Path = TEAMS_PATH) -> "TeamRegistry":
+        with open(path, "r") as file:
+            return cls(yaml.safe_load(file))
+
+    def add(
+        self, team: str, league: Optional[str] = None, aliases: Iterable[str] = ()
+    ) -> int:
+        """register a canonical team name and its aliases"""
+        with self._lock:
+            if team not in self._ids:
+                self._ids[team] = len(self.teams)
+                self.teams.append(team)
+            for name in [team, *aliases]:
+                key = normalize_name(name)
+                if league is not None:
+                    self._league_names[(league, key)] = team
+                # a name used by teams of two leagues only resolves in its league
+                if self._names.setdefault(key, team) != team:
+                    self._names[key] = None
+            return self._ids[team]
+
+    def find(self, name: str, league: Optional[str] = None) -> Optional[str]:
+        """canonical name of a known team, None if the name is unknown"""
+        if name in self._ids:
+            return name
+        key = normalize_name(name)
+        if league is not None and (league, key) in self._league_names:
+            return self._league_names[(league, key)]
+        return self._names.get(key)
+
+    def canonical(self, name: str, league: Optional[str] = None) -> str:
+        found = self.find(name, league)
+        return name if found is None else found
+
+    def team_id(
+        self,
+        name: str,
+        league: Optional[str] = None,
+        local: Optional[Dict[str, int]] = None,
+    ) -> int:
+        """id of a team. An unknown name gets a local id (-2, -3, ...) from
+        local, the caller's map of unknown names, or -1 without one"""
+        with self._lock:
+            team = self.canonical(name, league)
+            if team in self._ids:
+                return self._ids[team]
+        if local is None:
+            return -1
+        return local.setdefault(team, -2 - len(local))
+
+    def ids(
+        self,
+        names: Iterable[str],
+        league: Union[str, Iterable[Optional[str]], None] = None,
+        local: Optional[Dict[str, int]] = None,
+    ) -> np.ndarray:
+        """ids of a column of names, each distinct name is resolved once per
+        league. league is one league or the league of each name, unknown names
+        get local ids from local (a new map if not given), missing names -1"""
+        local = {} if local is None else local
+        names = pd.Series(list(names), dtype=object)
+        if league is None or isinstance(league, str):
+            groups = {league: np.arange(len(names))}
+        else:
+            leagues = pd.Series(list(league), dtype=object).fillna("")
+            groups = leagues.groupby(leagues, sort=False).indices
+
+        ids = np.full(len(names), -1, dtype=np.int32)
+        for group, rows in groups.items():
+            codes, uniques = pd.factorize(names.iloc[rows])
+            lookup = [self.team_id(n, group or None, local) for n in uniques]
+            ids[rows] = np.array(lookup + [-1], dtype=np.int32)[codes]
+        return ids
+
+    def names(
+        self, ids: np.ndarray, local: Optional[Dict[str, int]] = None
+    ) -> np.ndarray:
+        """canonical names of team ids, NaN for -1 and unknown names from the
+        local map their ids came from"""
+        # local ids are negative, so they index the unknown names from the end
+        local = local or {}
+        lookup = self.teams + sorted(local, key=local.get) + [np.nan]
+        return np.asarray(lookup, dtype=object)[ids]
+
+
+@lru_cache(maxsize=1)
+def team_registry() -> TeamRegistry:
+    """registry of config/teams.yaml, shared by the whole process"""
+    return TeamRegistry.from_yaml()
@@ -0,0 +1,20 @@
+from pathlib import Path
+
+import pytest
+import yaml
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "pitchProphet/config/config.yaml"
+
+
+@pytest.fixture
+def mock_config(tmp_path):
+    """fixture to provide a config file whose root_dir points to a temp dir"""
+    with open(CONFIG_PATH, "r") as f:
+        config = yaml.safe_load(f)
+    config["global"]["paths"]["root_dir"] = str(tmp_path)
+    config["scraper"]["rate_limit"]["requests_per_minute"] = 60000
+
+    config_path = tmp_path / "config.yaml"
+    with open(config_path, "w") as f:
+        yaml.safe_dump(config, f)
+    return config_path
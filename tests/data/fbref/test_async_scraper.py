@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from pitchProphet.data.fbref.async_scraper import AsyncFBRefScraper
+from pitchProphet.data.fbref.raw_io import read_raw_matches
+from pitchProphet.data.fbref.replay.synthetic_pages import match_page
+
+
+@pytest.fixture
+def scraper(mock_config, monkeypatch):
+    """fixture to provide an async scraper with faked network calls"""
+    scraper = AsyncFBRefScraper(mock_config)
+    scraper.parse_workers = 0
+    scraper.max_in_flight = 3
+    scraper.state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def get_match_links(url, league):
+        return [f"https://fbref.com/en/matches/{i:08x}/{league}" for i in range(6)]
+
+    def fetch(url):
+        with lock:
+            scraper.state["active"] += 1
+            scraper.state["peak"] = max(scraper.state["peak"], scraper.state["active"])
+        # later links finish first, output must still keep schedule order
+        time.sleep(0.05 - int(url.split("/")[-2], 16) * 0.005)
+        with lock:
+            scraper.state["active"] -= 1
+        return match_page(match_week=int(url.split("/")[-2], 16) + 1)
+
+    monkeypatch.setattr(scraper, "get_match_links", get_match_links)
+    monkeypatch.setattr(scraper, "_fetch", fetch)
+    return scraper
+
+
+def saved_weeks(scraper, league):
+    weeks = []
+    for path in sorted(scraper._output_path().glob(f"{league}-*.jsonl.gz")):
+        weeks.extend(m["MatchInfo"][0]["Matchweek"] for m in read_raw_matches(path))
+    return weeks
+
+
+def test_scrape_leagues(scraper):
+    """test several leagues scrape concurrently and keep schedule order"""
+    scraper.config["checkpoint_every"] = 6
+    asyncio.run(scraper.scrape_leagues("2017-2018", ["Premier-League", "Serie-A"]))
+
+    assert saved_weeks(scraper, "Premier-League") == [1, 2, 3, 4, 5, 6]
+    assert saved_weeks(scraper, "Serie-A") == [1, 2, 3, 4, 5, 6]
+    assert 1 < scraper.state["peak"] <= 3
+
+
+def test_failures_stay_isolated(scraper, monkeypatch):
+    """test a failing league does not stop the others"""
+    get_links = scraper.get_match_links
+
+    def get_match_links(url, league):
+        if league == "Serie-A":
+            raise RuntimeError("schedule unavailable")
+        return get_links(url, league)
+
+    monkeypatch.setattr(scraper, "get_match_links", get_match_links)
+    asyncio.run(scraper.scrape_leagues("2017-2018", ["Premier-League", "Serie-A"]))
+
+    assert len(saved_weeks(scraper, "Premier-League")) == 6
+    assert saved_weeks(scraper, "Serie-A") == []
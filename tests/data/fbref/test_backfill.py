@@ -0,0 +1,82 @@
+import json
+import threading
+from datetime import date
+
+import pytest
+
+from pitchProphet.data.fbref.backfill import BackfillState, backfill, season_over
+from pitchProphet.data.fbref.fbref_scrapper import FBRefScraper
+
+
+@pytest.fixture
+def scraped(monkeypatch):
+    """fixture recording the shards scraped, Serie-A 2018-2019 always fails"""
+    shards = []
+    lock = threading.Lock()
+
+    def scrape_season(self, season=None, league=None, resume=None):
+        with lock:
+            shards.append((league, season))
+        if (league, season) == ("Serie-A", "2018-2019"):
+            raise RuntimeError("schedule unavailable")
+        return {"scraped": 380, "failed": 0}
+
+    monkeypatch.setattr(FBRefScraper, "scrape_season", scrape_season)
+    return shards
+
+
+def test_grid_and_state(mock_config, scraped):
+    """test every shard of the grid is scraped and tracked"""
+    state = backfill(
+        mock_config,
+        ["Premier-League", "Serie-A"],
+        ["2017-2018", "2018-2019"],
+        workers=2,
+    )
+
+    assert len(scraped) == 4
+    assert state.shards["Serie-A/2018-2019"]["status"] == "failed"
+    assert state.shards["Premier-League/2017-2018"] == {
+        "status": "done",
+        "scraped": 380,
+        "failed": 0,
+    }
+    assert json.loads(state.path.read_text()) == state.shards
+
+
+def test_restart_skips_done_shards(mock_config, scraped):
+    """test a restarted job only runs shards that are not done"""
+    grid = (["Premier-League", "Serie-A"], ["2017-2018", "2018-2019"])
+    backfill(mock_config, *grid)
+    scraped.clear()
+
+    backfill(mock_config, *grid)
+    assert scraped == [("Serie-A", "2018-2019")]
+
+
+def test_state_reload(tmp_path):
+    """test shard progress survives a reload"""
+    state = BackfillState(tmp_path / "backfill.json")
+    state.update("La-Liga", "2019-2020", status="done", scraped=380, failed=0)
+    assert BackfillState(tmp_path / "backfill.json").is_done("La-Liga", "2019-2020")
+
+
+def test_current_season_stays_pending(mock_config, scraped):
+    """test a done shard of a season not over yet is scraped again"""
+    current = f"{date.today().year}-{date.today().year + 1}"
+    grid = (["Premier-League"], ["2017-2018", current])
+    backfill(mock_config, *grid)
+    scraped.clear()
+
+    state = backfill(mock_config, *grid)
+    assert scraped == [("Premier-League", current)]
+    assert state.shards[f"Premier-League/{current}"]["status"] == "done"
+    assert not state.is_done("Premier-League", current)
+
+
+def test_season_over():
+    """test seasons end by july of their last year"""
+    assert not season_over("2024-2025", date(2025, 5, 25))
+    assert season_over("2024-2025", date(2025, 7, 1))
+    assert not season_over("2025", date(2025, 11, 9))
+    assert season_over("2025", date(2026, 1, 1))
@@ -0,0 +1,108 @@
+import pytest
+import requests
+
+from pitchProphet.data.fbref.http_client import HttpClient
+from pitchProphet.data.fbref.page_cache import PageCache
+
+MATCH_URL = "https://fbref.com/en/matches/abc123/Arsenal-Chelsea"
+SQUAD_URL = "https://fbref.com/en/squads/x"
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(self.status_code)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """fixture to provide a client with a scripted session and no real waiting"""
+    rules = [{"pattern": "/en/matches/", "seconds": None}]
+    cache = PageCache(tmp_path, ttl_rules=rules, default_ttl=0)
+    rate_limit = {"requests_per_minute": 60, "max_retries": 2, "backoff_base": 1}
+    client = HttpClient(rate_limit, cache)
+    client.calls, client.responses, client.waits = [], [], []
+
+    def get(url, headers=None, timeout=None):
+        client.calls.append((url, headers))
+        response = client.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(client.session, "get", get)
+    monkeypatch.setattr(client.bucket, "acquire", lambda: None)
+    monkeypatch.setattr(client.bucket, "pause", client.waits.append)
+    monkeypatch.setattr("time.sleep", client.waits.append)
+    return client
+
+
+def test_pooled_session():
+    """test one keep-alive session with a sized connection pool is reused"""
+    client = HttpClient({"pool_size": 4})
+    adapter = client.session.get_adapter("https://fbref.com")
+    assert adapter._pool_maxsize == 4
+
+
+def test_legacy_sleep_range_config():
+    """test a config that still sets sleep_range keeps an equivalent rate"""
+    config = {"scraper": {"rate_limit": {"sleep_range": [10, 15], "max_retries": 3}}}
+    with pytest.warns(FutureWarning, match="sleep_range is deprecated"):
+        client = HttpClient.from_config(config)
+    assert client.max_rate == pytest.approx(1 / 12.5)
+    assert client.max_retries == 3
+
+
+def test_cache_hit_skips_network(client):
+    """test fresh pages are served from disk"""
+    client.responses.append(FakeResponse(content=b"match"))
+
+    assert client.get(MATCH_URL) == {"content": b"match", "from_network": True}
+    assert client.get(MATCH_URL) == {"content": b"match", "from_network": False}
+    assert client.network_requests == 1
+
+
+def test_conditional_revalidation(client):
+    """test expired pages are revalidated with their validators"""
+    headers = {"ETag": '"v1"', "Last-Modified": "Sat, 01 Feb 2025 10:00:00 GMT"}
+    client.responses += [FakeResponse(content=b"squad", headers=headers)]
+    client.responses += [FakeResponse(status_code=304)]
+
+    client.get(SQUAD_URL)
+    assert client.get_content(SQUAD_URL) == b"squad"
+    assert client.calls[1][1] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Sat, 01 Feb 2025 10:00:00 GMT",
+    }
+
+
+def test_retry_after(client):
+    """test 429s honor Retry-After and lower the request rate"""
+    client.responses += [FakeResponse(429, headers={"Retry-After": "42"})]
+    client.responses += [FakeResponse(content=b"match")]
+
+    assert client.get_content(MATCH_URL) == b"match"
+    assert client.waits == [42.0]
+    assert client.bucket.rate < client.max_rate
+
+
+def test_backoff_on_errors(client):
+    """test server errors and dropped connections back off exponentially"""
+    client.responses += [FakeResponse(500), requests.ConnectionError("reset")]
+    client.responses += [FakeResponse(content=b"match")]
+
+    assert client.get_content(MATCH_URL) == b"match"
+    assert 0.5 <= client.waits[0] <= 1 and 1 <= client.waits[1] <= 2
+
+
+def test_gives_up_after_max_retries(client):
+    """test persistent throttling raises after max_retries"""
+    client.responses += [FakeResponse(429) for _ in range(3)]
+    with pytest.raises(requests.HTTPError):
+        client.get(MATCH_URL)
+    assert client.bucket.rate == client.max_rate / 8
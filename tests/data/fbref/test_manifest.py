@@ -0,0 +1,69 @@
+import pytest
+
+from pitchProphet.data.fbref.fbref_scrapper import FBRefScraper
+from pitchProphet.data.fbref.manifest import ScrapeManifest
+from pitchProphet.data.fbref.raw_io import find_raw_files, read_raw_matches
+
+LINKS = [f"https://fbref.com/en/matches/{i:08x}/Premier-League" for i in range(5)]
+
+
+def fake_match(match_week):
+    return {
+        "MatchInfo": [{"Matchweek": match_week, "HomeTeam": "A", "AwayTeam": "B"}],
+        "HomeStat": [{"Gls": 1}],
+        "AwayStat": [{"Gls": 0}],
+    }
+
+
+@pytest.fixture
+def scraper(mock_config, monkeypatch):
+    """fixture to provide a scraper whose network calls are faked"""
+    scraper = FBRefScraper(mock_config)
+    scraper.config["checkpoint_every"] = 2
+    monkeypatch.setattr(scraper, "get_match_links", lambda url, league: LINKS)
+    return scraper
+
+
+def test_record_and_reload(tmp_path):
+    """test recorded links survive a reload of the manifest"""
+    manifest = ScrapeManifest(tmp_path, "Premier-League", "2017-2018")
+    manifest.record(LINKS[:2], "file.json")
+
+    reloaded = ScrapeManifest(tmp_path, "Premier-League", "2017-2018")
+    assert reloaded.pending(LINKS) == LINKS[2:]
+    assert reloaded.is_scraped(LINKS[0])
+
+
+def test_checkpointed_writes(scraper, monkeypatch):
+    """test every checkpoint is saved and recorded in the manifest"""
+    monkeypatch.setattr(scraper, "scrape_match", lambda link: fake_match(1))
+    scraper.scrape_season()
+
+    raw_files = find_raw_files(scraper._output_path())
+    assert sorted(len(list(read_raw_matches(f))) for f in raw_files) == [1, 2, 2]
+    manifest = ScrapeManifest(scraper._output_path(), "Premier-League", "2017-2018")
+    assert manifest.pending(LINKS) == []
+
+
+def test_resume_after_crash(scraper, monkeypatch):
+    """test a re-run only scrapes matches that were not saved before the crash"""
+
+    def crash_on_fourth(link):
+        if link == LINKS[3]:
+            raise KeyboardInterrupt
+        return fake_match(1)
+
+    monkeypatch.setattr(scraper, "scrape_match", crash_on_fourth)
+    with pytest.raises(KeyboardInterrupt):
+        scraper.scrape_season()
+
+    scraped = []
+    monkeypatch.setattr(
+        scraper, "scrape_match", lambda link: scraped.append(link) or fake_match(2)
+    )
+    scraper.scrape_season()
+
+    # the third match was streamed to disk before the crash and is recovered
+    assert scraped == LINKS[3:]
+    raw_files = find_raw_files(scraper._output_path())
+    assert sum(len(list(read_raw_matches(f))) for f in raw_files) == 5
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from pitchProphet.data.fbref.match_parser import parse_match_page
+from pitchProphet.data.fbref.replay.synthetic_pages import match_page
+from pitchProphet.scripts.bench_match_parser import legacy_parse_match_page
+
+
+def test_matches_legacy_parse():
+    """targeted parser returns the same record as the positional read_html parse"""
+    content = match_page(seed=7)
+    assert parse_match_page(content) == legacy_parse_match_page(content)
+
+
+def test_match_info():
+    """test scorebox extraction"""
+    content = match_page("Brentford", "Fulham", match_week=12, score=(0, 3))
+    info = parse_match_page(content)["MatchInfo"][0]
+    assert info == {
+        "Matchweek": 12,
+        "HomeTeam": "Brentford",
+        "AwayTeam": "Fulham",
+        "HomeGoal": 0,
+        "AwayGoal": 3,
+        "HomeXG": 1.7,
+        "AwayXG": 0.9,
+    }
+
+
+def test_team_stat_types():
+    """team totals keep read_html's numeric types and drop duplicate columns"""
+    stats = pd.DataFrame(parse_match_page(match_page())["HomeStat"])
+    assert list(stats.columns).count("Att") == 1
+    assert stats["Gls"].dtype == "int64"
+    assert stats["Cmp%"].iloc[0] == 81.5
+
+
+def test_player_data():
+    """test player and goalkeeper tables are included when requested"""
+    data = parse_match_page(match_page(), player_data=True)
+    assert len(data["HomePlayersStat"][0]) == 3
+    assert data["AwayGKStat"][0][0]["Player"] == "Keeper cff3d9bb"
+
+
+def test_missing_tables():
+    """test pages without the stats tables are rejected"""
+    with pytest.raises(ValueError):
+        parse_match_page(b"<html><body><table id='x'></table></body></html>")
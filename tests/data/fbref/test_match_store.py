@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+import tables
+
+from pitchProphet.data.fbref.match_parser import parse_match_page
+from pitchProphet.data.fbref.match_store import MatchStore
+from pitchProphet.data.fbref.raw_io import RawMatchWriter
+from pitchProphet.data.fbref.replay.synthetic_pages import match_page
+
+
+def write_raw(raw_dir, league, season, weeks):
+    """write one raw file holding a match for each week"""
+    writer = RawMatchWriter(raw_dir, league, season, "gzip")
+    for week in weeks:
+        writer.write(parse_match_page(match_page(match_week=week, seed=week)))
+    return writer.close_part()
+
+
+@pytest.fixture
+def store(tmp_path):
+    """fixture to provide a store synced from two leagues of raw files"""
+    write_raw(tmp_path, "Premier-League", "2017-2018", [1, 2])
+    write_raw(tmp_path, "Premier-League", "2017-2018", [3, 4])
+    write_raw(tmp_path, "Serie-A", "2017-2018", [1])
+    store = MatchStore(tmp_path / "store")
+    store.sync(tmp_path)
+    return store
+
+
+def test_partition_pruning(store):
+    """test leagues and seasons select whole partitions"""
+    assert store.partitions() == [
+        ("Premier-League", "2017-2018"),
+        ("Serie-A", "2017-2018"),
+    ]
+    frames = store.read(leagues=["Serie-A"])
+    assert frames["MatchInfo"]["Matchweek"].tolist() == [1]
+    assert len(frames["HomeStat"]) == len(frames["AwayStat"]) == 1
+
+    frames = store.read(where="match_week == 1")
+    assert frames["League"].tolist() == ["Premier-League", "Serie-A"]
+
+
+def test_predicate_pushdown(store):
+    """test matchweek conditions and column selections are applied on read"""
+    frames = store.read(where="file_week == 4", columns=["xG", "Gls"])
+    assert frames["MatchInfo"]["Matchweek"].tolist() == [3, 4]
+    assert list(frames["HomeStat"].columns) == ["xG", "Gls"]
+
+    frames = store.read(where="match_week >= 2 & match_week <= 3")
+    assert frames["MatchInfo"]["Matchweek"].tolist() == [2, 3]
+    assert frames["HomeStat"]["Gls"].dtype.kind in "if"
+
+
+def test_column_pushdown(store):
+    """test a subset of the stat columns is read without the other columns"""
+    path = store.store_dir / "Premier-League" / "2017-2018.h5"
+    with tables.open_file(path, mode="a") as h5:
+        for table in ("HomeStat", "AwayStat"):
+            group = h5.get_node("/", table)
+            for i, column in enumerate(group._v_attrs.columns):
+                if column not in ("xG", "Gls"):
+                    h5.remove_node(group, f"c{i}")
+
+    frames = store.read(
+        leagues=["Premier-League"], where="file_week == 4", columns=["xG", "Gls"]
+    )
+    assert list(frames["HomeStat"].columns) == ["xG", "Gls"]
+    assert len(frames["AwayStat"]) == 2
+    with pytest.raises(tables.NoSuchNodeError):
+        store.read(leagues=["Premier-League"], columns=["xG", "Sh"])
+
+
+def test_sync_rebuilds_changed_partitions(store, tmp_path):
+    """test only partitions with new raw files are rebuilt"""
+    assert store.sync(tmp_path) == []
+    write_raw(tmp_path, "Serie-A", "2017-2018", [2])
+    assert store.sync(tmp_path) == [("Serie-A", "2017-2018")]
+    assert len(store.read(leagues=["Serie-A"])["MatchInfo"]) == 2
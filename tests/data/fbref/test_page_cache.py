@@ -0,0 +1,58 @@
+import pytest
+
+from pitchProphet.data.fbref.page_cache import PageCache
+
+MATCH_URL = "https://fbref.com/en/matches/abc123/Arsenal-Chelsea"
+SCHEDULE_URL = "https://fbref.com/en/comps/9/schedule/Scores-and-Fixtures"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """fixture to provide a page cache with match pages that never expire"""
+    rules = [
+        {"pattern": "/en/matches/", "seconds": None},
+        {"pattern": "/schedule/", "seconds": 60},
+    ]
+    return PageCache(tmp_path / "cache", ttl_rules=rules, default_ttl=0)
+
+
+def test_ttl_rules(cache):
+    """test first matching rule decides the ttl"""
+    assert cache.ttl_for(MATCH_URL) is None
+    assert cache.ttl_for(SCHEDULE_URL) == 60
+    assert cache.ttl_for("https://fbref.com/en/squads/") == 0
+
+
+def test_lookup(cache):
+    """test stored pages come back with their validators and freshness"""
+    cache.store(MATCH_URL, b"<html>match</html>", {"ETag": '"v1"'})
+    cache.store("https://fbref.com/en/squads/x", b"squad")
+
+    entry = cache.lookup(MATCH_URL)
+    assert entry["content"] == b"<html>match</html>"
+    assert entry["fresh"] and entry["etag"] == '"v1"'
+    assert not cache.lookup("https://fbref.com/en/squads/x")["fresh"]
+    assert cache.lookup(SCHEDULE_URL) is None
+
+
+def test_content_addressed_storage(cache):
+    """test identical bodies share a single compressed blob"""
+    cache.store(MATCH_URL, b"same body" * 100)
+    cache.store(MATCH_URL + "-copy", b"same body" * 100)
+
+    blobs = list((cache.cache_dir / "blobs").rglob("*.gz"))
+    assert len(blobs) == 1
+    assert blobs[0].stat().st_size < len(b"same body" * 100)
+
+
+def test_lru_eviction(tmp_path):
+    """test least recently used pages are evicted past the size limit"""
+    cache = PageCache(tmp_path, max_size_mb=0.001, compress=False, default_ttl=None)
+    cache.store("a", b"a" * 400)
+    cache.store("b", b"b" * 400)
+    cache.lookup("a")
+    cache.store("c", b"c" * 400)
+
+    assert cache.lookup("b") is None
+    assert cache.lookup("a")["content"] == b"a" * 400
+    assert cache.size() <= cache.max_size
@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+import pytest
+
+from pitchProphet.data.fbref.rate_limit import TokenBucket
+
+
+def test_from_config():
+    """test budget comes from requests_per_minute and burst"""
+    bucket = TokenBucket.from_config({"requests_per_minute": 6, "burst": 2})
+    assert bucket.rate == 0.1 and bucket.capacity == 2
+
+
+def test_legacy_sleep_range():
+    """test the deprecated sleep_range maps to its mean rate with a warning,
+    and is ignored next to requests_per_minute"""
+    with pytest.warns(FutureWarning, match="requests_per_minute: 4.8"):
+        bucket = TokenBucket.from_config({"sleep_range": [10, 15]})
+    assert bucket.rate == pytest.approx(1 / 12.5)
+
+    with pytest.warns(FutureWarning, match="ignored"):
+        config = {"sleep_range": [10, 15], "requests_per_minute": 6}
+        assert TokenBucket.from_config(config).rate == 0.1
+
+
+def test_pause():
+    """test a pause delays the next reservation by at least its length"""
+    bucket = TokenBucket(rate=10, capacity=1)
+    bucket.pause(2)
+    assert bucket.reserve() >= 2
+
+
+def test_reservations_queue_up():
+    """test each reservation waits one token interval longer than the last"""
+    bucket = TokenBucket(rate=10, capacity=1)
+    waits = [bucket.reserve() for _ in range(4)]
+    assert waits[0] == 0
+    for expected, wait in zip([0.1, 0.2, 0.3], waits[1:]):
+        assert abs(wait - expected) < 0.01
+
+
+def test_async_rate():
+    """test concurrent acquirers never exceed the budget"""
+    bucket = TokenBucket(rate=50, capacity=1)
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire_async() for _ in range(6)))
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 5 / 50 * 0.95
@@ -0,0 +1,118 @@
+import json
+import os
+
+import pytest
+
+from pitchProphet.data.fbref.raw_catalog import RawCatalog
+from pitchProphet.data.fbref.raw_io import RawMatchWriter
+from tests.data.fbref.test_raw_io import record
+
+
+def write(raw_dir, league, weeks, catalog=None):
+    """write one raw file with a match for each week, ids from the week"""
+    writer = RawMatchWriter(raw_dir, league, "2024-2025", "gzip", catalog)
+    for week in weeks:
+        writer.write(record(week, f"https://fbref.com/en/matches/{week:08x}/x"))
+    return writer.close_part()
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """fixture to provide a catalog updated by the writers"""
+    catalog = RawCatalog(tmp_path)
+    write(tmp_path, "Premier-League", [1], catalog)
+    write(tmp_path, "Premier-League", [9, 10], catalog)
+    write(tmp_path, "Premier-League", [11, 12], catalog)
+    write(tmp_path, "Serie-A", [1], catalog)
+    return catalog
+
+
+def test_entries(catalog):
+    """test files are recorded with their weeks, counts and hashes on write"""
+    entry = catalog.entries()[1]
+    assert entry["name"] == "Premier-League-2024-2025-match_week-10-matches-2.jsonl.gz"
+    assert (entry["league"], entry["season"], entry["file_week"]) == (
+        "Premier-League",
+        "2024-2025",
+        10,
+    )
+    assert (entry["min_week"], entry["max_week"], entry["n_matches"]) == (9, 10, 2)
+    assert len(entry["digest"]) == 64
+
+
+def test_select_exact_match_week(catalog):
+    """test week 1 no longer selects the files of weeks 10-19"""
+    files = catalog.select(league="Premier-League", match_week=1)
+    assert [os.path.basename(f) for f in files] == [
+        "Premier-League-2024-2025-match_week-1-matches-1.jsonl.gz"
+    ]
+    assert len(catalog.select(league="Serie-A")) == 1
+    assert catalog.select(league="Serie", match_week=1) == []
+
+
+def test_select_in_match_order(catalog, tmp_path):
+    """test files are ordered by match week, not by name"""
+    write(tmp_path, "Premier-League", [2], catalog)
+    files = catalog.select(league="Premier-League")
+    assert [os.path.basename(f).split("-matches")[0] for f in files] == [
+        "Premier-League-2024-2025-match_week-1",
+        "Premier-League-2024-2025-match_week-2",
+        "Premier-League-2024-2025-match_week-10",
+        "Premier-League-2024-2025-match_week-12",
+    ]
+    assert [e["name"] for e in catalog.entries()][:4] == [
+        os.path.basename(f) for f in files
+    ]
+
+
+def test_skip_duplicate_only_files(catalog, tmp_path):
+    """test a re-scrape holding only known matches is skipped"""
+    write(tmp_path, "Premier-League", [9, 10], catalog)
+    assert len(catalog.select(league="Premier-League")) == 3
+    assert len(catalog.select(league="Premier-League", skip_duplicates=False)) == 4
+
+
+def test_refresh_picks_up_manual_changes(catalog, tmp_path):
+    """test files copied in or deleted by hand are noticed"""
+    legacy = tmp_path / "La-Liga-2024-2025-match_week-3-matches-1.json"
+    legacy.write_text(json.dumps([record(3)]))
+    os.remove(catalog.select(league="Serie-A")[0])
+
+    assert catalog.select(league="La-Liga") == [str(legacy)]
+    assert catalog.select(league="Serie-A") == []
+
+
+def test_refresh_picks_up_rewrites(catalog, tmp_path):
+    """test a file rewritten in place, which leaves the directory's mtime
+    unchanged, is catalogued again"""
+    path = catalog.select(league="Serie-A")[0]
+    catalog.refresh()
+    dir_mtime = os.stat(tmp_path).st_mtime_ns
+
+    rewrite = write(tmp_path / "other", "Serie-A", [4])
+    with open(path, "wb") as f:
+        f.write(rewrite.read_bytes())
+    os.utime(tmp_path, ns=(dir_mtime, dir_mtime))
+
+    # the file is checked when a lookup returns it
+    assert catalog.select(league="Serie-A") == [path]
+    assert catalog.match_files(["00000004"]) == {"00000004": path}
+    assert catalog.entries()[-1]["min_week"] == 4
+
+
+def test_lookup_checks_only_returned_files(catalog, tmp_path, monkeypatch):
+    """test a lookup with the directory unchanged only checks the files it
+    returns"""
+    catalog.refresh()
+    checked = []
+    check = RawCatalog._check
+
+    def record_check(self, names):
+        names = list(names)
+        checked.extend(names)
+        return check(self, names)
+
+    monkeypatch.setattr(RawCatalog, "_check", record_check)
+    serie_a = catalog.select(league="Serie-A")
+    week_12 = catalog.match_files(["0000000c"])["0000000c"]
+    assert checked == [os.path.basename(serie_a[0]), os.path.basename(week_12)]
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from pitchProphet.data.fbref.raw_io import (
+    RawMatchWriter,
+    find_raw_files,
+    parse_raw_name,
+    read_raw_matches,
+)
+
+
+def record(match_week, link="https://fbref.com/en/matches/0/x"):
+    return {
+        "MatchInfo": [{"Matchweek": match_week, "HomeTeam": "A", "AwayTeam": "B"}],
+        "HomeStat": [{"Gls": 1, "xG": 1.2}],
+        "AwayStat": [{"Gls": 0, "xG": 0.4}],
+        "MatchLink": link,
+    }
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_write_and_read(tmp_path, compression):
+    """test records stream to a part file and are renamed on close"""
+    writer = RawMatchWriter(tmp_path, "Premier-League", "2017-2018", compression)
+    for week in (1, 1, 2):
+        writer.write(record(week))
+    assert list(tmp_path.glob("*.part"))
+
+    output_file = writer.close_part()
+    suffix = ".jsonl.gz" if compression else ".jsonl"
+    assert (
+        output_file.name == f"Premier-League-2017-2018-match_week-2-matches-3{suffix}"
+    )
+    assert [r["MatchInfo"][0]["Matchweek"] for r in read_raw_matches(output_file)] == [
+        1,
+        1,
+        2,
+    ]
+    assert find_raw_files(tmp_path) == [str(output_file)]
+
+
+def test_reads_legacy_json(tmp_path):
+    """test old single-array json files are still readable"""
+    path = tmp_path / "Premier-League-2017-2018-match_week-1-matches-2.json"
+    path.write_text(json.dumps([record(1), record(1)], indent=4))
+    assert len(list(read_raw_matches(path))) == 2
+
+
+def test_recover_after_crash(tmp_path):
+    """test a part file with a truncated last record is recovered"""
+    writer = RawMatchWriter(tmp_path, "La-Liga", "2019-2020", "gzip")
+    writer.write(record(3, "link-a"))
+    writer.write(record(4, "link-b"))
+    # simulate the process dying: no close, half a record at the end
+    writer._file.write(b'{"MatchInfo": [{"Match')
+    writer._file.flush()
+
+    recovered = RawMatchWriter.recover(tmp_path, "La-Liga", "2019-2020")
+
+    assert not list(tmp_path.glob("*.part"))
+    ((output_file, links),) = recovered
+    assert links == ["link-a", "link-b"]
+    assert output_file.name == "La-Liga-2019-2020-match_week-4-matches-2.jsonl.gz"
+    assert len(list(read_raw_matches(output_file))) == 2
+
+
+def test_compact_records(tmp_path):
+    """test one compact line per match"""
+    writer = RawMatchWriter(tmp_path, "Serie-A", "2020-2021")
+    writer.write(record(1))
+    output_file = writer.close_part()
+    (line,) = output_file.read_text().splitlines()
+    assert ": " not in line and ", " not in line
+
+
+def test_parse_raw_name():
+    """test league, season and match week come from the raw file name"""
+    name = "raw/Serie-A-2017-2018-match_week-12-matches-20.jsonl.gz"
+    assert parse_raw_name(name) == ("Serie-A", "2017-2018", 12)
+    assert parse_raw_name("raw/notes.json") is None
@@ -0,0 +1,73 @@
+import requests
+import yaml
+
+from pitchProphet.data.fbref.fbref_scrapper import FBRefScraper
+from pitchProphet.data.fbref.http_client import HttpClient
+from pitchProphet.data.fbref.raw_io import find_raw_files, read_raw_matches
+from pitchProphet.data.fbref.replay.server import ReplayServer, load_pages, record_pages
+from pitchProphet.data.fbref.replay.synthetic_pages import synthetic_season
+from pitchProphet.scripts.bench_scraper import run_benchmark
+
+PAGES = synthetic_season("Premier-League", 9, "2017-2018", 6)
+
+
+def replay_config(config_path, server):
+    """point the scraper at the replay server, without a page cache"""
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f)
+    config["scraper"]["base_url"] = f"{server.url}/en/comps"
+    config["scraper"]["cache"]["enabled"] = False
+    config["scraper"]["rate_limit"]["backoff_base"] = 0.01
+    with open(config_path, "w") as f:
+        yaml.safe_dump(config, f)
+    return config
+
+
+def test_serves_pages():
+    """test pages, 404s and conditional requests"""
+    with ReplayServer(PAGES) as server:
+        path = next(iter(PAGES))
+        response = requests.get(server.url + path)
+        assert response.content == PAGES[path]
+
+        etag = response.headers["ETag"]
+        response = requests.get(server.url + path, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert requests.get(server.url + "/missing").status_code == 404
+        assert server.stats["not_found"] == 1
+
+
+def test_scrape_with_throttling(mock_config):
+    """test the scraper finishes a season through injected 429s"""
+    with ReplayServer(PAGES, throttle_rate=0.3, retry_after=0) as server:
+        replay_config(mock_config, server)
+        scraper = FBRefScraper(mock_config)
+        result = scraper.scrape_season("2017-2018", "Premier-League")
+
+        assert result == {"scraped": 6, "failed": 0}
+        assert server.stats["throttled"] > 0
+        assert scraper.client.network_requests == 7 + server.stats["throttled"]
+
+    files = find_raw_files(scraper._output_path())
+    teams = [m["MatchInfo"][0]["HomeTeam"] for f in files for m in read_raw_matches(f)]
+    assert teams == ["Arsenal", "Chelsea", "Everton", "Fulham", "Burnley", "Brighton"]
+
+
+def test_record_and_replay(mock_config, tmp_path):
+    """test recorded pages are served back unchanged"""
+    with ReplayServer(PAGES) as server:
+        config = replay_config(mock_config, server)
+        urls = [server.url + path for path in PAGES]
+        record_pages(urls, tmp_path / "pages", HttpClient.from_config(config))
+
+    assert load_pages(tmp_path / "pages") == PAGES
+
+
+def test_benchmark():
+    """test the benchmark reports throughput of a full season"""
+    result = run_benchmark(
+        PAGES, "Premier-League", "2017-2018", requests_per_minute=60000, latency=0.01
+    )
+    assert result["matches"] == 6
+    assert result["bytes_fetched"] == sum(len(c) for c in PAGES.values())
+    assert result["matches_per_minute"] > 0 and result["parse_cpu_ms_per_match"] > 0
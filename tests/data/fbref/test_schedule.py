@@ -0,0 +1,104 @@
+import pandas as pd
+import pytest
+
+from pitchProphet.data.fbref.fbref_scrapper import FBRefScraper
+from pitchProphet.data.fbref.schedule import parse_schedule, week_fixtures
+
+HEADER = ["Wk", "Day", "Date", "Time", "Home", "xG", "Score", "xG", "Away"]
+HEADER += ["Attendance", "Venue", "Referee", "Match Report", "Notes"]
+
+
+def fbref_row(week, date, home, away, match_id=None):
+    """schedule row as on fbref, played matches link their report from the
+    score and the match report cells, every row links its date"""
+    if match_id is not None:
+        href = f"/en/matches/{match_id}/{home}-{away}"
+        score = f'<a href="{href}">2–1</a>'
+        report = f'<a href="{href}">Match Report</a>'
+    else:
+        score = ""
+        report = f'<a href="/en/stathead/matchup/{home}">Head-to-Head</a>'
+    # fbref links the date to the page of all matches that day
+    date = f'<a href="/en/matches/{date}">{date}</a>'
+    cells = [date, "20:00", home, "1.2", score, "0.8", away, "", "", "", report, ""]
+    return (
+        f'<tr><th data-stat="gameweek">{week}</th><td>Fri</td>'
+        + "".join(f"<td>{c}</td>" for c in cells)
+        + "</tr>"
+    )
+
+
+def fbref_page():
+    rows = [
+        fbref_row(1, "2024-08-16", "Manchester Utd", "Fulham", "aa01"),
+        fbref_row(1, "2024-08-17", "Ipswich Town", "Liverpool", "aa02"),
+        '<tr class="spacer"><td colspan="14"></td></tr>',
+        '<tr class="thead">' + "".join(f"<th>{h}</th>" for h in HEADER) + "</tr>",
+        fbref_row(2, "2024-08-24", "Fulham", "Ipswich Town"),
+        fbref_row(2, "2024-08-24", "Liverpool", "Manchester Utd"),
+    ]
+    head = "".join(f"<th>{h}</th>" for h in HEADER)
+    return (
+        '<html><body><table id="sched_2024-2025_9_1">'
+        f"<thead><tr>{head}</tr></thead><tbody>{''.join(rows)}</tbody>"
+        "</table></body></html>"
+    ).encode()
+
+
+def test_parse_fbref_schedule():
+    """test week, date, teams, score and link of played and upcoming rows"""
+    schedule = parse_schedule(fbref_page(), "https://fbref.com")
+
+    assert list(schedule.columns) == [
+        "Wk",
+        "Date",
+        "Home",
+        "Away",
+        "Score",
+        "MatchLink",
+    ]
+    assert list(schedule["Wk"]) == [1, 1, 2, 2]
+    assert schedule.loc[0, "Date"] == pd.Timestamp("2024-08-16")
+    assert list(schedule["Score"][:2]) == ["2–1", "2–1"]
+    assert schedule["Score"][2:].isna().all()
+    assert schedule.loc[1, "MatchLink"] == (
+        "https://fbref.com/en/matches/aa02/Ipswich Town-Liverpool"
+    )
+    assert schedule["MatchLink"][2:].isna().all()
+
+    fixtures = week_fixtures(schedule, 2)
+    assert fixtures.to_dict("list") == {
+        "Home": ["Fulham", "Liverpool"],
+        "Away": ["Ipswich Town", "Manchester Utd"],
+    }
+
+
+def test_missing_schedule_columns():
+    """test a schedule table without week or team columns is rejected by name"""
+    page = fbref_page().replace(b"<th>Wk</th>", b"<th>Round</th>", 1)
+    page = page.replace(b"<th>Away</th>", b"<th>Visitor</th>", 1)
+
+    with pytest.raises(ValueError, match=r"missing columns \['Wk', 'Away'\]"):
+        parse_schedule(page)
+
+
+def test_match_links_from_schedule(mock_config, monkeypatch):
+    """test each played match is linked once and a parsed schedule is not
+    fetched again"""
+    fetched = []
+
+    def fetch(self, url):
+        fetched.append(url)
+        return fbref_page()
+
+    monkeypatch.setattr(FBRefScraper, "_fetch", fetch)
+    scraper = FBRefScraper(mock_config)
+
+    links = scraper.get_match_links("https://fbref.com/schedule", "Premier-League")
+    assert [link.split("/")[5] for link in links] == ["aa01", "aa02"]
+    assert len(fetched) == 1
+
+    schedule = scraper.get_schedule("https://fbref.com/schedule")
+    fetched.clear()
+    assert scraper.get_match_links("", "Premier-League", schedule) == links
+    assert fetched == []
@@ -0,0 +1,151 @@
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from pitchProphet.data.fbref.fbref_scrapper import FBRefScraper
+from pitchProphet.data.fbref.raw_io import find_raw_files, read_raw_matches
+from pitchProphet.data.fbref.replay.synthetic_pages import (
+    schedule_page,
+    synthetic_season,
+)
+from pitchProphet.data.fbref.schedule import parse_schedule
+from pitchProphet.data.fbref.scrape_plan import plan_team_matches, upcoming_fixtures
+from pitchProphet.data.pre_processing.load_data import LoadData
+from pitchProphet.data.pre_processing.match_frame import MatchFrame
+from pitchProphet.data.pre_processing.rolling_stats import RollingStats
+from pitchProphet.scripts.inference import add_stats
+
+SEASON = "2024-2025"
+
+
+def test_parse_schedule():
+    """test rows, weeks and links of played and upcoming matches"""
+    schedule = parse_schedule(
+        schedule_page("Serie-A", SEASON, 12, n_played=8), "https://fbref.com"
+    )
+
+    assert len(schedule) == 12
+    assert list(schedule["Wk"]) == [1] * 5 + [2] * 5 + [3] * 2
+    assert schedule["MatchLink"].notna().sum() == 8
+    assert schedule.loc[0, "MatchLink"].startswith("https://fbref.com/en/matches/")
+    assert list(upcoming_fixtures(schedule).index) == [5, 6, 7, 8, 9]
+    assert list(upcoming_fixtures(schedule, 3).index) == [10, 11]
+
+
+def test_upcoming_fixtures_skip_postponed():
+    """test a postponed match does not hold the plan in its week"""
+    schedule = parse_schedule(schedule_page("Serie-A", SEASON, 20, 10, [2]))
+
+    assert schedule.loc[2, "MatchLink"] is None
+    assert list(upcoming_fixtures(schedule).index) == [10, 11, 12, 13, 14]
+
+
+def test_plan_team_matches():
+    """test every team gets exactly its last n played matches, once"""
+    schedule = parse_schedule(schedule_page("Serie-A", SEASON, 40, n_played=30))
+    fixtures = upcoming_fixtures(schedule)
+    teams = pd.concat([fixtures["Home"], fixtures["Away"]]).unique()
+
+    links = plan_team_matches(schedule, teams, 3, "Serie-A")
+    planned = schedule[schedule["MatchLink"].isin(links)]
+    assert len(links) == len(set(links)) == len(planned)
+    assert list(planned["MatchLink"]) == links
+
+    played = schedule[schedule["MatchLink"].notna()]
+    for team in teams:
+        team_rows = played[(played["Home"] == team) | (played["Away"] == team)]
+        expected = set(team_rows.index[-3:])
+        team_planned = planned[(planned["Home"] == team) | (planned["Away"] == team)]
+        assert expected <= set(team_planned.index)
+    assert len(links) < len(played)
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    """serve synthetic pages to the scraper, recording the fetched paths"""
+    paths, pages = [], {}
+
+    def fetch(self, url):
+        path = urlsplit(url).path
+        paths.append(path)
+        return pages[path]
+
+    monkeypatch.setattr(FBRefScraper, "_fetch", fetch)
+    return paths, pages
+
+
+def planned_paths(pages, fixtures):
+    """url paths of the matches planned for the fixtures' teams"""
+    schedule_path = next(p for p in pages if "/schedule/" in p)
+    schedule = parse_schedule(pages[schedule_path])
+    teams = pd.concat([fixtures["Home"], fixtures["Away"]]).unique()
+    return set(plan_team_matches(schedule, teams, 5, "Serie-A"))
+
+
+def test_inference_scrape_plan(mock_config, fetched):
+    """test only planned pages not on disk are fetched"""
+    paths, pages = fetched
+    pages.update(synthetic_season("Serie-A", 11, SEASON, 60, n_played=40))
+    scraper = FBRefScraper(mock_config, inference=True)
+    fixtures = pd.DataFrame({"Home": ["Arsenal"], "Away": ["Chelsea"]})
+
+    result = scraper.scrape_season(SEASON, "Serie-A", fixtures=fixtures)
+    first_plan = planned_paths(pages, fixtures)
+    match_pages = [p for p in paths if "/en/matches/" in p]
+    assert sorted(match_pages) == sorted(first_plan)
+    assert result == {"scraped": len(first_plan), "failed": 0}
+
+    # a week later only the new matches are fetched, the rest is read from
+    # the earlier file
+    paths.clear()
+    pages.update(synthetic_season("Serie-A", 11, SEASON, 60, n_played=50))
+    result = scraper.scrape_season(SEASON, "Serie-A", fixtures=fixtures)
+    second_plan = planned_paths(pages, fixtures)
+    new_pages = [p for p in paths if "/en/matches/" in p]
+    assert sorted(new_pages) == sorted(second_plan - first_plan)
+    assert 0 < len(new_pages) < len(second_plan)
+    assert result == {"scraped": len(new_pages), "failed": 0}
+
+    latest = max(
+        find_raw_files(scraper._output_path()), key=lambda f: Path(f).stat().st_mtime_ns
+    )
+    assert len(list(read_raw_matches(latest))) == len(new_pages)
+
+    loader = LoadData(mock_config, league="Serie-A", inference=True)
+    loaded = {
+        urlsplit(record["MatchLink"]).path
+        for path in loader._find_relv_files()
+        for record in read_raw_matches(path)
+    }
+    assert second_plan <= loaded
+    assert len(loader._find_relv_files()) == 2
+
+
+def test_postponed_fixture_window(mock_config, fetched):
+    """test a team gets its own last n matches when a postponed fixture makes
+    its opponent's window reach back to an older match between them"""
+    paths, pages = fetched
+    # everton's match 22 is postponed, its last 5 matches then include match
+    # 10 against arsenal, which is older than arsenal's own last 5
+    pages.update(synthetic_season("Serie-A", 11, SEASON, 60, 40, postponed=[22]))
+    scraper = FBRefScraper(mock_config, inference=True)
+    fixtures = pd.DataFrame({"Home": ["Arsenal"], "Away": ["Everton"]})
+    scraper.scrape_season(SEASON, "Serie-A", fixtures=fixtures)
+
+    data = LoadData(mock_config, league="Serie-A", inference=True)
+    frame = MatchFrame.from_frame(data.game_data_process(), np.float64)
+    arsenal = frame.team_id("Arsenal")
+    played = (frame.home_team_ids() == arsenal) | (frame.away_team_ids() == arsenal)
+    assert played.sum() == 6
+
+    config = yaml.safe_load(Path(mock_config).read_text())
+    stats = add_stats(fixtures, frame.to_frame(), config, "Serie-A")
+    last_five = frame.subset(np.flatnonzero(played)[1:])
+    expected = RollingStats(last_five, 5).fixture_features(fixtures)
+    pd.testing.assert_frame_equal(
+        stats["home_data"], expected["home_stats"], rtol=1e-10
+    )
@@ -0,0 +1,36 @@
+import pytest
+
+from pitchProphet.data.fbref.match_parser import parse_match_page
+from pitchProphet.data.fbref.raw_io import RawMatchWriter
+from pitchProphet.data.fbref.replay.synthetic_pages import TEAMS, match_page
+
+
+def round_robin(n_teams, n_rounds, first=0):
+    """(week, home, away) fixtures where every team plays every week"""
+    teams = TEAMS[first : first + n_teams]
+    fixtures = []
+    for week in range(1, n_rounds + 1):
+        order = (
+            teams[:1]
+            + teams[1:][week % (n_teams - 1) :]
+            + teams[1:][: week % (n_teams - 1)]
+        )
+        for i in range(n_teams // 2):
+            fixtures.append((week, order[i], order[n_teams - 1 - i]))
+    return fixtures
+
+
+@pytest.fixture
+def season_config(mock_config, tmp_path):
+    """fixture to provide a config whose team_data holds two synthetic seasons"""
+    raw_dir = tmp_path / "pitchProphet/data/fbref/raw/team_data"
+    for offset, league in enumerate(["Premier-League", "Serie-A"]):
+        writer = RawMatchWriter(raw_dir, league, "2017-2018", "gzip")
+        for i, (week, home, away) in enumerate(round_robin(6, 8)):
+            score, xg = (i % 3, i % 2), (round(0.5 + i / 10 + offset, 1), 0.9)
+            page = match_page(home, away, week, score, xg, seed=i * 3 + offset * 500)
+            writer.write(parse_match_page(page))
+            if i % 9 == 8:
+                writer.close_part()
+        writer.close_part()
+    return mock_config
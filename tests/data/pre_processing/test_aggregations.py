@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pitchProphet.data.pre_processing.aggregations import aggregate, get_aggregation
+
+
+@pytest.fixture
+def window():
+    """fixture to provide windows of 3 teams x 5 matches x 4 features"""
+    return np.random.default_rng(0).normal(size=(3, 5, 4))
+
+
+def reference(column: np.ndarray, method: str) -> float:
+    """statistic of one window column with pandas/numpy"""
+    series = pd.Series(column)
+    if method == "trend":
+        return np.polyfit(np.arange(len(column)), column, 1)[0]
+    if method == "ewma":
+        return series.ewm(alpha=0.5).mean().iloc[-1]
+    if method == "q25":
+        return series.quantile(0.25)
+    return getattr(series, method)()
+
+
+@pytest.mark.parametrize(
+    "method", ["mean", "sum", "std", "trend", "ewma", "min", "max", "median", "q25"]
+)
+def test_kernels_match_reference(window, method):
+    """test each kernel equals the per column pandas/numpy statistic"""
+    result = get_aggregation(method)(window)
+
+    assert result.shape == (3, 4)
+    for team in range(3):
+        for feature in range(4):
+            expected = reference(window[team, :, feature], method)
+            assert result[team, feature] == pytest.approx(expected, rel=1e-10)
+
+
+def test_single_match_window(window):
+    """test std and trend of a single match are 0"""
+    stats = aggregate(window[:, :1], ["mean", "std", "trend"])
+
+    np.testing.assert_array_equal(stats["mean"], window[:, 0])
+    np.testing.assert_array_equal(stats["std"], np.zeros((3, 4)))
+    np.testing.assert_array_equal(stats["trend"], np.zeros((3, 4)))
+
+
+def test_unknown_method():
+    """test unknown method names raise"""
+    with pytest.raises(ValueError, match="unknown aggregation method"):
+        get_aggregation("q250")
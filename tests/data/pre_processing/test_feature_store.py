@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pitchProphet.data.fbref.match_parser import parse_match_page
+from pitchProphet.data.fbref.raw_io import RawMatchWriter
+from pitchProphet.data.fbref.replay.synthetic_pages import match_page
+from pitchProphet.data.pre_processing.feature_store import FeatureStore
+from pitchProphet.data.pre_processing.load_data import LoadData
+from pitchProphet.data.pre_processing.rolling_stats import RollingStats, select_features
+from tests.data.pre_processing.conftest import round_robin
+
+
+@pytest.fixture
+def frame(season_config):
+    """fixture to provide loaded matches with a few missing stats"""
+    frame = LoadData(season_config).match_frame(np.float64)
+    frame.home_stats[7, 4] = np.nan
+    frame.away_stats[30, 18] = np.nan
+    return frame
+
+
+def assert_stats_equal(stats, expected):
+    for side in ("home_stats", "away_stats"):
+        pd.testing.assert_frame_equal(stats[side], expected[side], rtol=1e-10)
+
+
+def test_build_matches_rolling_stats(frame, tmp_path):
+    """test a new store gives the statistics of RollingStats"""
+    store = FeatureStore(tmp_path / "training.h5", 3)
+
+    assert_stats_equal(store.update(frame), RollingStats(frame, 3).match_features())
+
+
+def test_incremental_update(frame, tmp_path):
+    """test new matches continue from the stored team state"""
+    FeatureStore(tmp_path / "training.h5", 3).update(frame.subset(slice(0, 5)))
+    store = FeatureStore(tmp_path / "training.h5", 3)
+    stats = store.update(frame)
+
+    # only the matches after the stored ones were computed
+    assert len(store._rolling.frame) == len(frame) - 5
+    assert_stats_equal(stats, RollingStats(frame, 3).match_features())
+
+
+def test_match_features_reads_only_rows(frame, tmp_path, monkeypatch):
+    """test stored statistics of some rows are read without the other rows"""
+    store = FeatureStore(tmp_path / "training.h5", 3)
+    store.update(frame)
+    features = list(frame.features)
+    with pd.HDFStore(store.path, mode="r") as hdf:
+        stored = {side: hdf.select(side) for side in ("home_stats", "away_stats")}
+    selections = []
+    select = pd.HDFStore.select
+
+    def record_select(self, key, **kwargs):
+        selected = select(self, key, **kwargs)
+        selections.append(len(selected))
+        return selected
+
+    monkeypatch.setattr(pd.HDFStore, "select", record_select)
+    for rows in ([7, 2, 30], [20, 21, 22], [5]):
+        selections.clear()
+        stats = store.match_features(rows=np.array(rows))
+        assert selections == [len(rows)] * 2
+        for side in ("home_stats", "away_stats"):
+            expected = select_features(
+                stored[side].iloc[rows], features, store.aggregation_methods
+            )
+            pd.testing.assert_frame_equal(stats[side], expected)
+
+
+def test_new_week_file_is_incremental(mock_config, tmp_path):
+    """test a week 10 file added after weeks 1-9 only computes the new week,
+    though it sorts before week 2 by name and is loaded before the stored
+    matches of the next league"""
+    raw_dir = tmp_path / "pitchProphet/data/fbref/raw/team_data"
+
+    def write_weeks(league, fixtures, weeks):
+        writer = RawMatchWriter(raw_dir, league, "2017-2018", "gzip")
+        for week in weeks:
+            for i, (fixture_week, home, away) in enumerate(fixtures):
+                if fixture_week == week:
+                    page = match_page(home, away, week, (i % 3, 1), (1.1, 0.9), i)
+                    writer.write(parse_match_page(page))
+            writer.close_part()
+
+    premier_league = round_robin(6, 10)
+    write_weeks("Premier-League", premier_league, range(1, 10))
+    write_weeks("Serie-A", round_robin(4, 10, first=6), range(1, 10))
+    FeatureStore(tmp_path / "training.h5", 3).update(
+        LoadData(mock_config).match_frame(np.float64)
+    )
+    write_weeks("Premier-League", premier_league, [10])
+    frame = LoadData(mock_config).match_frame(np.float64)
+    store = FeatureStore(tmp_path / "training.h5", 3)
+    stats = store.update(frame)
+
+    # premier league week 10 is rows 27-29, serie a follows
+    assert len(frame) == 48
+    assert list(store._rolling.frame.info.index) == list(frame.info.index[27:30])
+    assert_stats_equal(stats, RollingStats(frame, 3).match_features())
+
+
+def test_rebuild_when_history_changes(frame, tmp_path):
+    """test a store is rebuilt when matches come before the stored ones"""
+    store = FeatureStore(tmp_path / "training.h5", 3)
+    store.update(frame.subset(slice(10, None)))
+    stats = store.update(frame)
+
+    assert len(store._rolling.frame) == len(frame)
+    assert_stats_equal(stats, RollingStats(frame, 3).match_features())
+
+
+def test_rebuild_when_methods_change(frame, tmp_path):
+    """test a store is rebuilt for other aggregation methods"""
+    FeatureStore(tmp_path / "training.h5", 3).update(frame)
+    store = FeatureStore(tmp_path / "training.h5", 3, ["mean", "max"])
+    stats = store.update(frame)
+
+    expected = RollingStats(frame, 3, aggregation_methods=["mean", "max"])
+    assert_stats_equal(stats, expected.match_features())
+
+
+def test_fixture_features(frame, tmp_path):
+    """test fixture statistics from the stored state equal RollingStats"""
+    fixtures = pd.DataFrame(
+        {"Home": ["Arsenal", "Wolves"], "Away": ["Fulham", "Burnley"]}
+    )
+    FeatureStore(tmp_path / "inference.h5", 5).update(frame.subset(slice(0, 30)))
+    store = FeatureStore(tmp_path / "inference.h5", 5)
+    store.update(frame)
+
+    expected = RollingStats(frame, 5, inference=True).fixture_features(fixtures)
+    assert_stats_equal(store.fixture_features(fixtures), expected)
@@ -0,0 +1,57 @@
+import pandas as pd
+
+from pitchProphet.data.fbref.match_parser import parse_match_page
+from pitchProphet.data.fbref.raw_io import RawMatchWriter, read_raw_matches
+from pitchProphet.data.fbref.replay.synthetic_pages import match_page
+from pitchProphet.data.pre_processing.ingest import TABLES, load_tables
+
+
+def write_files(raw_dir):
+    """raw files whose columns and dtypes differ between files"""
+    files = []
+    for i, league in enumerate(["Premier-League", "Serie-A", "La-Liga"]):
+        writer = RawMatchWriter(raw_dir, league, "2017-2018", "gzip")
+        for week in (1, 2):
+            match = parse_match_page(match_page(match_week=week, seed=week + i))
+            if i == 1:
+                # a missing key and a float where the other files have ints
+                del match["HomeStat"][0]["Gls"]
+                match["AwayStat"][0]["Sh"] = 1.5
+            if i == 2:
+                match["MatchInfo"][0]["Referee"] = "Anthony Taylor"
+            writer.write(match)
+        files.append(str(writer.close_part()))
+    return files
+
+
+def test_matches_json_normalize(tmp_path):
+    """test columnar ingestion gives the frames json_normalize gives"""
+    files = write_files(tmp_path)
+    records = [r for f in files for r in read_raw_matches(f)]
+
+    for workers in (0, 2):
+        frames = load_tables(files, workers)
+        for table in TABLES:
+            expected = pd.json_normalize(records, record_path=table)
+            pd.testing.assert_frame_equal(frames[table], expected)
+
+
+def test_no_files():
+    """test no raw files give empty frames"""
+    frames = load_tables([])
+    assert all(frames[table].empty for table in TABLES)
+
+
+def test_league_of_each_row(tmp_path):
+    """test the league of each file is repeated over its MatchInfo rows"""
+    files = write_files(tmp_path)
+
+    frames = load_tables(files, leagues=["Premier-League", "Serie-A", "La-Liga"])
+    assert frames["League"].tolist() == [
+        "Premier-League",
+        "Premier-League",
+        "Serie-A",
+        "Serie-A",
+        "La-Liga",
+        "La-Liga",
+    ]
@@ -3,7 +3,12 @@ from pathlib import Path
 import pandas as pd
 import pytest
 
+from pitchProphet.data.fbref.match_parser import parse_match_page
+from pitchProphet.data.fbref.raw_io import RawMatchWriter
+from pitchProphet.data.fbref.replay.synthetic_pages import match_page
+from pitchProphet.data.pre_processing import load_data as load_data_module
 from pitchProphet.data.pre_processing.load_data import LoadData
+from pitchProphet.utils.team_registry import TeamRegistry
 
 
 @pytest.fixture
@@ -75,3 +80,64 @@ def test_file_path_construction(load_data):
 def test_data_validation(load_data):
     """test validation of loaded data"""
     pass
+
+
+def test_open_json_lines(mock_config, tmp_path):
+    """test streamed json lines files load like the old json files"""
+    raw_dir = tmp_path / "pitchProphet/data/fbref/raw/inference"
+    writer = RawMatchWriter(raw_dir, "Premier-League", "2024-2025", "gzip")
+    for week in (1, 2):
+        writer.write(
+            {
+                "MatchInfo": [{"Matchweek": week, "HomeTeam": "A", "AwayTeam": "B"}],
+                "HomeStat": [{"Gls": 1}],
+                "AwayStat": [{"Gls": 0}],
+                "HomePlayersStat": [[{"Player": "x"}]],
+                "MatchLink": "https://fbref.com/en/matches/0",
+            }
+        )
+    writer.close_part()
+
+    data = LoadData(mock_config, inference=True).data
+    assert [d["MatchInfo"][0]["Matchweek"] for d in data] == [1, 2]
+    assert set(data[0]) == {"MatchInfo", "HomeStat", "AwayStat"}
+
+
+def test_store_matches_json(mock_config, tmp_path):
+    """test data read from the columnar store equals data read from json"""
+    raw_dir = tmp_path / "pitchProphet/data/fbref/raw/team_data"
+    for league, weeks in (("Premier-League", [1, 2, 3]), ("Serie-A", [1, 2])):
+        writer = RawMatchWriter(raw_dir, league, "2017-2018")
+        for week in weeks:
+            writer.write(parse_match_page(match_page(match_week=week, seed=week)))
+            writer.close_part()
+
+    for league, match_week in ((None, None), ("Serie-A", None), (None, 2)):
+        loader = LoadData(mock_config, league=league, match_week=match_week)
+        from_store = loader.game_data_process()
+        loader.store = None
+        pd.testing.assert_frame_equal(from_store, loader.game_data_process())
+    assert (raw_dir / "store" / "Serie-A" / "2017-2018.h5").exists()
+
+
+def test_team_names_resolved_in_league(mock_config, tmp_path, monkeypatch):
+    """test team names resolve in the league of their match, from the store
+    and from the raw files, and unknown teams leave the registry unchanged"""
+    registry = TeamRegistry(
+        {"Premier-League": {"Team One": ["T"]}, "Serie-A": {"Team Two": ["T"]}}
+    )
+    monkeypatch.setattr(load_data_module, "team_registry", lambda: registry)
+    raw_dir = tmp_path / "pitchProphet/data/fbref/raw/team_data"
+    for week, league in enumerate(("Premier-League", "Serie-A"), 1):
+        writer = RawMatchWriter(raw_dir, league, "2017-2018")
+        page = match_page(home="T", away="Chelsea", match_week=week)
+        writer.write(parse_match_page(page))
+        writer.close_part()
+
+    loader = LoadData(mock_config)
+    for store in (loader.store, None):
+        loader.store = store
+        match_info = loader.game_data_process().loc["MatchInfo"]
+        assert match_info["HomeTeam"].tolist() == ["Team One", "Team Two"]
+        assert match_info["AwayTeam"].tolist() == ["Chelsea", "Chelsea"]
+    assert registry.teams == ["Team One", "Team Two"]
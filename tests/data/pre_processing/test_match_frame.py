@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from pitchProphet.data.pre_processing.load_data import LoadData
+from pitchProphet.data.pre_processing.match_frame import MatchFrame
+
+
+def test_round_trip(season_config):
+    """test the compact frame converts back to the stacked frame"""
+    loader = LoadData(season_config)
+    data = loader.game_data_process()
+    frame = loader.match_frame(dtype=np.float64)
+
+    pd.testing.assert_frame_equal(frame.to_frame(), data)
+    pd.testing.assert_frame_equal(
+        MatchFrame.from_frame(data, np.float64).to_frame(), data
+    )
+
+
+def test_compact_arrays(season_config):
+    """test teams become ids and stats float32 arrays aligned by match"""
+    data = LoadData(season_config).game_data_process()
+    frame = MatchFrame.from_frame(data)
+    match_info = data.loc["MatchInfo"]
+
+    assert frame.home_stats.dtype == np.float32 and frame.home_stats.flags.c_contiguous
+    assert frame.home_stats.shape == (len(match_info), len(frame.features))
+    home_ids = frame.home_team_ids()
+    assert [frame.teams[i] for i in home_ids] == match_info["HomeTeam"].tolist()
+    assert frame.team_id("Arsenal") >= 0 and frame.team_id("Unknown") == -1
+
+    xg = data.loc["AwayStat"]["xG"].to_numpy(dtype=np.float32)
+    np.testing.assert_array_equal(frame.away_stats[:, frame.features.index("xG")], xg)
+    assert frame.nbytes * 3 < data.memory_usage(deep=True).sum()
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pitchProphet.data.pre_processing.load_data import LoadData
+from pitchProphet.data.pre_processing.process import Process
+from pitchProphet.data.pre_processing.processed_data import (
+    load_processed,
+    read_metadata,
+    source_hash,
+)
+
+
+@pytest.fixture
+def processed(season_config):
+    """fixture to provide processed synthetic seasons"""
+    ld_data = LoadData(season_config)
+    process_games = Process(ld_data.all_config, ld_data.game_data_process(), [], [])
+    process_games.process_all_match()
+    process_games.final_dataframe()
+    return ld_data, process_games
+
+
+def test_save_and_load(processed):
+    """test features, labels and metadata round trip through one file"""
+    ld_data, process_games = processed
+    path = process_games.save_file(ld_data.paths)
+    loaded = load_processed(path)
+
+    assert path.name == "training_data.h5"
+    for table, expected in (
+        ("home_stats", process_games.all_home_stats),
+        ("away_stats", process_games.all_away_stats),
+    ):
+        assert (loaded[table].dtypes == np.float32).all()
+        pd.testing.assert_frame_equal(
+            loaded[table], expected.astype(np.float32), check_exact=False
+        )
+    pd.testing.assert_frame_equal(loaded["match_info"], process_games.match_info_df)
+
+
+def test_metadata(processed):
+    """test the schema and settings are stored with the data"""
+    ld_data, process_games = processed
+    metadata = read_metadata(process_games.save_file(ld_data.paths))
+
+    assert metadata["last_n_match"] == ld_data.config["last_n_match"]
+    assert metadata["x_vars"] == ld_data.config["x_vars"]
+    assert metadata["aggregation_methods"] == ["mean", "std", "trend"]
+    assert metadata["home_columns"] == list(process_games.all_home_stats.columns)
+    assert metadata["n_matches"] == 48
+    assert metadata["source_hash"] == source_hash(process_games.match_info_df)
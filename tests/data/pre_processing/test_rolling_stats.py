@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pitchProphet.data.pre_processing.calculate_stats import DescriptiveStats
+from pitchProphet.data.pre_processing.load_data import LoadData
+from pitchProphet.data.pre_processing.match_frame import MatchFrame
+from pitchProphet.data.pre_processing.rolling_stats import RollingStats
+
+
+@pytest.fixture
+def data(season_config):
+    """fixture to provide stacked match data with a few missing stats"""
+    data = LoadData(season_config).game_data_process()
+    data.loc[("HomeStat", 7), "xG"] = np.nan
+    data.loc[("AwayStat", 30), "Tkl"] = np.nan
+    return data
+
+
+def legacy_features(data, last_n_match, methods=("mean", "std", "trend")):
+    """statistics from DescriptiveStats, match by match"""
+    calc_stats = DescriptiveStats(data, last_n_match, aggregation_methods=methods)
+    match_info = data.loc["MatchInfo"]
+    home, away = [], []
+    for idx in match_info.index:
+        stats = calc_stats.process_home_away_features(match_info.loc[idx])
+        home.append(stats["home_stats"])
+        away.append(stats["away_stats"])
+    return {
+        "home_stats": pd.DataFrame(home, index=match_info.index),
+        "away_stats": pd.DataFrame(away, index=match_info.index),
+    }
+
+
+@pytest.mark.parametrize("last_n_match", [1, 3, 5])
+def test_matches_descriptive_stats(data, last_n_match):
+    """test batch statistics equal the per match statistics"""
+    frame = MatchFrame.from_frame(data, np.float64)
+    stats = RollingStats(frame, last_n_match).match_features()
+    expected = legacy_features(data, last_n_match)
+
+    for side in ("home_stats", "away_stats"):
+        pd.testing.assert_frame_equal(stats[side], expected[side], rtol=1e-10)
+
+
+def test_configured_methods(data):
+    """test every configured method is computed, in config order"""
+    methods = ["sum", "ewma", "min", "max", "q25", "trend"]
+    frame = MatchFrame.from_frame(data, np.float64)
+    stats = RollingStats(frame, 4, aggregation_methods=methods).match_features()
+    expected = legacy_features(data, 4, methods)
+
+    assert list(stats["home_stats"].columns[:6]) == [f"Gls_{m}" for m in methods]
+    for side in ("home_stats", "away_stats"):
+        pd.testing.assert_frame_equal(stats[side], expected[side], rtol=1e-10)
+
+
+def test_fixture_team_aliases(data):
+    """test fixture page names find the teams of the match data"""
+    frame = MatchFrame.from_frame(data, np.float64)
+    stats = RollingStats(frame, 5, inference=True)
+    fixtures = pd.DataFrame({"Home": ["Newcastle Utd"], "Away": ["Leicester City"]})
+    expected = pd.DataFrame({"Home": ["Newcastle-United"], "Away": ["Leicester-City"]})
+
+    for side in ("home_stats", "away_stats"):
+        pd.testing.assert_frame_equal(
+            stats.fixture_features(fixtures)[side],
+            stats.fixture_features(expected)[side],
+        )
+    assert stats.fixture_features(fixtures)["home_stats"].notna().all(axis=None)
+
+
+def test_unknown_method(data):
+    """test an unknown method fails before computing anything"""
+    frame = MatchFrame.from_frame(data, np.float64)
+    with pytest.raises(ValueError, match="unknown aggregation method 'mode'"):
+        RollingStats(frame, 5, aggregation_methods=["mean", "mode"])
+
+
+def test_fixture_features(data):
+    """test inference statistics equal DescriptiveStats in inference mode"""
+    fixtures = pd.DataFrame(
+        {
+            "Home": ["Arsenal", "Burnley", "Wolves"],
+            "Away": ["Fulham", "Everton", "Chelsea"],
+        }
+    )
+    frame = MatchFrame.from_frame(data, np.float64)
+    stats = RollingStats(frame, 5, inference=True).fixture_features(fixtures)
+
+    calc_stats = DescriptiveStats(data, 5, inference=True)
+    for side in ("home_stats", "away_stats"):
+        expected = pd.DataFrame(
+            [
+                calc_stats.process_home_away_features(row)[side]
+                for _, row in fixtures.iterrows()
+            ]
+        )
+        pd.testing.assert_frame_equal(stats[side], expected, rtol=1e-10)
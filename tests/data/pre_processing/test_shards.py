@@ -0,0 +1,96 @@
+import shutil
+
+import pandas as pd
+import pytest
+
+from pitchProphet.data.fbref.match_parser import parse_match_page
+from pitchProphet.data.fbref.match_store import MatchStore
+from pitchProphet.data.fbref.raw_catalog import RawCatalog
+from pitchProphet.data.fbref.raw_io import RawMatchWriter
+from pitchProphet.data.fbref.replay.synthetic_pages import match_page
+from pitchProphet.data.pre_processing.load_data import LoadData
+from pitchProphet.data.pre_processing.process import Process
+from pitchProphet.data.pre_processing.shards import (
+    list_shards,
+    process_shard,
+    process_sharded,
+)
+from pitchProphet.data.pre_processing.window_cache import WindowCache
+from tests.data.pre_processing.conftest import round_robin
+
+
+@pytest.fixture
+def ld_data(mock_config, tmp_path):
+    """fixture to provide LoadData of two leagues without common teams"""
+    raw_dir = tmp_path / "pitchProphet/data/fbref/raw/team_data"
+    leagues = [("Premier-League", round_robin(6, 8)), ("Serie-A", round_robin(4, 6, 6))]
+    for offset, (league, fixtures) in enumerate(leagues):
+        writer = RawMatchWriter(raw_dir, league, "2017-2018", "gzip")
+        for i, (week, home, away) in enumerate(fixtures):
+            score, xg = (i % 3, i % 2), (round(0.5 + i / 10 + offset, 1), 0.9)
+            page = match_page(home, away, week, score, xg, seed=i * 3 + offset * 500)
+            writer.write(parse_match_page(page))
+            if i % 9 == 8:
+                writer.close_part()
+        writer.close_part()
+    return LoadData(mock_config)
+
+
+@pytest.fixture
+def unsharded(ld_data):
+    """fixture to provide the outputs of processing all data at once"""
+    process_games = Process(ld_data.all_config, ld_data.game_data_process(), [], [])
+    process_games.process_all_match()
+    process_games.final_dataframe()
+    return process_games
+
+
+def test_list_shards(ld_data):
+    """test shards are listed in load order"""
+    assert list_shards(ld_data.raw_dir) == [
+        ("Premier-League", None),
+        ("Serie-A", None),
+    ]
+    assert list_shards(ld_data.raw_dir, "season") == [
+        ("Premier-League", "2017-2018"),
+        ("Serie-A", "2017-2018"),
+    ]
+    with pytest.raises(ValueError):
+        list_shards(ld_data.raw_dir, "match_week")
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_sharded_equals_unsharded(ld_data, unsharded, workers):
+    """test merged shard outputs equal processing all data at once"""
+    merged = process_sharded(ld_data, workers)
+
+    pd.testing.assert_frame_equal(merged.all_home_stats, unsharded.all_home_stats)
+    pd.testing.assert_frame_equal(merged.all_away_stats, unsharded.all_away_stats)
+    pd.testing.assert_frame_equal(merged.match_info_df, unsharded.match_info_df)
+
+
+def test_sharded_window_cache(ld_data, unsharded):
+    """test sharding writes the training window cache of all matches"""
+    cache = WindowCache.from_config(ld_data.all_config)
+    expected = cache.match_features(5)
+    shutil.rmtree(cache.cache_dir)
+
+    process_sharded(ld_data, 0)
+    stats = WindowCache.from_config(ld_data.all_config).match_features(5)
+    for side in ("home_stats", "away_stats"):
+        pd.testing.assert_frame_equal(stats[side], expected[side])
+    window_caches = cache.cache_dir.parent
+    assert [p.name for p in window_caches.iterdir()] == ["training"]
+
+
+def test_workers_do_not_sync(ld_data, monkeypatch):
+    """test shards read the catalog and store the main process synced"""
+    synced = []
+    monkeypatch.setattr(RawCatalog, "refresh", lambda self: synced.append("catalog"))
+    monkeypatch.setattr(
+        MatchStore, "sync", lambda self, raw_dir: synced.append(raw_dir)
+    )
+
+    for league, season in [("Premier-League", None), ("Serie-A", "2017-2018")]:
+        assert process_shard(ld_data.config_path, league, season) is not None
+    assert synced == []
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pitchProphet.data.pre_processing.load_data import LoadData
+from pitchProphet.data.pre_processing.rolling_stats import RollingStats
+from pitchProphet.data.pre_processing.window_cache import WindowCache
+
+
+@pytest.fixture
+def frame(season_config):
+    """fixture to provide loaded matches with a few missing stats"""
+    frame = LoadData(season_config).match_frame(np.float64)
+    frame.home_stats[7, 4] = np.nan
+    frame.away_stats[30, 18] = np.nan
+    return frame
+
+
+@pytest.mark.parametrize("last_n_match", [1, 3, 6])
+def test_matches_rolling_stats(frame, tmp_path, last_n_match):
+    """test every window size up to max_window gives the RollingStats statistics"""
+    WindowCache(tmp_path / "cache").build(frame, 6, np.float64)
+    methods = ["mean", "std", "trend", "max"]
+    stats = WindowCache(tmp_path / "cache").match_features(last_n_match, methods)
+
+    expected = RollingStats(frame, last_n_match, aggregation_methods=methods)
+    expected = expected.match_features()
+    for side in ("home_stats", "away_stats"):
+        pd.testing.assert_frame_equal(stats[side], expected[side], rtol=1e-10)
+
+
+def test_feature_subset(frame, tmp_path):
+    """test a feature subset gives the columns of those features"""
+    cache = WindowCache(tmp_path / "cache")
+    cache.build(frame, 5)
+    stats = cache.match_features(5, ["mean"], ["xG", "Gls"])
+
+    expected = RollingStats(frame, 5, aggregation_methods=["mean"]).match_features()
+    home = expected["home_stats"][["xG_mean", "Gls_mean"]]
+    pd.testing.assert_frame_equal(stats["home_stats"], home, rtol=1e-5)
+
+
+def test_window_is_view(frame, tmp_path):
+    """test windows are read from the memory-mapped file without a copy"""
+    cache = WindowCache(tmp_path / "cache")
+    cache.build(frame, 5)
+    windows, lengths = cache.window(3)
+
+    assert isinstance(windows.base, np.memmap) or isinstance(windows, np.memmap)
+    assert windows.shape == (len(frame), 2, 3, len(frame.features))
+    assert lengths.max() == 3
+    with pytest.raises(ValueError):
+        cache.window(6)
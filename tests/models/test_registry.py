@@ -0,0 +1,88 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+from pitchProphet.models.registry import ModelRegistry
+
+FEATURES = ["hGls_mean", "hxG_mean", "aGls_mean", "axG_mean"]
+
+
+def train(seed=0):
+    """small 3 class model with named features"""
+    rng = np.random.default_rng(seed)
+    x = pd.DataFrame(rng.random((60, len(FEATURES))), columns=FEATURES)
+    y = np.arange(60) % 3
+    model = xgb.XGBClassifier(n_estimators=3, max_depth=2, random_state=seed)
+    return model.fit(x, y), x
+
+
+def test_feature_order(tmp_path):
+    """columns in any order are re-ordered to the model's feature order"""
+    model, x = train()
+    model.save_model(tmp_path / "xgb_model.ubj")
+    loaded = ModelRegistry(tmp_path).get()
+
+    shuffled = x[FEATURES[::-1]]
+    np.testing.assert_allclose(
+        loaded.predict_proba(shuffled), model.predict_proba(x), rtol=1e-6
+    )
+    assert list(loaded.feature_index(shuffled.columns)) == [3, 2, 1, 0]
+    with pytest.raises(KeyError, match="hxG_mean"):
+        loaded.predict_proba(x.drop(columns="hxG_mean"))
+
+
+def test_league_slots(tmp_path):
+    """league and version slots fall back to the default model"""
+    train(0)[0].save_model(tmp_path / "xgb_model.ubj")
+    train(1)[0].save_model(tmp_path / "xgb_model-Serie-A.json")
+    train(2)[0].save_model(tmp_path / "xgb_model-Serie-A-v2.ubj")
+    registry = ModelRegistry(tmp_path)
+
+    assert registry.path().name == "xgb_model.ubj"
+    assert registry.path("Bundesliga").name == "xgb_model.ubj"
+    assert registry.path("Serie-A").name == "xgb_model-Serie-A.json"
+    assert registry.path("Serie-A", "v2").name == "xgb_model-Serie-A-v2.ubj"
+    assert registry.path("Serie-A", "v3").name == "xgb_model-Serie-A.json"
+    with pytest.raises(FileNotFoundError):
+        ModelRegistry(tmp_path / "empty").path()
+
+
+def test_cache(tmp_path):
+    """models are loaded once, evicted least recently used first and reloaded
+    when their file changes"""
+    for league in ("A", "B", "C"):
+        train()[0].save_model(tmp_path / f"xgb_model-{league}.ubj")
+    registry = ModelRegistry(tmp_path, max_models=2)
+
+    a = registry.get("A")
+    assert registry.get("A") is a
+    registry.get("B")
+    registry.get("A")
+    registry.get("C")
+    assert [path.stem for path in registry._models] == ["xgb_model-A", "xgb_model-C"]
+
+    model, x = train(5)
+    model.save_model(tmp_path / "xgb_model-A.ubj")
+    reloaded = registry.get("A")
+    assert reloaded is not a
+    np.testing.assert_allclose(
+        reloaded.predict_proba(x), model.predict_proba(x), rtol=1e-6
+    )
+
+
+def test_pickle_fallback(tmp_path):
+    """a pickled model is converted to the native format once"""
+    model, x = train()
+    with open(tmp_path / "xgb_model.pkl", "wb") as f:
+        pickle.dump(model, f)
+    registry = ModelRegistry(tmp_path)
+
+    loaded = registry.get("Serie-A")
+    assert loaded.path == tmp_path / "xgb_model.ubj"
+    assert registry.path().suffix == ".ubj"
+    np.testing.assert_allclose(
+        loaded.predict_proba(x), model.predict_proba(x), rtol=1e-6
+    )
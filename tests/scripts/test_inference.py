@@ -1,15 +1,22 @@
+import time
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import pytest
+import xgboost as xgb
 
+from pitchProphet.models.registry import ModelRegistry
+from pitchProphet.scripts import inference
 from pitchProphet.scripts.inference import (
     add_stats,
     check_existing_data,
+    feature_matrix,
     get_fixtures,
     inference_raw_data,
     load_config,
     load_data,
+    predict_batch,
     process_data,
 )
 
@@ -97,3 +104,88 @@ def test_prediction_output(mock_config):
 def test_inference_pipeline(mock_config):
     """test complete inference pipeline"""
     pass
+
+
+def league_inputs(rng, n_rows):
+    """home and away stats of n_rows fixtures"""
+    return {
+        "home_data": pd.DataFrame(
+            rng.random((n_rows, 2)), columns=["Gls_mean", "xG_mean"]
+        ),
+        "away_data": pd.DataFrame(
+            rng.random((n_rows, 2)), columns=["Gls_mean", "xG_mean"]
+        ),
+    }
+
+
+def test_predict_batch(tmp_path):
+    """one prediction over all leagues equals predicting each league"""
+    rng = np.random.default_rng(0)
+    x = feature_matrix(league_inputs(rng, 60))
+    model = xgb.XGBClassifier(n_estimators=3, max_depth=2)
+    model.fit(x, np.arange(60) % 3)
+    model.save_model(tmp_path / "xgb_model.ubj")
+    registry = ModelRegistry(tmp_path)
+
+    data = {league: league_inputs(rng, n) for league, n in [("A", 3), ("B", 5)]}
+    inputs = {league: feature_matrix(d) for league, d in data.items()}
+    # columns in another order and a league missing features
+    inputs["B"] = inputs["B"][inputs["B"].columns[::-1]]
+    inputs["C"] = inputs["A"].drop(columns="axG_mean")
+
+    predictions = predict_batch(inputs, registry)
+    assert list(predictions) == ["A", "B"]
+    for league in ("A", "B"):
+        expected = process_data(data[league], registry.get(league))
+        assert list(predictions[league].index) == list(range(len(expected)))
+        pd.testing.assert_frame_equal(predictions[league], expected)
+
+
+def test_run_leagues_concurrently(tmp_path, monkeypatch):
+    """leagues are prepared at the same time and a failing league does not
+    stop the others"""
+    config = {
+        "global": {"paths": {"root_dir": str(tmp_path), "model_dir": "models"}},
+        "scraper": {"rate_limit": {}, "cache": {"enabled": False}},
+        "inference": {"workers": 4},
+    }
+    weeks = {"A": 3, "B": 4, "C": 5, "D": None, "E": 6}
+    prepared, saved = [], {}
+
+    def prepare_league(config_path, config, league, current_week, client):
+        time.sleep(0.3)
+        if league == "B":
+            raise RuntimeError("fixtures page changed")
+        if league == "E":
+            # no fixtures next week
+            return None
+        prepared.append(league)
+        fixtures = pd.DataFrame({"Home": ["x"], "Away": ["y"]})
+        return {"fixtures": fixtures, "x_df": fixtures, "match_week": current_week + 1}
+
+    def predict_batch(inputs, registry):
+        return {league: pd.DataFrame({"p(Home Win)": [0.5]}) for league in inputs}
+
+    monkeypatch.setattr(inference, "load_config", lambda path: config)
+    monkeypatch.setattr(inference, "get_current_matchweek", lambda: weeks)
+    monkeypatch.setattr(inference, "prepare_league", prepare_league)
+    monkeypatch.setattr(inference, "predict_batch", predict_batch)
+
+    def save_predictions(config, results, league, week):
+        saved[league] = week
+        return tmp_path / f"{league}_week_{week}_predictions.csv"
+
+    monkeypatch.setattr(inference, "save_predictions", save_predictions)
+
+    start = time.perf_counter()
+    written = inference.run(tmp_path / "config.yaml")
+    assert time.perf_counter() - start < 0.8
+    assert sorted(prepared) == ["A", "C"]
+    assert saved == {"A": 4, "C": 6}
+    # the failed league is reported, leagues with active matches or nothing
+    # to predict are not
+    assert written == {
+        "A": tmp_path / "A_week_4_predictions.csv",
+        "B": None,
+        "C": tmp_path / "C_week_6_predictions.csv",
+    }
@@ -0,0 +1,221 @@
+import pytest
+import yaml
+
+from pitchProphet.scripts.pipeline import Pipeline, Stage, default_stages, file_digest
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    """config with an input value per stage and an output dir"""
+    config = {
+        "global": {"paths": {"root_dir": str(tmp_path), "pipeline_dir": "pipeline"}},
+        "raw": {"season": "2017-2018"},
+        "features": {"last_n_match": 5},
+    }
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return path
+
+
+@pytest.fixture
+def stages(tmp_path):
+    """raw -> features stages writing files from their config section, with a
+    count of their runs"""
+    runs = {"raw": 0, "features": 0}
+    out = tmp_path / "out"
+    out.mkdir()
+
+    def make_stage(name, deps=()):
+        def run(config_path):
+            runs[name] += 1
+            config = yaml.safe_load(config_path.read_text())
+            (out / name).write_text(str(config[name]))
+
+        return Stage(
+            name,
+            run,
+            inputs=lambda config: config[name],
+            outputs=lambda config: {name: file_digest(out / name)},
+            deps=deps,
+        )
+
+    return [make_stage("raw"), make_stage("features", ("raw",))], runs, out
+
+
+def update_config(path, section, values):
+    config = yaml.safe_load(path.read_text())
+    config[section].update(values)
+    path.write_text(yaml.safe_dump(config))
+
+
+def test_rerun_is_cached(config_path, stages):
+    """a second run with nothing changed skips every stage"""
+    stage_list, runs, _ = stages
+    assert Pipeline(config_path, stage_list).run() == {
+        "raw": "ran",
+        "features": "ran",
+    }
+    assert Pipeline(config_path, stage_list).run() == {
+        "raw": "cached",
+        "features": "cached",
+    }
+    assert runs == {"raw": 1, "features": 1}
+    assert (config_path.parent / "pipeline" / "raw.json").exists()
+
+
+def test_config_change_reruns_reading_stages(config_path, stages):
+    """a changed section only re-runs the stage reading it"""
+    stage_list, runs, _ = stages
+    Pipeline(config_path, stage_list).run()
+    update_config(config_path, "features", {"last_n_match": 7})
+    assert Pipeline(config_path, stage_list).run() == {
+        "raw": "cached",
+        "features": "ran",
+    }
+    assert runs == {"raw": 1, "features": 2}
+
+
+def test_upstream_change_propagates(config_path, stages):
+    """new upstream outputs re-run downstream stages"""
+    stage_list, runs, _ = stages
+    Pipeline(config_path, stage_list).run()
+    update_config(config_path, "raw", {"season": "2018-2019"})
+    assert Pipeline(config_path, stage_list).run() == {
+        "raw": "ran",
+        "features": "ran",
+    }
+
+
+def test_changed_output_reruns(config_path, stages):
+    """an output changed or deleted outside the pipeline is written again"""
+    stage_list, runs, out = stages
+    Pipeline(config_path, stage_list).run()
+    (out / "features").unlink()
+    assert Pipeline(config_path, stage_list).run(["features"]) == {
+        "raw": "cached",
+        "features": "ran",
+    }
+    assert (out / "features").exists()
+
+
+def test_force_and_dry_run(config_path, stages):
+    """force re-runs the targets only, dry runs run nothing"""
+    stage_list, runs, _ = stages
+    pipeline = Pipeline(config_path, stage_list)
+    assert pipeline.run(dry_run=True) == {"raw": "stale", "features": "stale"}
+    assert runs == {"raw": 0, "features": 0}
+
+    pipeline.run()
+    assert pipeline.run(["features"], force=True) == {
+        "raw": "cached",
+        "features": "ran",
+    }
+    assert runs == {"raw": 1, "features": 2}
+
+
+def test_failed_stage_is_not_recorded(config_path, stages):
+    """a stage that raises runs again on the next run"""
+    stage_list, runs, _ = stages
+    features = stage_list[1]
+    ok = features.run
+
+    def fail(config_path):
+        ok(config_path)
+        raise RuntimeError("no predictions written")
+
+    features.run = fail
+    with pytest.raises(RuntimeError):
+        Pipeline(config_path, stage_list).run()
+    assert not (config_path.parent / "pipeline" / "features.json").exists()
+
+    features.run = ok
+    assert Pipeline(config_path, stage_list).run() == {
+        "raw": "cached",
+        "features": "ran",
+    }
+
+
+def test_order(config_path, stages):
+    """targets run after their deps, unknown and cyclic stages raise"""
+    stage_list, _, _ = stages
+    pipeline = Pipeline(config_path, stage_list)
+    assert pipeline.order(["features"]) == ["raw", "features"]
+    assert pipeline.order(["raw"]) == ["raw"]
+    with pytest.raises(ValueError, match="unknown stage"):
+        pipeline.order(["train"])
+
+    cyclic = [
+        Stage("a", None, dict, dict, ("b",)),
+        Stage("b", None, dict, dict, ("a",)),
+    ]
+    with pytest.raises(ValueError, match="depends on itself"):
+        Pipeline(config_path, cyclic).order()
+
+
+def test_inference_failure_raises(config_path, monkeypatch):
+    """the inference stage fails if a league wrote no predictions"""
+    from pitchProphet.scripts import inference
+
+    inference_stage = {s.name: s for s in default_stages()}["inference-data"]
+    monkeypatch.setattr(inference, "run", lambda path: {"A": path, "B": None})
+    with pytest.raises(RuntimeError, match="'B'"):
+        inference_stage.run(config_path)
+
+
+def test_inference_without_fixtures_passes(config_path, monkeypatch):
+    """the inference stage succeeds when no league had anything to predict"""
+    from pitchProphet.scripts import inference
+
+    inference_stage = {s.name: s for s in default_stages()}["inference-data"]
+    monkeypatch.setattr(inference, "run", lambda path: {})
+    inference_stage.run(config_path)
+
+
+def test_get_data_inputs_follow_match_weeks(tmp_path, monkeypatch):
+    """get-data runs again when a match week was played"""
+    from pitchProphet.utils import matchweek_date
+
+    get_data = {s.name: s for s in default_stages()}["get-data"]
+    config = {"scraper": {"season": "2024-2025", "rate_limit": {}}}
+    monkeypatch.setattr(matchweek_date, "get_current_matchweek", lambda: {"A": 3})
+    inputs = get_data.inputs(config)
+    monkeypatch.setattr(matchweek_date, "get_current_matchweek", lambda: {"A": 4})
+    assert get_data.inputs(config) != inputs
+
+
+def test_default_stage_inputs(tmp_path):
+    """pre-process fingerprints ignore worker counts but not what is processed"""
+    pre_process = {s.name: s for s in default_stages()}["pre-process"]
+    config = {
+        "global": {"paths": {"root_dir": str(tmp_path), "raw_dir": "raw"}},
+        "processing": {
+            "last_n_match": 5,
+            "ingest_workers": 4,
+            "sharding": {"workers": 4},
+        },
+    }
+    inputs = pre_process.inputs(config)
+    config["processing"].update(ingest_workers=0, sharding={"workers": 1})
+    assert pre_process.inputs(config) == inputs
+    config["processing"]["last_n_match"] = 6
+    assert pre_process.inputs(config) != inputs
+
+
+def test_scraped_files_change_get_data_and_pre_process(mock_config):
+    """raw files written by the scraper change get-data's outputs and
+    pre-process's inputs"""
+    from pitchProphet.data.fbref.fbref_scrapper import FBRefScraper
+    from pitchProphet.data.fbref.match_parser import parse_match_page
+    from pitchProphet.data.fbref.replay.synthetic_pages import match_page
+
+    with open(mock_config, "r") as f:
+        config = yaml.safe_load(f)
+    stage_of = {s.name: s for s in default_stages()}
+    outputs = stage_of["get-data"].outputs(config)
+    inputs = stage_of["pre-process"].inputs(config)
+
+    writer = FBRefScraper(mock_config)._writer("Premier-League", "2017-2018")
+    writer.write(parse_match_page(match_page()))
+    writer.close_part()
+    assert stage_of["get-data"].outputs(config) != outputs
+    assert stage_of["pre-process"].inputs(config) != inputs
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from pitchProphet.utils.team_registry import TeamRegistry, normalize_name
+
+
+@pytest.fixture
+def registry():
+    """fixture to provide the registry of config/teams.yaml"""
+    return TeamRegistry.from_yaml()
+
+
+def test_normalize_name():
+    """test case, accents, punctuation and Utd are ignored"""
+    assert normalize_name("Borussia Mönchengladbach") == "borussia monchengladbach"
+    assert normalize_name("Newcastle-Utd") == "newcastle united"
+    assert normalize_name("Brighton & Hove Albion") == "brighton and hove albion"
+
+
+@pytest.mark.parametrize(
+    "name, league, canonical",
+    [
+        ("Manchester Utd", None, "Manchester United"),
+        ("Nott'ham Forest", "Premier-League", "Nottingham Forest"),
+        ("Wolves", None, "Wolverhampton Wanderers"),
+        ("Leicester-City", None, "Leicester City"),
+        ("Paris S-G", "League-1", "Paris Saint-Germain"),
+        ("Gladbach", "Bundesliga", "Borussia Mönchengladbach"),
+        ("Atletico Madrid", None, "Atlético Madrid"),
+    ],
+)
+def test_canonical(registry, name, league, canonical):
+    """test aliases of all leagues resolve to the match report name"""
+    assert registry.canonical(name, league) == canonical
+
+
+def test_ambiguous_alias_resolves_in_league():
+    """test an alias shared by two leagues only resolves with the league"""
+    registry = TeamRegistry({"A": {"Team One": ["T"]}, "B": {"Team Two": ["T"]}})
+
+    assert registry.find("T") is None
+    assert registry.find("T", "A") == "Team One"
+    assert registry.find("T", "B") == "Team Two"
+
+
+def test_ids(registry):
+    """test names become dense ids, unknown teams get local ids without being
+    added to the registry"""
+    n_teams = len(registry.teams)
+    unknown = {}
+    names = ["Tottenham", "Tottenham Hotspur", "Unknown FC", None, "Other FC"]
+    ids = registry.ids(names, local=unknown)
+
+    assert ids[0] == ids[1] == registry.team_id("Spurs")
+    assert list(ids[2:]) == [-2, -1, -3]
+    assert registry.team_id("unknown fc") == -1
+    assert registry.team_id("Unknown FC", local=unknown) == -2
+    assert len(registry.teams) == n_teams and registry.find("Unknown FC") is None
+
+    names = registry.names(ids, unknown)
+    assert list(names[:3]) == ["Tottenham Hotspur", "Tottenham Hotspur", "Unknown FC"]
+    assert np.isnan(names[3]) and names[4] == "Other FC"
+
+
+def test_ids_in_league_of_each_name():
+    """test each name is resolved in its own league"""
+    registry = TeamRegistry({"A": {"Team One": ["T"]}, "B": {"Team Two": ["T"]}})
+
+    ids = registry.ids(["T", "T", "T"], ["A", "B", None])
+    assert list(registry.names(ids[:2])) == ["Team One", "Team Two"]
+    assert ids[2] == -2